@@ -17,6 +17,12 @@ def create_app():
     db.init_app(app)
     jwt.init_app(app)
 
+    from app.services import cache_versions
+    cache_versions.init_app(app)
+
+    from app.services import listing
+    listing.init_app(app)
+
     from app.routes.solicitations import solicitations_bp
     from app.routes.organizations import organizations_bp
     from app.routes.matches import matches_bp
@@ -26,6 +32,7 @@ def create_app():
     from app.routes.predictions import predictions_bp
     from app.routes.rfq import rfq_bp
     from app.routes.portals import portals_bp
+    from app.routes.jobs import jobs_bp
 
     app.register_blueprint(solicitations_bp, url_prefix="/api")
     app.register_blueprint(organizations_bp, url_prefix="/api")
@@ -36,19 +43,29 @@ def create_app():
     app.register_blueprint(predictions_bp, url_prefix="/api")
     app.register_blueprint(rfq_bp, url_prefix="/api")
     app.register_blueprint(portals_bp, url_prefix="/api")
+    app.register_blueprint(jobs_bp, url_prefix="/api")
 
     with app.app_context():
         from app.models import solicitation, organization, zip_need_score, match_result, user
-        from app.models import emergency_capacity, waste_reduction
+        from app.models import emergency_capacity, waste_reduction, cache_version, llm_score_cache
+        from app.models import match_input_version, job
+        from app.models import organization_naics, organization_capability, solicitation_category
+        from app.models import prediction_snapshot, prediction_snapshot_run, zip_coverage
+        from sqlalchemy import inspect
+        existing = set(inspect(db.engine).get_table_names())
         db.create_all()
-        _run_migrations(app)
+        _run_migrations(app, new_tables=set(inspect(db.engine).get_table_names()) - existing)
 
     return app
 
 
-def _run_migrations(app):
-    """Add columns that db.create_all() won't add to existing tables."""
+def _run_migrations(app, new_tables=frozenset()):
+    """Add columns that db.create_all() won't add to existing tables.
+
+    ``new_tables`` are the tables db.create_all() just created."""
+    from datetime import date, datetime
     from sqlalchemy import text, inspect
+    from app.services.term_links import LINKS, backfill_term_links
     engine = db.engine
     inspector = inspect(engine)
 
@@ -63,6 +80,15 @@ def _run_migrations(app):
         migrations.append("ALTER TABLE solicitations ADD COLUMN company_email VARCHAR(200)")
     if "user_id" not in sol_cols:
         migrations.append("ALTER TABLE solicitations ADD COLUMN user_id INTEGER REFERENCES users(id)")
+    if "updated_at" not in sol_cols:
+        migrations.append("ALTER TABLE solicitations ADD COLUMN updated_at TIMESTAMP")
+
+    # Jobs table migrations
+    job_cols = {c["name"] for c in inspector.get_columns("jobs")}
+    if "attempts" not in job_cols:
+        migrations.append("ALTER TABLE jobs ADD COLUMN attempts INTEGER DEFAULT 0")
+    if "heartbeat_at" not in job_cols:
+        migrations.append("ALTER TABLE jobs ADD COLUMN heartbeat_at TIMESTAMP")
 
     # Users table migrations
     user_cols = {c["name"] for c in inspector.get_columns("users")}
@@ -87,6 +113,18 @@ def _run_migrations(app):
         migrations.append("ALTER TABLE organizations ADD COLUMN years_in_business INTEGER")
     if "small_business" not in org_cols:
         migrations.append("ALTER TABLE organizations ADD COLUMN small_business BOOLEAN DEFAULT FALSE")
+    if "updated_at" not in org_cols:
+        migrations.append("ALTER TABLE organizations ADD COLUMN updated_at TIMESTAMP")
+
+    # Term columns of the association tables were VARCHAR(10/200); free-form
+    # JSON terms can be longer, so widen them where the length is enforced
+    if engine.dialect.name != "sqlite":
+        for link in LINKS:
+            if link.table.name in new_tables:
+                continue
+            term = next(c for c in inspector.get_columns(link.table.name) if c["name"] == link.term)
+            if getattr(term["type"], "length", None):
+                migrations.append(f"ALTER TABLE {link.table.name} ALTER COLUMN {link.term} TYPE TEXT")
 
     if migrations:
         with engine.connect() as conn:
@@ -94,3 +132,42 @@ def _run_migrations(app):
                 conn.execute(text(sql))
             conn.commit()
         app.logger.info(f"Ran {len(migrations)} migration(s)")
+
+    # Keyset listings order on bare NOT NULL columns through (sort column, id)
+    # indexes. db.create_all() neither tightens nor indexes existing tables,
+    # so fill any NULLs left by older rows and create the missing indexes.
+    from app.models.emergency_capacity import EmergencyCapacity
+    from app.models.match_result import MatchResult
+    from app.models.organization import Organization
+    from app.models.solicitation import Solicitation
+    sort_columns = [
+        (Solicitation.posted_date, date.today()),
+        (EmergencyCapacity.created_at, datetime.utcnow()),
+        (MatchResult.score, 0.0),
+    ]
+    with engine.begin() as conn:
+        for column, fill in sort_columns:
+            if column.table.name not in new_tables:
+                conn.execute(column.table.update().where(column.is_(None)).values({column.key: fill}))
+        for model in (Solicitation, Organization, EmergencyCapacity, MatchResult):
+            table = model.__table__
+            if table.name in new_tables:
+                continue
+            existing = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+
+    # Association tables start empty when db.create_all() adds them to an
+    # existing database; fill them once, on that startup only
+    if any(link.table.name in new_tables for link in LINKS):
+        with engine.begin() as conn:
+            written = backfill_term_links(conn)
+        if written:
+            app.logger.info(f"Backfilled {written} term link row(s)")
+
+    from app.services.zip_coverage import backfill_zip_coverage
+    with engine.begin() as conn:
+        written = backfill_zip_coverage(conn)
+    if written:
+        app.logger.info(f"Backfilled {written} ZIP coverage row(s)")
@@ -10,5 +10,18 @@ class Config:
     SQLALCHEMY_DATABASE_URI = _db_uri
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+    LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "5"))
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "15"))
+    LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "10000"))
+    LLM_BATCH_SCORING = os.getenv("LLM_BATCH_SCORING", "false").lower() == "true"
+    TRIAGE_WORKERS = int(os.getenv("TRIAGE_WORKERS", "1"))
+    TRIAGE_CHUNK_SIZE = int(os.getenv("TRIAGE_CHUNK_SIZE", "8"))
+    ASYNC_JOBS = os.getenv("ASYNC_JOBS", "false").lower() == "true"
+    JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+    JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "1800"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    ZIP_CENTROIDS_PATH = os.getenv("ZIP_CENTROIDS_PATH", os.path.join(BASE_DIR, "data", "zip_centroids.npy"))
+    PREDICTION_SNAPSHOT_RETENTION_DAYS = int(os.getenv("PREDICTION_SNAPSHOT_RETENTION_DAYS", "7"))
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev-secret-change-in-production")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
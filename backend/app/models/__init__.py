@@ -3,3 +3,13 @@ from app.models.organization import Organization
 from app.models.zip_need_score import ZipNeedScore
 from app.models.match_result import MatchResult
 from app.models.user import User
+from app.models.cache_version import CacheVersion
+from app.models.llm_score_cache import LlmScoreCache
+from app.models.match_input_version import MatchInputVersion
+from app.models.job import Job
+from app.models.organization_naics import OrganizationNaics
+from app.models.organization_capability import OrganizationCapability
+from app.models.solicitation_category import SolicitationCategory
+from app.models.prediction_snapshot import PredictionSnapshot
+from app.models.prediction_snapshot_run import PredictionSnapshotRun
+from app.models.zip_coverage import ZipCoverage
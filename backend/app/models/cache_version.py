@@ -0,0 +1,14 @@
+from app import db
+
+
+class CacheVersion(db.Model):
+    __tablename__ = "cache_versions"
+
+    name = db.Column(db.String(50), primary_key=True)  # organizations, zip_need_scores, ...
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "version": self.version,
+        }
@@ -4,6 +4,8 @@ from datetime import datetime
 
 class EmergencyCapacity(db.Model):
     __tablename__ = "emergency_capacities"
+    # Keyset order of GET /emergency/capacity
+    __table_args__ = (db.Index("ix_emergency_capacities_created_at_id", "created_at", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     organization_id = db.Column(db.Integer, db.ForeignKey("organizations.id"), nullable=False)
@@ -27,7 +29,7 @@ class EmergencyCapacity(db.Model):
     lng = db.Column(db.Float, nullable=False)
     service_radius_miles = db.Column(db.Float, default=200.0)
 
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     organization = db.relationship("Organization", backref="emergency_capacities")
 
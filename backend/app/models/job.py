@@ -0,0 +1,39 @@
+from app import db
+from datetime import datetime
+
+
+class Job(db.Model):
+    """A queued matching/triage run, executed by scripts/job_worker.py."""
+    __tablename__ = "jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # generate_matches, triage
+    params = db.Column(db.JSON, default=dict)
+    status = db.Column(db.String(20), default="queued", index=True)  # queued, running, succeeded, failed
+    progress_done = db.Column(db.Integer, default=0)
+    progress_total = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    worker_id = db.Column(db.String(100), nullable=True)
+    attempts = db.Column(db.Integer, default=0)  # claims so far, including re-claims after a lost worker
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # last sign of life; the lease runs from here
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self, include_result=True):
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params or {},
+            "status": self.status,
+            "progress": {"done": self.progress_done or 0, "total": self.progress_total},
+            "error": self.error,
+            "attempts": self.attempts or 0,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
@@ -0,0 +1,23 @@
+from app import db
+from datetime import datetime
+
+
+class LlmScoreCache(db.Model):
+    __tablename__ = "llm_score_cache"
+
+    # sha256 of the model name + the rendered match prompt, which carries every
+    # prompt-relevant field of the solicitation and organization
+    fingerprint = db.Column(db.String(64), primary_key=True)
+    model = db.Column(db.String(100), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    explanation = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "model": self.model,
+            "score": self.score,
+            "explanation": self.explanation,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -0,0 +1,22 @@
+from app import db
+from datetime import datetime
+
+
+class MatchInputVersion(db.Model):
+    """The inputs a solicitation's current MatchResult set was computed from."""
+    __tablename__ = "match_input_versions"
+
+    solicitation_id = db.Column(db.Integer, db.ForeignKey("solicitations.id"), primary_key=True)
+    solicitation_updated_at = db.Column(db.DateTime, nullable=True)
+    org_set_digest = db.Column(db.String(64), nullable=False)  # sha256 of (id, updated_at) of orgs in range
+    need_score = db.Column(db.Float, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "solicitation_id": self.solicitation_id,
+            "solicitation_updated_at": self.solicitation_updated_at.isoformat() if self.solicitation_updated_at else None,
+            "org_set_digest": self.org_set_digest,
+            "need_score": self.need_score,
+            "computed_at": self.computed_at.isoformat() if self.computed_at else None,
+        }
@@ -4,11 +4,13 @@ from datetime import datetime
 
 class MatchResult(db.Model):
     __tablename__ = "match_results"
+    # Keyset order of GET /matches: score descending, then id ascending
+    __table_args__ = (db.Index("ix_match_results_score_id", db.text("score DESC"), "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     solicitation_id = db.Column(db.Integer, db.ForeignKey("solicitations.id"), nullable=False)
     organization_id = db.Column(db.Integer, db.ForeignKey("organizations.id"), nullable=False)
-    score = db.Column(db.Float, default=0.0)  # composite 0-100
+    score = db.Column(db.Float, nullable=False, default=0.0)  # composite 0-100
     explanation = db.Column(db.Text)
     capability_overlap = db.Column(db.Float, default=0.0)
     distance_miles = db.Column(db.Float, default=0.0)
@@ -16,6 +18,26 @@ class MatchResult(db.Model):
     llm_score = db.Column(db.Float, default=0.0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    def to_compact_dict(self, organization=None):
+        """Match fields plus its organization, without the solicitation.
+
+        Pass ``organization`` when the caller has already loaded it, so
+        serializing a match set never lazy-loads per row."""
+        org = organization if organization is not None else self.organization
+        return {
+            "id": self.id,
+            "solicitation_id": self.solicitation_id,
+            "organization_id": self.organization_id,
+            "score": round(self.score, 1),
+            "explanation": self.explanation,
+            "capability_overlap": round(self.capability_overlap, 1),
+            "distance_miles": round(self.distance_miles, 1),
+            "need_score_component": round(self.need_score_component, 1),
+            "llm_score": round(self.llm_score, 1),
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "organization": org.to_dict() if org else None,
+        }
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -4,6 +4,8 @@ from datetime import datetime
 
 class Organization(db.Model):
     __tablename__ = "organizations"
+    # Keyset order of GET /organizations
+    __table_args__ = (db.Index("ix_organizations_name_id", "name", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(300), nullable=False)
@@ -30,6 +32,7 @@ class Organization(db.Model):
     small_business = db.Column(db.Boolean, default=False)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     matches = db.relationship("MatchResult", backref="organization", lazy=True)
 
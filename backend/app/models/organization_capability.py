@@ -0,0 +1,10 @@
+from app import db
+
+
+class OrganizationCapability(db.Model):
+    """One capability of an organization, mirrored from ``Organization.capabilities``."""
+    __tablename__ = "organization_capabilities"
+    __table_args__ = (db.Index("ix_organization_capabilities_capability", "capability", "organization_id"),)
+
+    organization_id = db.Column(db.Integer, db.ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    capability = db.Column(db.Text, primary_key=True)
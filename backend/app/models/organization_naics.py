@@ -0,0 +1,10 @@
+from app import db
+
+
+class OrganizationNaics(db.Model):
+    """One NAICS code of an organization, mirrored from ``Organization.naics_codes``."""
+    __tablename__ = "organization_naics"
+    __table_args__ = (db.Index("ix_organization_naics_code", "naics_code", "organization_id"),)
+
+    organization_id = db.Column(db.Integer, db.ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    naics_code = db.Column(db.Text, primary_key=True)
@@ -0,0 +1,27 @@
+from app import db
+from datetime import date
+
+
+class PredictionSnapshot(db.Model):
+    """One ZIP's food-insecurity prediction as computed for ``snapshot_date``."""
+    __tablename__ = "prediction_snapshots"
+    __table_args__ = (
+        db.UniqueConstraint("snapshot_date", "zip_code", name="uq_prediction_snapshots_date_zip"),
+        db.Index("ix_prediction_snapshots_date_rank", "snapshot_date", "rank"),
+        db.Index("ix_prediction_snapshots_date_severity", "snapshot_date", "severity", "rank"),
+        db.Index("ix_prediction_snapshots_date_state", "snapshot_date", "state", "rank"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    snapshot_date = db.Column(db.Date, nullable=False, default=date.today)
+    rank = db.Column(db.Integer, nullable=False)  # position in the composite-risk ordering
+    zip_code = db.Column(db.String(10), nullable=False)
+    state = db.Column(db.String(2))
+    severity = db.Column(db.String(20), nullable=False)  # critical, high, elevated, moderate
+    composite_risk = db.Column(db.Float, nullable=False)
+    population = db.Column(db.Integer)
+    coverage_status = db.Column(db.String(20), nullable=False)  # covered, gap
+    payload = db.Column(db.JSON, nullable=False)  # the full prediction dict
+
+    def to_dict(self):
+        return self.payload
@@ -0,0 +1,20 @@
+from app import db
+from datetime import datetime
+
+
+class PredictionSnapshotRun(db.Model):
+    """Marks a day's prediction snapshot as built, and from which inputs."""
+    __tablename__ = "prediction_snapshot_runs"
+
+    snapshot_date = db.Column(db.Date, primary_key=True)
+    input_versions = db.Column(db.JSON, nullable=False)  # cache versions of the model's input tables
+    zones = db.Column(db.Integer, nullable=False, default=0)
+    built_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "snapshot_date": self.snapshot_date.isoformat(),
+            "input_versions": self.input_versions,
+            "zones": self.zones,
+            "built_at": self.built_at.isoformat() if self.built_at else None,
+        }
@@ -4,6 +4,8 @@ from datetime import datetime, date
 
 class Solicitation(db.Model):
     __tablename__ = "solicitations"
+    # Keyset order of GET /solicitations
+    __table_args__ = (db.Index("ix_solicitations_posted_date_id", "posted_date", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
@@ -14,7 +16,7 @@ class Solicitation(db.Model):
     zip_code = db.Column(db.String(10), nullable=False)
     lat = db.Column(db.Float, nullable=False)
     lng = db.Column(db.Float, nullable=False)
-    posted_date = db.Column(db.Date, default=date.today)
+    posted_date = db.Column(db.Date, nullable=False, default=date.today)
     response_deadline = db.Column(db.Date)
     categories = db.Column(db.JSON, default=list)
     estimated_value = db.Column(db.Float)
@@ -24,6 +26,7 @@ class Solicitation(db.Model):
     company_email = db.Column(db.String(200), nullable=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     matches = db.relationship("MatchResult", backref="solicitation", lazy=True)
 
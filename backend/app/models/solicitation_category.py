@@ -0,0 +1,10 @@
+from app import db
+
+
+class SolicitationCategory(db.Model):
+    """One category of a solicitation, mirrored from ``Solicitation.categories``."""
+    __tablename__ = "solicitation_categories"
+    __table_args__ = (db.Index("ix_solicitation_categories_category", "category", "solicitation_id"),)
+
+    solicitation_id = db.Column(db.Integer, db.ForeignKey("solicitations.id", ondelete="CASCADE"), primary_key=True)
+    category = db.Column(db.Text, primary_key=True)
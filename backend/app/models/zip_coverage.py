@@ -0,0 +1,14 @@
+from app import db
+
+
+class ZipCoverage(db.Model):
+    """How many organizations lie within ``radius_miles`` of a monitored ZIP."""
+    __tablename__ = "zip_coverage"
+
+    zip_code = db.Column(
+        db.String(10),
+        db.ForeignKey("zip_need_scores.zip_code", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+    )
+    radius_miles = db.Column(db.Integer, primary_key=True)
+    organizations = db.Column(db.Integer, nullable=False, default=0)
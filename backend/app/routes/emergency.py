@@ -5,6 +5,9 @@ from app import db
 from app.models.emergency_capacity import EmergencyCapacity
 from app.models.organization import Organization
 from app.models.zip_need_score import ZipNeedScore
+from sqlalchemy.orm import selectinload
+from app.services.listing import keyset_page, listing_response, load_fields, project, requested_fields, sort_key
+from app.services.zip_reference import zip_coordinates
 from app.models.user import User
 from datetime import date
 
@@ -52,8 +55,21 @@ def list_capacity():
         if zip_codes:
             query = query.filter(EmergencyCapacity.zip_code.in_(zip_codes))
 
-    items = query.order_by(EmergencyCapacity.created_at.desc()).all()
-    return jsonify([i.to_dict() for i in items])
+    keys = [sort_key(EmergencyCapacity.created_at, descending=True),
+            sort_key(EmergencyCapacity.id, descending=True)]
+    fields = requested_fields(request.args, EmergencyCapacity, extras=("organization",))
+    if fields:
+        query = load_fields(query, EmergencyCapacity, fields, keys, also=("organization_id",))
+    if not fields or "organization" in fields:
+        # One query for all nested organizations instead of one per row
+        query = query.options(selectinload(EmergencyCapacity.organization))
+    items, page = keyset_page(query, keys, request.args)
+    if fields:
+        nested = {"organization": lambda i: i.organization.to_dict() if i.organization else None}
+        rows = [project(i, fields, extras=nested) for i in items]
+    else:
+        rows = [i.to_dict() for i in items]
+    return jsonify(listing_response(rows, page))
 
 
 @emergency_bp.route("/emergency/capacity", methods=["POST"])
@@ -76,10 +92,14 @@ def register_capacity():
     if not org:
         return jsonify({"error": "Organization not found"}), 404
 
-    # Look up lat/lng from zip
-    zip_entry = ZipNeedScore.query.filter_by(zip_code=data["zip_code"]).first()
-    lat = zip_entry.lat if zip_entry else data.get("lat", 0.0)
-    lng = zip_entry.lng if zip_entry else data.get("lng", 0.0)
+    # Look up lat/lng from zip, or explicit coordinates for a ZIP with no centroid
+    coords = zip_coordinates(data["zip_code"])
+    if coords:
+        lat, lng = coords
+    elif data.get("lat") is not None and data.get("lng") is not None:
+        lat, lng = float(data["lat"]), float(data["lng"])
+    else:
+        return jsonify({"error": "unknown zip_code; provide lat and lng"}), 400
 
     user_id = int(get_jwt_identity())
 
@@ -0,0 +1,10 @@
+from flask import Blueprint, jsonify
+from app.models.job import Job
+
+jobs_bp = Blueprint("jobs", __name__)
+
+
+@jobs_bp.route("/jobs/<int:id>", methods=["GET"])
+def get_job(id):
+    job = Job.query.get_or_404(id)
+    return jsonify(job.to_dict())
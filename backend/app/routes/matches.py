@@ -1,6 +1,13 @@
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from app import db
 from app.models.match_result import MatchResult
-from app.services.matching import generate_matches, run_triage
+from app.models.solicitation import Solicitation
+from app.services.listing import keyset_page, load_fields, requested_fields, sort_key
+from app.services.matching import MATCH_EXTRAS, generate_matches, serialize_match_listing
+from app.services.triage import iter_action_plan, plan_triage, run_triage
+from app.services.score_cache import cache_stats
+from app.services.jobs import enqueue, wants_async
 
 matches_bp = Blueprint("matches", __name__)
 
@@ -12,6 +19,11 @@ def trigger_matching():
     if not solicitation_id:
         return jsonify({"error": "solicitation_id required"}), 400
 
+    if wants_async(request.args):
+        if not db.session.get(Solicitation, solicitation_id):
+            return jsonify({"error": "Solicitation not found"}), 404
+        return _accepted(enqueue("generate_matches", {"solicitation_id": solicitation_id}))
+
     results = generate_matches(solicitation_id)
     if isinstance(results, dict) and "error" in results:
         return jsonify(results), 404
@@ -31,11 +43,66 @@ def list_matches():
     if org_id:
         query = query.filter_by(organization_id=int(org_id))
 
-    matches = query.order_by(MatchResult.score.desc()).all()
-    return jsonify([m.to_dict() for m in matches])
+    keys = [sort_key(MatchResult.score, descending=True), sort_key(MatchResult.id)]
+    fields = requested_fields(request.args, MatchResult, extras=MATCH_EXTRAS)
+    if fields:
+        query = load_fields(query, MatchResult, fields, keys, also=("organization_id", "solicitation_id"))
+    matches, page = keyset_page(query, keys, request.args)
+    listing = serialize_match_listing(matches, fields)
+    if page is not None:
+        listing.update(page)
+    return jsonify(listing)
 
 
 @matches_bp.route("/matches/triage", methods=["POST"])
 def trigger_triage():
-    results = run_triage()
+    incremental = request.args.get("mode") == "incremental"
+    if wants_async(request.args):
+        return _accepted(enqueue("triage", {"incremental": incremental}))
+    results = run_triage(incremental=incremental)
     return jsonify(results)
+
+
+@matches_bp.route("/matches/triage/stream", methods=["POST"])
+def stream_triage():
+    """Triage as a stream: one action-plan entry per line as soon as it is matched.
+
+    NDJSON by default; ``?format=sse`` sends Server-Sent Events instead. A
+    ``start`` record carries the totals and an ``end`` record closes the plan.
+    """
+    sse = request.args.get("format") == "sse"
+    ranked, stale = plan_triage(incremental=request.args.get("mode") == "incremental")
+
+    def records():
+        yield "start", {"total_open": len(ranked), "rematched": len(stale)}
+        count = 0
+        for entry in iter_action_plan(ranked, stale):
+            count += 1
+            yield "entry", entry
+        yield "end", {"total_solicitations": count, "rematched": len(stale)}
+
+    def encode():
+        for kind, payload in records():
+            if sse:
+                yield f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+            else:
+                yield json.dumps({"type": kind, **payload}) + "\n"
+
+    return Response(
+        stream_with_context(encode()),
+        mimetype="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _accepted(job):
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+    }), 202
+
+
+@matches_bp.route("/matches/cache-stats", methods=["GET"])
+def score_cache_stats():
+    return jsonify(cache_stats())
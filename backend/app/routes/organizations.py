@@ -2,7 +2,9 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.organization import Organization
-from app.models.zip_need_score import ZipNeedScore
+from app.services.listing import keyset_page, listing_response, load_fields, project, requested_fields, sort_key
+from app.services.term_links import with_term
+from app.services.zip_reference import zip_coordinates
 from app.models.user import User
 
 organizations_bp = Blueprint("organizations", __name__)
@@ -18,14 +20,19 @@ def list_organizations():
 
     capability = request.args.get("capability")
     if capability:
-        query = query.filter(Organization.capabilities.like(f'%"{capability}"%'))
+        query = with_term(query, Organization, "capabilities", capability)
 
     zip_code = request.args.get("zip")
     if zip_code:
         query = query.filter_by(zip_code=zip_code)
 
-    orgs = query.order_by(Organization.name).all()
-    return jsonify([o.to_dict() for o in orgs])
+    keys = [sort_key(Organization.name), sort_key(Organization.id)]
+    fields = requested_fields(request.args, Organization)
+    if fields:
+        query = load_fields(query, Organization, fields, keys)
+    orgs, page = keyset_page(query, keys, request.args)
+    items = [project(o, fields) for o in orgs] if fields else [o.to_dict() for o in orgs]
+    return jsonify(listing_response(items, page))
 
 
 @organizations_bp.route("/organizations", methods=["POST"])
@@ -43,13 +50,14 @@ def create_organization():
     if data["org_type"] not in ("supplier", "distributor", "nonprofit"):
         return jsonify({"error": "org_type must be supplier, distributor, or nonprofit"}), 400
 
-    # Look up lat/lng from zip code
-    zip_entry = ZipNeedScore.query.filter_by(zip_code=data["zip_code"]).first()
-    if zip_entry:
-        lat, lng = zip_entry.lat, zip_entry.lng
+    # Look up lat/lng from zip code, or explicit coordinates for a ZIP with no centroid
+    coords = zip_coordinates(data["zip_code"])
+    if coords:
+        lat, lng = coords
+    elif data.get("lat") is not None and data.get("lng") is not None:
+        lat, lng = float(data["lat"]), float(data["lng"])
     else:
-        lat = data.get("lat", 0.0)
-        lng = data.get("lng", 0.0)
+        return jsonify({"error": "unknown zip_code; provide lat and lng"}), 400
 
     org = Organization(
         name=data["name"],
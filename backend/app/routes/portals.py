@@ -1,11 +1,17 @@
 """Portal APIs — tailored views for suppliers, vendors, and federal/nonprofit clients."""
-import math
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from app import db
 from app.models.organization import Organization
 from app.models.solicitation import Solicitation
-from app.models.zip_need_score import ZipNeedScore
-from app.models.emergency_capacity import EmergencyCapacity
+from app.services.capacity_summary import available_capacity_items, capacity_summary
+from app.services.capabilities import overlap_percent, overlap_terms, term_mask
+from app.services.geo import coords_radians, distances_from
+from app.services.listing import keyset_page, load_fields, project, requested_fields, sort_key
+from app.services.org_pairs import org_pairs
+from app.services.ranking import TopK, top_k, top_k_pairs
+from app.services.solicitation_index import open_solicitations_sharing
+from app.services.term_links import with_term, with_term_containing
+from app.services.zip_reference import DEFAULT_NEED_SCORE, resolve_zip, zip_need_score
 
 portals_bp = Blueprint("portals", __name__)
 
@@ -17,24 +23,79 @@ ESSENTIAL_CATEGORIES = {
 }
 
 
-def haversine(lat1, lng1, lat2, lng2):
-    R = 3959
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-         math.sin(dlng / 2) ** 2)
-    return R * 2 * math.asin(math.sqrt(a))
-
-
 def capability_overlap(list_a, list_b):
     if not list_a or not list_b:
         return 0, []
-    set_a = set(c.lower().strip() for c in list_a)
-    set_b = set(c.lower().strip() for c in list_b)
-    overlap = set_a & set_b
-    score = (len(overlap) / max(len(set_a), 1)) * 100 if set_a else 0
-    return round(score, 1), list(overlap)
+    mask_a = term_mask(list_a)
+    common = mask_a & term_mask(list_b)
+    return round(overlap_percent(mask_a, common), 1), overlap_terms(common)
+
+
+def partner_overlaps(categories, partners, keep):
+    """``(position, capability_match, overlapping)`` for the ``keep`` members of
+    a cached ``RoleSet`` that best cover ``categories``, ties in id order."""
+    sol_mask = term_mask(categories)
+    scores = [round(s, 1) for s in partners.overlap_percents(sol_mask).tolist()]
+    order = top_k(range(len(scores)), keep, key=lambda i: scores[i])
+    return [(i, scores[i], overlap_terms(sol_mask & partners.masks[i])) for i in order]
+
+
+def role_overlaps(categories, members):
+    """Rounded coverage of ``categories`` by every member of a cached ``RoleSet``,
+    0 for members (or requests) without any terms, as ``capability_overlap``."""
+    if not categories:
+        return [0] * len(members)
+    scores = members.overlap_percents(term_mask(categories)).tolist()
+    return [round(score, 1) if mask else 0 for score, mask in zip(scores, members.masks)]
+
+
+def load_partners(ids):
+    """``{id: Organization}`` for the partners that made it into a response."""
+    if not ids:
+        return {}
+    return {o.id: o for o in Organization.query.filter(Organization.id.in_(ids)).all()}
+
+
+def candidate_solicitations(org):
+    """Open solicitations sharing a category with ``org``.
+
+    Every open solicitation is scored when the request sets
+    ``include_zero_overlap``, or when nothing overlaps at all, so a portal
+    never comes back empty just because capability names don't line up.
+    """
+    if request.args.get("include_zero_overlap", "").lower() not in ("1", "true", "yes"):
+        sharing = open_solicitations_sharing(org.capabilities)
+        if sharing:
+            return sharing
+    return Solicitation.query.filter_by(status="open").order_by(Solicitation.id).all()
+
+
+def rank_solicitations_for(org, solicitations, org_to_sol, keep=25):
+    """The ``keep`` best ``(index, capability_match, need_score, match_score)``
+    solicitations for ``org`` by capability, distance and need — no hard cutoffs."""
+    org_mask = term_mask(org.capabilities)
+    ranked = TopK(keep)
+    for j, sol in enumerate(solicitations):
+        cap_score = round(overlap_percent(term_mask(sol.categories), org_mask), 1)
+        need_score = zip_need_score(sol.zip_code, default=50)
+        dist_score = max(0, (1 - float(org_to_sol[j]) / 3000)) * 100
+        composite = cap_score * 0.4 + dist_score * 0.3 + need_score * 0.3
+        match_score = round(min(100, composite), 1)
+        ranked.push(match_score, (j, cap_score, need_score, match_score))
+    return ranked.items()
+
+
+def solicitation_match(sol, org, distance, need_score, match_score):
+    """Portal entry for one ranked solicitation (partners are added by the caller)."""
+    cap_score, overlapping = capability_overlap(sol.categories, org.capabilities)
+    return {
+        "solicitation": sol.to_dict(),
+        "match_score": match_score,
+        "capability_match": cap_score,
+        "overlapping_capabilities": overlapping,
+        "distance_miles": round(distance, 1),
+        "need_score": need_score,
+    }
 
 
 # ─── SUPPLIER PORTAL ───────────────────────────────────────────
@@ -45,51 +106,42 @@ def supplier_matches(org_id):
     if supplier.org_type != "supplier":
         return jsonify({"error": "Organization is not a supplier"}), 400
 
-    solicitations = Solicitation.query.filter_by(status="open").all()
-    distributors = Organization.query.filter_by(org_type="distributor").all()
+    solicitations = candidate_solicitations(supplier)
+    pairs = org_pairs.get()
+    distributors = pairs.distributors
 
-    sol_matches = []
-    for sol in solicitations:
-        dist = haversine(supplier.lat, supplier.lng, sol.lat, sol.lng)
-        cap_score, overlapping = capability_overlap(sol.categories, supplier.capabilities)
-
-        # Find distributors that can bridge supplier → solicitation
-        dist_partners = []
-        for d in distributors:
-            d_to_sol = haversine(d.lat, d.lng, sol.lat, sol.lng)
-            d_to_sup = haversine(d.lat, d.lng, supplier.lat, supplier.lng)
-            d_cap, d_overlap = capability_overlap(sol.categories, d.capabilities)
-            dist_partners.append({
-                "distributor": d.to_dict(),
-                "distance_to_solicitation": round(d_to_sol, 1),
-                "distance_to_supplier": round(d_to_sup, 1),
-                "capability_match": d_cap,
-                "overlapping_capabilities": d_overlap,
-            })
-        dist_partners.sort(key=lambda x: x["capability_match"], reverse=True)
-
-        need = ZipNeedScore.query.filter_by(zip_code=sol.zip_code).first()
-        need_score = need.need_score if need else 50
-
-        # Score: capability, distance, need — no hard cutoffs
-        dist_score = max(0, (1 - dist / 3000)) * 100
-        composite = cap_score * 0.4 + dist_score * 0.3 + need_score * 0.3
-        sol_matches.append({
-            "solicitation": sol.to_dict(),
-            "match_score": round(min(100, composite), 1),
-            "capability_match": cap_score,
-            "overlapping_capabilities": overlapping,
-            "distance_miles": round(dist, 1),
-            "need_score": need_score,
-            "distributor_partners": dist_partners[:5],
-        })
+    sol_lat, sol_lng = coords_radians(solicitations)
+    sup_to_sol = distances_from(supplier.lat, supplier.lng, sol_lat, sol_lng)
+    d_to_sup_all = pairs.supplier_row(supplier.id, supplier.lat, supplier.lng)
+
+    # Find distributors that can bridge supplier → solicitation
+    ranked = [
+        (j, need_score, match_score, partner_overlaps(solicitations[j].categories, distributors, 5))
+        for j, _, need_score, match_score in rank_solicitations_for(supplier, solicitations, sup_to_sol)
+    ]
+    partner_dicts = {
+        org_id: o.to_dict()
+        for org_id, o in load_partners({distributors.ids[i] for *_, partners in ranked for i, _, _ in partners}).items()
+    }
 
-    sol_matches.sort(key=lambda x: x["match_score"], reverse=True)
+    sol_matches = []
+    for j, need_score, match_score, partners in ranked:
+        sol = solicitations[j]
+        d_to_sol = distances_from(sol.lat, sol.lng, distributors.lat, distributors.lng)
+        entry = solicitation_match(sol, supplier, float(sup_to_sol[j]), need_score, match_score)
+        entry["distributor_partners"] = [{
+            "distributor": partner_dicts[distributors.ids[i]],
+            "distance_to_solicitation": round(float(d_to_sol[i]), 1),
+            "distance_to_supplier": round(float(d_to_sup_all[i]), 1),
+            "capability_match": d_cap,
+            "overlapping_capabilities": d_overlap,
+        } for i, d_cap, d_overlap in partners]
+        sol_matches.append(entry)
 
     return jsonify({
         "supplier": supplier.to_dict(),
-        "matched_solicitations": sol_matches[:25],
-        "total_matches": len(sol_matches),
+        "matched_solicitations": sol_matches,
+        "total_matches": len(solicitations),
     })
 
 
@@ -101,52 +153,42 @@ def distributor_matches(org_id):
     if distributor.org_type != "distributor":
         return jsonify({"error": "Organization is not a distributor"}), 400
 
-    solicitations = Solicitation.query.filter_by(status="open").all()
-    suppliers = Organization.query.filter_by(org_type="supplier").all()
+    solicitations = candidate_solicitations(distributor)
+    pairs = org_pairs.get()
+    suppliers = pairs.suppliers
+
+    sol_lat, sol_lng = coords_radians(solicitations)
+    dist_to_sol = distances_from(distributor.lat, distributor.lng, sol_lat, sol_lng)
+    s_to_dist_all = pairs.distributor_column(distributor.id, distributor.lat, distributor.lng)
+
+    # Find suppliers that can provide goods for this solicitation
+    ranked = [
+        (j, need_score, match_score, partner_overlaps(solicitations[j].categories, suppliers, 5))
+        for j, _, need_score, match_score in rank_solicitations_for(distributor, solicitations, dist_to_sol)
+    ]
+    partner_dicts = {
+        org_id: o.to_dict()
+        for org_id, o in load_partners({suppliers.ids[i] for *_, partners in ranked for i, _, _ in partners}).items()
+    }
+    capacity = capacity_summary.get()
 
     sol_matches = []
-    for sol in solicitations:
-        dist = haversine(distributor.lat, distributor.lng, sol.lat, sol.lng)
-        cap_score, overlapping = capability_overlap(sol.categories, distributor.capabilities)
-
-        # Find suppliers that can provide goods for this solicitation
-        sup_partners = []
-        for s in suppliers:
-            s_to_dist = haversine(s.lat, s.lng, distributor.lat, distributor.lng)
-            s_cap, s_overlap = capability_overlap(sol.categories, s.capabilities)
-            caps = EmergencyCapacity.query.filter_by(
-                organization_id=s.id, status="available"
-            ).all()
-            sup_partners.append({
-                "supplier": s.to_dict(),
-                "distance_to_distributor": round(s_to_dist, 1),
-                "capability_match": s_cap,
-                "overlapping_capabilities": s_overlap,
-                "pre_registered_capacity": len(caps),
-            })
-        sup_partners.sort(key=lambda x: x["capability_match"], reverse=True)
-
-        need = ZipNeedScore.query.filter_by(zip_code=sol.zip_code).first()
-        need_score = need.need_score if need else 50
-
-        dist_score = max(0, (1 - dist / 3000)) * 100
-        composite = cap_score * 0.4 + dist_score * 0.3 + need_score * 0.3
-        sol_matches.append({
-            "solicitation": sol.to_dict(),
-            "match_score": round(min(100, composite), 1),
-            "capability_match": cap_score,
-            "overlapping_capabilities": overlapping,
-            "distance_miles": round(dist, 1),
-            "need_score": need_score,
-            "supplier_partners": sup_partners[:5],
-        })
-
-    sol_matches.sort(key=lambda x: x["match_score"], reverse=True)
+    for j, need_score, match_score, partners in ranked:
+        sol = solicitations[j]
+        entry = solicitation_match(sol, distributor, float(dist_to_sol[j]), need_score, match_score)
+        entry["supplier_partners"] = [{
+            "supplier": partner_dicts[suppliers.ids[i]],
+            "distance_to_distributor": round(float(s_to_dist_all[i]), 1),
+            "capability_match": s_cap,
+            "overlapping_capabilities": s_overlap,
+            "pre_registered_capacity": capacity.count(suppliers.ids[i]),
+        } for i, s_cap, s_overlap in partners]
+        sol_matches.append(entry)
 
     return jsonify({
         "distributor": distributor.to_dict(),
-        "matched_solicitations": sol_matches[:25],
-        "total_matches": len(sol_matches),
+        "matched_solicitations": sol_matches,
+        "total_matches": len(solicitations),
     })
 
 
@@ -165,21 +207,24 @@ def federal_vendor_list():
     if small_business == "true":
         query = query.filter_by(small_business=True)
 
-    vendors = query.all()
-
     if naics:
-        vendors = [v for v in vendors if naics in (v.naics_codes or [])]
-
+        query = with_term(query, Organization, "naics_codes", naics)
     if capability:
-        cap_lower = capability.lower()
-        vendors = [
-            v for v in vendors
-            if any(cap_lower in c.lower() for c in (v.capabilities or []))
-        ]
-
+        query = with_term_containing(query, Organization, "capabilities", capability)
+
+    keys = [sort_key(Organization.id)]
+    fields = requested_fields(request.args, Organization)
+    if fields:
+        query = load_fields(query, Organization, fields, keys)
+    vendors, page = keyset_page(query, keys, request.args)
+    items = [project(v, fields) for v in vendors] if fields else [v.to_dict() for v in vendors]
+
+    if page is not None:
+        # A page carries a cursor instead of a table-wide count
+        return jsonify({"vendors": items, **page})
     return jsonify({
-        "vendors": [v.to_dict() for v in vendors],
-        "total": len(vendors),
+        "vendors": items,
+        "total": len(items),
     })
 
 
@@ -203,88 +248,101 @@ def federal_tri_match():
     if essential_category and essential_category in ESSENTIAL_CATEGORIES:
         cap_supply_filter = ESSENTIAL_CATEGORIES[essential_category]
 
-    zip_entry = ZipNeedScore.query.filter_by(zip_code=dest_zip).first()
-    # If ZIP not found, pick the closest one we have
-    if not zip_entry:
-        all_zips = ZipNeedScore.query.all()
-        if all_zips:
-            zip_entry = all_zips[0]  # fallback to first
-    dest_lat = zip_entry.lat if zip_entry else 35.0
-    dest_lng = zip_entry.lng if zip_entry else -90.0
-    need_score = zip_entry.need_score if zip_entry else 50
-
-    suppliers = Organization.query.filter_by(org_type="supplier").all()
-    distributors = Organization.query.filter_by(org_type="distributor").all()
-
-    # Get regional capacity for this destination
-    cap_query = EmergencyCapacity.query.filter_by(status="available")
-    if cap_supply_filter:
-        cap_query = cap_query.filter(EmergencyCapacity.supply_type.in_(cap_supply_filter))
-    regional_capacity = cap_query.all()
-    capacity_by_org = {}
-    for cap in regional_capacity:
-        if cap.organization_id not in capacity_by_org:
-            capacity_by_org[cap.organization_id] = []
-        capacity_by_org[cap.organization_id].append({
-            "supply_type": cap.supply_type,
-            "item_name": cap.item_name,
-            "quantity": cap.quantity,
-            "unit": cap.unit,
-        })
+    # Untracked ZIPs resolve through the centroid file to the nearest tracked ZIP
+    resolved = resolve_zip(dest_zip)
+    if resolved is None:
+        return jsonify({"error": "unknown destination_zip"}), 400
+    dest_lat, dest_lng = resolved.lat, resolved.lng
+    zip_entry = resolved.nearest
+    need_score = zip_entry.need_score if zip_entry else DEFAULT_NEED_SCORE
+    # City/state only when the destination is itself a tracked ZIP
+    tracked = resolved.source == "monitored"
+
+    pairs = org_pairs.get()
+    suppliers, distributors = pairs.suppliers, pairs.distributors
+
+    # Regional capacity listings per supplier, for this destination's supply filter
+    capacity = capacity_summary.get()
+
+    s_dists = distances_from(dest_lat, dest_lng, suppliers.lat, suppliers.lng).tolist()
+    d_dists = distances_from(dest_lat, dest_lng, distributors.lat, distributors.lng).tolist()
+
+    # Overlap depends only on the organization, so score each one once
+    s_caps = role_overlaps(categories, suppliers)
+    d_caps = role_overlaps(categories, distributors)
+    s_terms = [max(0, (1 - dist / 3000)) * 100 * 0.2 for dist in s_dists]
+    d_terms = [max(0, (1 - dist / 3000)) * 100 * 0.2 for dist in d_dists]
+
+    # Boost score if supplier has pre-registered emergency capacity
+    bonuses = []
+    for org_id in suppliers.ids:
+        listings = capacity.count(org_id, cap_supply_filter or None)
+        bonuses.append(min(10, listings * 2) if listings else 0)
+
+    def combo_score(i, j):
+        # Score everything — no hard cutoffs
+        score = (
+            s_caps[i] * 0.25 + d_caps[j] * 0.15 +
+            s_terms[i] +
+            d_terms[j] +
+            need_score * 0.2
+        )
+        return round(min(100, score + bonuses[i]), 1)
+
+    # The score splits into a supplier part (bonus included), a distributor
+    # part and a constant, so pairs are searched best-bound first
+    ranked = top_k_pairs(
+        [s_caps[i] * 0.25 + s_terms[i] + bonuses[i] + need_score * 0.2 for i in range(len(suppliers))],
+        [d_caps[j] * 0.15 + d_terms[j] for j in range(len(distributors))],
+        25,
+        combo_score,
+        key=lambda total: round(min(100, total), 1),
+        # Full scan for comparison in tests only; it is the cost this search avoids
+        brute_force=current_app.config["TESTING"] and bool(data.get("brute_force")),
+    )
+    winners = ranked.items()
+    winner_ids = {suppliers.ids[i] for i, _ in winners} | {distributors.ids[j] for _, j in winners}
+    orgs = load_partners(winner_ids)
+    capacity_items = available_capacity_items({suppliers.ids[i] for i, _ in winners}, cap_supply_filter)
 
     combos = []
-    for s in suppliers:
-        s_dist = haversine(dest_lat, dest_lng, s.lat, s.lng)
-        s_cap, s_overlap = capability_overlap(categories, s.capabilities)
-
-        for d in distributors:
-            d_dist = haversine(dest_lat, dest_lng, d.lat, d.lng)
-            d_to_s = haversine(d.lat, d.lng, s.lat, s.lng)
-            d_cap, d_overlap = capability_overlap(categories, d.capabilities)
-
-            # Score everything — no hard cutoffs
-            combo_score = (
-                s_cap * 0.25 + d_cap * 0.15 +
-                max(0, (1 - s_dist / 3000)) * 100 * 0.2 +
-                max(0, (1 - d_dist / 3000)) * 100 * 0.2 +
-                need_score * 0.2
-            )
-
-            transport_cost = d_dist * 2.0 + d_to_s * 1.5
-            past_perf_score = min(100, len(s.past_performance or []) * 25 + len(d.past_performance or []) * 25)
-
-            # Boost score if supplier has pre-registered emergency capacity
-            s_capacity = capacity_by_org.get(s.id, [])
-            capacity_bonus = min(10, len(s_capacity) * 2) if s_capacity else 0
-            combo_score += capacity_bonus
-
-            combos.append({
-                "supplier": s.to_dict(),
-                "distributor": d.to_dict(),
-                "combo_score": round(min(100, combo_score), 1),
-                "supplier_capability_match": s_cap,
-                "distributor_capability_match": d_cap,
-                "supplier_distance": round(s_dist, 1),
-                "distributor_distance": round(d_dist, 1),
-                "supplier_to_distributor_distance": round(d_to_s, 1),
-                "estimated_transport_cost": round(transport_cost, 2),
-                "past_performance_score": past_perf_score,
-                "combined_certifications": list(set(
-                    (s.certifications or []) + (d.certifications or [])
-                )),
-                "supplier_capacity": s_capacity,
-            })
-
-    combos.sort(key=lambda x: x["combo_score"], reverse=True)
+    for i, j in winners:
+        s, d = orgs[suppliers.ids[i]], orgs[distributors.ids[j]]
+        s_dist = s_dists[i]
+        d_dist = d_dists[j]
+        d_to_s = pairs.distance(s, d)
+
+        transport_cost = d_dist * 2.0 + d_to_s * 1.5
+        past_perf_score = min(100, len(s.past_performance or []) * 25 + len(d.past_performance or []) * 25)
+
+        combos.append({
+            "supplier": s.to_dict(),
+            "distributor": d.to_dict(),
+            "combo_score": combo_score(i, j),
+            "supplier_capability_match": s_caps[i],
+            "distributor_capability_match": d_caps[j],
+            "supplier_distance": round(s_dist, 1),
+            "distributor_distance": round(d_dist, 1),
+            "supplier_to_distributor_distance": round(d_to_s, 1),
+            "estimated_transport_cost": round(transport_cost, 2),
+            "past_performance_score": past_perf_score,
+            "combined_certifications": list(set(
+                (s.certifications or []) + (d.certifications or [])
+            )),
+            "supplier_capacity": capacity_items.get(s.id, []),
+        })
 
     return jsonify({
         "destination": {
             "zip_code": dest_zip,
-            "city": zip_entry.city if zip_entry else None,
-            "state": zip_entry.state if zip_entry else None,
+            "city": zip_entry.city if tracked else None,
+            "state": zip_entry.state if tracked else None,
             "need_score": need_score,
+            "resolved_via": resolved.source,
+            "nearest_monitored_zip": zip_entry.zip_code if zip_entry else None,
         },
         "categories": categories,
-        "matches": combos[:25],
-        "total_combos_evaluated": len(combos),
+        "matches": combos,
+        "total_combos_evaluated": len(suppliers) * len(distributors),
+        "combos_scored": len(ranked),
     })
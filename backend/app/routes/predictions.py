@@ -1,44 +1,26 @@
 from flask import Blueprint, request, jsonify
+from app.models.prediction_snapshot import PredictionSnapshot
 from app.services.prediction_model import (
-    predict_food_insecurity,
     find_surplus_shortage_matches,
     get_waste_reduction_stats,
 )
+from app.services.prediction_snapshots import ensure_snapshot, snapshot_query, snapshot_summary
 
 predictions_bp = Blueprint("predictions", __name__)
 
 
 @predictions_bp.route("/predictions/food-insecurity", methods=["GET"])
 def food_insecurity_predictions():
-    """ML model predictions for food insecurity across all monitored zones."""
-    predictions = predict_food_insecurity()
-
-    # Optional filter by severity
-    severity = request.args.get("severity")
-    if severity:
-        predictions = [p for p in predictions if p["severity"] == severity]
-
-    # Optional filter by state
-    state = request.args.get("state")
-    if state:
-        predictions = [p for p in predictions if p["state"] == state.upper()]
-
-    # Summary stats
-    critical = [p for p in predictions if p["severity"] == "critical"]
-    high = [p for p in predictions if p["severity"] == "high"]
-    total_at_risk = sum(p["population"] for p in critical + high)
+    """ML model predictions for food insecurity across all monitored zones.
 
+    Served from the day's prediction snapshot, rebuilt only when missing or
+    when one of the model's input tables changed."""
+    day = ensure_snapshot()
+    query = snapshot_query(day, severity=request.args.get("severity"), state=request.args.get("state"))
+    predictions = [payload for (payload,) in query.order_by(PredictionSnapshot.rank).with_entities(PredictionSnapshot.payload)]
     return jsonify({
         "predictions": predictions,
-        "summary": {
-            "total_zones": len(predictions),
-            "critical": len(critical),
-            "high": len(high),
-            "elevated": len([p for p in predictions if p["severity"] == "elevated"]),
-            "moderate": len([p for p in predictions if p["severity"] == "moderate"]),
-            "total_population_at_risk": total_at_risk,
-            "coverage_gaps": len([p for p in predictions if p["coverage_status"] == "gap"]),
-        },
+        "summary": snapshot_summary(query),
     })
 
 
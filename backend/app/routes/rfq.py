@@ -1,22 +1,16 @@
 import math
-import random
 from flask import Blueprint, request, jsonify
 from app import db
 from app.models.organization import Organization
-from app.models.emergency_capacity import EmergencyCapacity
-from app.models.zip_need_score import ZipNeedScore
+from app.services.zip_reference import resolve_zip
+from app.services.capacity_summary import capacity_summary
+from app.services.geo import coords_radians, distance_matrix, distances_from, to_radians
+from app.services.ranking import TopK
+from app.services.stable_random import stable_draws
 
 rfq_bp = Blueprint("rfq", __name__)
 
 
-def haversine(lat1, lng1, lat2, lng2):
-    R = 3959
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
-    return R * 2 * math.asin(math.sqrt(a))
-
-
 # Base cost estimates per unit by supply type
 BASE_COSTS = {
     "water": {"unit": "gallon", "cost": 1.50, "weight_lbs": 8.34},
@@ -86,6 +80,30 @@ def calculate_transport_cost(distance_miles, total_weight_lbs, needs_refrigerati
     }
 
 
+def price_supplier_items(supplier, line_items, capacity, price_factor):
+    """Per-item quote lines for one supplier: base * factor, discounted if in-stock."""
+    item_quotes = []
+    for li in line_items:
+        st = li["supply_type"]
+        # Check if supplier has this item in stock
+        in_stock = capacity.count(supplier.id, [st]) > 0
+        stock_qty = capacity.quantity(supplier.id, [st]) if in_stock else 0
+
+        unit_price = round(li["unit_cost"] * price_factor * (0.92 if in_stock else 1.0), 2)
+        item_quotes.append({
+            "supply_type": st,
+            "description": li["description"],
+            "quantity": li["quantity"],
+            "unit": li["unit"],
+            "unit_price": unit_price,
+            "line_total": round(unit_price * li["quantity"], 2),
+            "in_stock": in_stock,
+            "stock_available": stock_qty,
+            "weight_lbs": li["weight_lbs"],
+        })
+    return item_quotes
+
+
 @rfq_bp.route("/rfq/estimate", methods=["POST"])
 def generate_rfq():
     """Generate sample RFQ with per-vendor quotes based on market rate data.
@@ -100,11 +118,18 @@ def generate_rfq():
     if not dest_zip or not items:
         return jsonify({"error": "destination_zip and items are required"}), 400
 
-    zip_entry = ZipNeedScore.query.filter_by(zip_code=dest_zip).first()
-    dest_lat = zip_entry.lat if zip_entry else float(data.get("lat", 0))
-    dest_lng = zip_entry.lng if zip_entry else float(data.get("lng", 0))
-    dest_city = zip_entry.city if zip_entry else "Unknown"
-    dest_state = zip_entry.state if zip_entry else "Unknown"
+    resolved = resolve_zip(dest_zip)
+    if resolved:
+        dest_lat, dest_lng = resolved.lat, resolved.lng
+    elif data.get("lat") is not None and data.get("lng") is not None:
+        dest_lat, dest_lng = float(data["lat"]), float(data["lng"])
+    else:
+        return jsonify({"error": "unknown destination_zip"}), 400
+    # Need comes from the nearest tracked ZIP; city/state only when it is the ZIP itself
+    zip_entry = resolved.nearest if resolved else None
+    tracked = resolved is not None and resolved.source == "monitored"
+    dest_city = zip_entry.city if tracked else "Unknown"
+    dest_state = zip_entry.state if tracked else "Unknown"
 
     # Build line items with weight
     line_items = []
@@ -138,50 +163,28 @@ def generate_rfq():
     distributors = Organization.query.filter_by(org_type="distributor").all()
 
     # Pre-registered capacity
-    supply_types_needed = [i["supply_type"] for i in items if i.get("supply_type")]
-    capacities = EmergencyCapacity.query.filter(
-        EmergencyCapacity.supply_type.in_(supply_types_needed),
-        EmergencyCapacity.status == "available",
-    ).all() if supply_types_needed else []
+    capacity = capacity_summary.get()
 
     # Build SUPPLIER quotes — each has different pricing
-    supplier_quotes = []
-    for s in suppliers:
-        dist = haversine(dest_lat, dest_lng, s.lat, s.lng)
+    s_lat, s_lng = coords_radians(suppliers)
+    supplier_dists = distances_from(dest_lat, dest_lng, s_lat, s_lng)
+
+    # Rank on the cheap totals first; full quote payloads are built only for the winners
+    ranked_suppliers = TopK(10, largest=False)
+    for s, dist in zip(suppliers, supplier_dists.tolist()):
         if dist > s.service_radius_miles * 1.5:
             continue
 
         # Each supplier has unique pricing multiplier based on their profile
-        random.seed(hash(s.name + dest_zip))
-        price_factor = 0.85 + random.random() * 0.35  # 0.85x to 1.20x of base
-
-        # Per-item pricing for this supplier
-        item_quotes = []
-        supplier_total = 0
-        for li in line_items:
-            st = li["supply_type"]
-            # Check if supplier has this item in stock
-            sup_caps = [c for c in capacities if c.organization_id == s.id and c.supply_type == st]
-            in_stock = len(sup_caps) > 0
-            stock_qty = sum(c.quantity for c in sup_caps) if in_stock else 0
-
-            # Price varies per supplier: base * factor, discounted if in-stock
-            unit_price = round(li["unit_cost"] * price_factor * (0.92 if in_stock else 1.0), 2)
-            item_total = round(unit_price * li["quantity"], 2)
-            supplier_total += item_total
-
-            item_quotes.append({
-                "supply_type": st,
-                "description": li["description"],
-                "quantity": li["quantity"],
-                "unit": li["unit"],
-                "unit_price": unit_price,
-                "line_total": item_total,
-                "in_stock": in_stock,
-                "stock_available": stock_qty,
-                "weight_lbs": li["weight_lbs"],
-            })
+        (price_draw,) = stable_draws("supplier", s.name, dest_zip)
+        price_factor = 0.85 + price_draw * 0.35  # 0.85x to 1.20x of base
 
+        priced = price_supplier_items(s, line_items, capacity, price_factor)
+        supplier_total = sum(p["line_total"] for p in priced)
+        ranked_suppliers.push(round(supplier_total, 2), (s, dist, priced, supplier_total))
+
+    supplier_quotes = []
+    for s, dist, item_quotes, supplier_total in ranked_suppliers.items():
         # Capability match
         cap_count = 0
         for item in items:
@@ -203,18 +206,18 @@ def generate_rfq():
             "estimated_lead_days": max(1, int(dist / 300) + 1),
         })
 
-    supplier_quotes.sort(key=lambda v: v["supply_subtotal"])
-
     # Build DISTRIBUTOR quotes — transport pricing based on market rates
-    distributor_quotes = []
-    for d in distributors:
-        dist = haversine(dest_lat, dest_lng, d.lat, d.lng)
+    d_lat, d_lng = coords_radians(distributors)
+    distributor_dists = distances_from(dest_lat, dest_lng, d_lat, d_lng)
+
+    ranked_distributors = TopK(10, largest=False)
+    for d, dist in zip(distributors, distributor_dists.tolist()):
         if dist > d.service_radius_miles * 1.5:
             continue
 
         # Each distributor has fleet efficiency factor
-        random.seed(hash(d.name + dest_zip))
-        efficiency = 0.90 + random.random() * 0.25  # 0.90x to 1.15x
+        efficiency_draw, fee_draw, markup_draw = stable_draws("distributor", d.name, dest_zip, n=3)
+        efficiency = 0.90 + efficiency_draw * 0.25  # 0.90x to 1.15x
 
         transport = calculate_transport_cost(dist, total_weight, needs_refrigeration)
 
@@ -222,13 +225,19 @@ def generate_rfq():
         adjusted_transport = round(transport["total_transport"] * efficiency, 2)
 
         # Handling fee (per-lb fee for loading/unloading/warehousing)
-        handling_fee = round(total_weight * (0.08 + random.random() * 0.06), 2)  # $0.08-$0.14/lb
+        handling_fee = round(total_weight * (0.08 + fee_draw * 0.06), 2)  # $0.08-$0.14/lb
 
         # Distributor markup on goods (if they source too)
-        markup_pct = round(3 + random.random() * 8, 1)  # 3-11% markup
+        markup_pct = round(3 + markup_draw * 8, 1)  # 3-11% markup
 
         total_distributor_cost = adjusted_transport + handling_fee
+        ranked_distributors.push(
+            round(total_distributor_cost, 2),
+            (d, dist, transport, adjusted_transport, handling_fee, markup_pct, total_distributor_cost),
+        )
 
+    distributor_quotes = []
+    for d, dist, transport, adjusted_transport, handling_fee, markup_pct, total_distributor_cost in ranked_distributors.items():
         distributor_quotes.append({
             "organization": d.to_dict(),
             "role": "distributor",
@@ -252,27 +261,36 @@ def generate_rfq():
             "fleet_type": transport["truck_type"],
         })
 
-    distributor_quotes.sort(key=lambda v: v["total_logistics_cost"])
-
     # Build combo comparisons (supplier + distributor pairs)
+    top_suppliers = supplier_quotes[:8]
+    top_distributors = distributor_quotes[:8]
+    s_to_d_all = distance_matrix(
+        *to_radians([sq["organization"]["lat"] for sq in top_suppliers],
+                    [sq["organization"]["lng"] for sq in top_suppliers]),
+        *to_radians([dq["organization"]["lat"] for dq in top_distributors],
+                    [dq["organization"]["lng"] for dq in top_distributors]),
+    )
+    ranked_combos = TopK(15, largest=False)
+    for i, sq in enumerate(top_suppliers):
+        for j, dq in enumerate(top_distributors):
+            combo_total = round(sq["supply_subtotal"] + dq["total_logistics_cost"], 2)
+            ranked_combos.push(combo_total, (i, j, combo_total))
+
     combos = []
-    for sq in supplier_quotes[:8]:
-        for dq in distributor_quotes[:8]:
-            s_to_d = haversine(sq["organization"]["lat"], sq["organization"]["lng"],
-                               dq["organization"]["lat"], dq["organization"]["lng"])
-            combo_total = sq["supply_subtotal"] + dq["total_logistics_cost"]
-            combos.append({
-                "supplier": {"name": sq["organization"]["name"], "uei": sq["organization"].get("uei"),
-                             "supply_cost": sq["supply_subtotal"], "distance": sq["distance_miles"],
-                             "has_inventory": sq["has_inventory"], "lead_days": sq["estimated_lead_days"]},
-                "distributor": {"name": dq["organization"]["name"], "uei": dq["organization"].get("uei"),
-                                "logistics_cost": dq["total_logistics_cost"], "distance": dq["distance_miles"],
-                                "transit_days": dq["estimated_transit_days"], "trucks": dq["trucks_needed"]},
-                "total_cost": round(combo_total, 2),
-                "total_delivery_days": sq["estimated_lead_days"] + dq["estimated_transit_days"],
-                "route_distance": round(s_to_d + dq["distance_miles"], 1),
-            })
-    combos.sort(key=lambda c: c["total_cost"])
+    for i, j, combo_total in ranked_combos.items():
+        sq, dq = top_suppliers[i], top_distributors[j]
+        s_to_d = float(s_to_d_all[i, j])
+        combos.append({
+            "supplier": {"name": sq["organization"]["name"], "uei": sq["organization"].get("uei"),
+                         "supply_cost": sq["supply_subtotal"], "distance": sq["distance_miles"],
+                         "has_inventory": sq["has_inventory"], "lead_days": sq["estimated_lead_days"]},
+            "distributor": {"name": dq["organization"]["name"], "uei": dq["organization"].get("uei"),
+                            "logistics_cost": dq["total_logistics_cost"], "distance": dq["distance_miles"],
+                            "transit_days": dq["estimated_transit_days"], "trucks": dq["trucks_needed"]},
+            "total_cost": combo_total,
+            "total_delivery_days": sq["estimated_lead_days"] + dq["estimated_transit_days"],
+            "route_distance": round(s_to_d + dq["distance_miles"], 1),
+        })
 
     rfq = {
         "rfq_number": f"FM-RFQ-{dest_zip}-{len(items):02d}",
@@ -292,11 +310,11 @@ def generate_rfq():
             "fuel_surcharge_rate": f"{FUEL_SURCHARGE_RATE * 100}%",
             "truck_types": TRUCK_TYPES,
         },
-        "supplier_quotes": supplier_quotes[:10],
-        "distributor_quotes": distributor_quotes[:10],
-        "combo_rankings": combos[:15],
-        "total_suppliers_evaluated": len(supplier_quotes),
-        "total_distributors_evaluated": len(distributor_quotes),
+        "supplier_quotes": supplier_quotes,
+        "distributor_quotes": distributor_quotes,
+        "combo_rankings": combos,
+        "total_suppliers_evaluated": len(ranked_suppliers),
+        "total_distributors_evaluated": len(ranked_distributors),
         "best_supplier": supplier_quotes[0] if supplier_quotes else None,
         "best_distributor": distributor_quotes[0] if distributor_quotes else None,
         "best_combo": combos[0] if combos else None,
@@ -2,12 +2,19 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.solicitation import Solicitation
-from app.models.zip_need_score import ZipNeedScore
+from app.services.term_links import with_term
+from app.services.zip_reference import zip_coordinates
 from app.models.user import User
+from app.models.match_input_version import MatchInputVersion
+from app.models.match_result import MatchResult
+from app.services.listing import keyset_page, listing_response, load_fields, project, requested_fields, sort_key
+from app.services.matching import serialize_matches
 from datetime import date
 
 solicitations_bp = Blueprint("solicitations", __name__)
 
+SOLICITATION_FORMATS = {"source_type": lambda v: v or "government"}
+
 
 @solicitations_bp.route("/solicitations", methods=["GET"])
 def list_solicitations():
@@ -19,7 +26,7 @@ def list_solicitations():
 
     category = request.args.get("category")
     if category:
-        query = query.filter(Solicitation.categories.like(f'%"{category}"%'))
+        query = with_term(query, Solicitation, "categories", category)
 
     zip_code = request.args.get("zip")
     if zip_code:
@@ -33,8 +40,17 @@ def list_solicitations():
     if source_type:
         query = query.filter_by(source_type=source_type)
 
-    solicitations = query.order_by(Solicitation.posted_date.desc()).all()
-    return jsonify([s.to_dict() for s in solicitations])
+    keys = [sort_key(Solicitation.posted_date, descending=True),
+            sort_key(Solicitation.id, descending=True)]
+    fields = requested_fields(request.args, Solicitation)
+    if fields:
+        query = load_fields(query, Solicitation, fields, keys)
+    solicitations, page = keyset_page(query, keys, request.args)
+    if fields:
+        items = [project(s, fields, SOLICITATION_FORMATS) for s in solicitations]
+    else:
+        items = [s.to_dict() for s in solicitations]
+    return jsonify(listing_response(items, page))
 
 
 @solicitations_bp.route("/solicitations", methods=["POST"])
@@ -49,13 +65,14 @@ def create_solicitation():
     if missing:
         return jsonify({"error": f"Missing required fields: {', '.join(missing)}"}), 400
 
-    # Look up lat/lng from zip code
-    zip_entry = ZipNeedScore.query.filter_by(zip_code=data["zip_code"]).first()
-    if zip_entry:
-        lat, lng = zip_entry.lat, zip_entry.lng
+    # Look up lat/lng from zip code, or explicit coordinates for a ZIP with no centroid
+    coords = zip_coordinates(data["zip_code"])
+    if coords:
+        lat, lng = coords
+    elif data.get("lat") is not None and data.get("lng") is not None:
+        lat, lng = float(data["lat"]), float(data["lng"])
     else:
-        lat = data.get("lat", 0.0)
-        lng = data.get("lng", 0.0)
+        return jsonify({"error": "unknown zip_code; provide lat and lng"}), 400
 
     # Parse response_deadline if provided
     response_deadline = None
@@ -92,11 +109,8 @@ def create_solicitation():
 def get_solicitation(id):
     sol = Solicitation.query.get_or_404(id)
     data = sol.to_dict()
-    data["matches"] = sorted(
-        [m.to_dict() for m in sol.matches],
-        key=lambda m: m["score"],
-        reverse=True,
-    )
+    matches = MatchResult.query.filter_by(solicitation_id=sol.id).order_by(MatchResult.score.desc()).all()
+    data["matches"] = serialize_matches(matches)
     return jsonify(data)
 
 
@@ -115,6 +129,7 @@ def delete_solicitation(id):
 
     for match in sol.matches:
         db.session.delete(match)
+    MatchInputVersion.query.filter_by(solicitation_id=sol.id).delete()
     db.session.delete(sol)
     db.session.commit()
     return jsonify({"message": "Solicitation deleted"}), 200
@@ -0,0 +1,140 @@
+"""
+Cross-worker version counters for process-local caches.
+
+Every cache is tagged with a name (e.g. "organizations"). Flushing a change to
+a watched model bumps that name's row in ``cache_versions`` inside the same
+transaction, so every gunicorn worker sees the new version on its next request
+and rebuilds. The worker that made the write patches its own copy in place
+after commit instead of rebuilding it.
+"""
+import random
+from collections import namedtuple
+from flask import current_app, g, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app import db
+from app.models.cache_version import CacheVersion
+
+Change = namedtuple("Change", ["op", "values"])  # op: insert, update, delete
+
+_WATCHED = {}  # model class -> cache name
+_CACHES = {}  # cache name -> [VersionedCache]
+
+
+def watch(model, name):
+    """Bump the ``name`` version whenever rows of ``model`` are written."""
+    _WATCHED[model] = name
+
+
+def bump_version(connection, name):
+    """Increment ``name`` in the caller's transaction and return the new value."""
+    table = CacheVersion.__table__
+    result = connection.execute(
+        table.update().where(table.c.name == name).values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        # Start from a random value so a recreated table never replays
+        # versions that a long-running worker has already cached.
+        connection.execute(table.insert().values(name=name, version=random.randrange(1, 2**31)))
+    return connection.execute(select(table.c.version).where(table.c.name == name)).scalar_one()
+
+
+def current_version(name):
+    """Version of ``name``, read from the database at most once per request."""
+    seen = g.setdefault("_cache_versions", {})
+    if name not in seen:
+        seen[name] = db.session.execute(
+            select(CacheVersion.version).where(CacheVersion.name == name)
+        ).scalar() or 0
+    return seen[name]
+
+
+class VersionedCache:
+    """A process-local value rebuilt whenever its version counter moves.
+
+    ``build()`` returns a fresh value; ``patch(value, changes)`` optionally
+    applies this worker's own committed writes in place.
+    """
+
+    def __init__(self, name, build, patch=None):
+        self.name = name
+        self.build = build
+        self.patch = patch
+        _CACHES.setdefault(name, []).append(self)
+
+    def _store(self):
+        return current_app.extensions.setdefault("foodmatch_caches", {})
+
+    def get(self):
+        store = self._store()
+        version = current_version(self.name)
+        entry = store.get(self)
+        if entry is None or entry[0] != version:
+            entry = (version, self.build())
+            store[self] = entry
+        return entry[1]
+
+    def invalidate(self):
+        self._store().pop(self, None)
+
+    def _apply(self, version, changes):
+        store = self._store()
+        entry = store.get(self)
+        if entry is None or self.patch is None or entry[0] != version - 1:
+            # Anything else means another worker wrote in between; the version
+            # mismatch forces a rebuild on the next get().
+            return
+        self.patch(entry[1], changes)
+        store[self] = (version, entry[1])
+
+
+def forget_versions():
+    """Drop the memoized versions so the next get() re-reads them."""
+    g.pop("_cache_versions", None)
+
+
+def init_app(app):
+    @app.teardown_request
+    def _forget_versions(exc):
+        forget_versions()
+
+
+def _snapshot(obj):
+    mapper = inspect(obj).mapper
+    return {attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs}
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_watched_versions(session, flush_context):
+    changes = {}
+    for op, objs in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objs:
+            name = _WATCHED.get(type(obj))
+            if name is None:
+                continue
+            if op == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            changes.setdefault(name, []).append(Change(op, _snapshot(obj)))
+    if not changes:
+        return
+    pending = session.info.setdefault("_cache_changes", [])
+    connection = session.connection()
+    for name, items in changes.items():
+        pending.append((name, bump_version(connection, name), items))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_changes(session):
+    pending = session.info.pop("_cache_changes", None)
+    if not pending or not has_app_context():
+        return
+    seen = g.setdefault("_cache_versions", {})
+    for name, version, items in pending:
+        for cache in _CACHES.get(name, []):
+            cache._apply(version, items)
+        seen[name] = version
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_changes(session):
+    session.info.pop("_cache_changes", None)
@@ -0,0 +1,107 @@
+"""
+Interned capability vocabulary and bitmask overlap.
+
+Organization capabilities and solicitation categories share one vocabulary:
+each normalized term (lower-cased, stripped) gets a stable bit, so a term
+list becomes an integer mask and overlap is a popcount of ``a & b``. Masks
+are cached by the raw term list, which is all a record's mask depends on,
+so edits never leave a stale entry behind. Bits are never reassigned, which
+makes the vocabulary safe to share across requests and apps in a process.
+The mask cache is a bounded LRU, so a long-lived worker that sees many
+distinct term lists keeps only the recent ones.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+
+MASK_CACHE_SIZE = 4096
+
+
+class Vocabulary:
+    """Append-only ``term -> bit`` table with an LRU mask cache."""
+
+    def __init__(self, cache_size=MASK_CACHE_SIZE):
+        self.bits = {}
+        self.terms = []
+        self.cache_size = cache_size
+        self._masks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _intern(self, term):
+        bit = self.bits.get(term)
+        if bit is None:
+            with self._lock:
+                bit = self.bits.get(term)
+                if bit is None:
+                    bit = len(self.terms)
+                    self.terms.append(term)
+                    self.bits[term] = bit
+        return bit
+
+    def mask(self, terms):
+        """Integer mask of a term list (None or empty gives 0)."""
+        if not terms:
+            return 0
+        key = tuple(terms)
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+                return mask
+        mask = 0
+        for term in terms:
+            mask |= 1 << self._intern(term.lower().strip())
+        with self._lock:
+            self._masks[key] = mask
+            while len(self._masks) > self.cache_size:
+                self._masks.popitem(last=False)
+        return mask
+
+    def decode(self, mask):
+        """Sorted terms whose bits are set in ``mask``."""
+        found = []
+        while mask:
+            low = mask & -mask
+            found.append(self.terms[low.bit_length() - 1])
+            mask ^= low
+        return sorted(found)
+
+    def matrix(self, masks):
+        """``(len(masks), words)`` uint64 array holding each mask little-endian."""
+        words = max(1, (len(self.terms) + 63) // 64)
+        width = words * 8
+        data = b"".join(m.to_bytes(width, "little") for m in masks)
+        return np.frombuffer(data, dtype="<u8").reshape(len(masks), words)
+
+
+vocabulary = Vocabulary()
+
+
+def term_mask(terms):
+    return vocabulary.mask(terms)
+
+
+def overlap_terms(mask):
+    return vocabulary.decode(mask)
+
+
+def overlap_percent(query_mask, mask):
+    """Share of ``query_mask``'s terms present in ``mask``, 0-100."""
+    total = query_mask.bit_count()
+    if not total:
+        return 0.0
+    return ((query_mask & mask).bit_count() / total) * 100
+
+
+def overlap_percents(query_mask, masks):
+    """``overlap_percent`` of one query mask against many masks, as an array."""
+    total = query_mask.bit_count()
+    if not total or not masks:
+        return np.zeros(len(masks), dtype=np.float64)
+    matrix = vocabulary.matrix(masks)
+    query = vocabulary.matrix([query_mask])[0, :matrix.shape[1]]
+    counts = np.bitwise_count(matrix & query).sum(axis=1)
+    return counts / total * 100
@@ -0,0 +1,79 @@
+"""
+Per-organization summary of available emergency capacity.
+
+One ``GROUP BY organization_id, supply_type`` over available
+``emergency_capacities`` rows gives the listing count and total quantity
+of every organization and supply type. Portals, tri-match, RFQ and surplus
+matching read counts and stock levels from it instead of querying
+capacity rows per organization. Writes to ``EmergencyCapacity`` bump the
+"emergency_capacities" version and the summary is rebuilt on next use.
+"""
+from sqlalchemy import func
+from app import db
+from app.models.emergency_capacity import EmergencyCapacity
+from app.services.cache_versions import VersionedCache, watch
+
+
+class CapacitySummary:
+    """``{organization_id: {supply_type: (listings, quantity)}}`` of available capacity."""
+
+    def __init__(self, rows):
+        self.by_org = {}
+        for org_id, supply_type, listings, quantity in rows:
+            self.by_org.setdefault(org_id, {})[supply_type] = (listings, quantity or 0)
+
+    def _entries(self, org_id, supply_types):
+        types = self.by_org.get(org_id, {})
+        if supply_types is None:
+            return types.values()
+        return [types[t] for t in supply_types if t in types]
+
+    def count(self, org_id, supply_types=None):
+        """Available listings of ``org_id``, optionally only of ``supply_types``."""
+        return sum(listings for listings, _ in self._entries(org_id, supply_types))
+
+    def quantity(self, org_id, supply_types=None):
+        return sum(quantity for _, quantity in self._entries(org_id, supply_types))
+
+    def supply_types(self, org_id):
+        return list(self.by_org.get(org_id, {}))
+
+    def organizations(self):
+        return self.by_org.keys()
+
+
+def _build_capacity_summary():
+    rows = db.session.query(
+        EmergencyCapacity.organization_id,
+        EmergencyCapacity.supply_type,
+        func.count(EmergencyCapacity.id),
+        func.sum(EmergencyCapacity.quantity),
+    ).filter(EmergencyCapacity.status == "available").group_by(
+        EmergencyCapacity.organization_id, EmergencyCapacity.supply_type
+    ).all()
+    return CapacitySummary(rows)
+
+
+watch(EmergencyCapacity, "emergency_capacities")
+capacity_summary = VersionedCache("emergency_capacities", _build_capacity_summary)
+
+
+def available_capacity_items(org_ids, supply_types=None):
+    """``{organization_id: [item dicts]}`` of available capacity, for response payloads."""
+    if not org_ids:
+        return {}
+    query = EmergencyCapacity.query.filter(
+        EmergencyCapacity.status == "available",
+        EmergencyCapacity.organization_id.in_(org_ids),
+    )
+    if supply_types:
+        query = query.filter(EmergencyCapacity.supply_type.in_(supply_types))
+    items = {}
+    for cap in query.order_by(EmergencyCapacity.id).all():
+        items.setdefault(cap.organization_id, []).append({
+            "supply_type": cap.supply_type,
+            "item_name": cap.item_name,
+            "quantity": cap.quantity,
+            "unit": cap.unit,
+        })
+    return items
@@ -0,0 +1,103 @@
+"""
+Great-circle distance engine shared by matching, predictions, portals and RFQ.
+
+Vectorized helpers take NumPy arrays of latitudes/longitudes in radians and
+return distances in miles, so a whole ZIP × organization grid is computed in
+a single call instead of a nested Python loop.
+"""
+import math
+import numpy as np
+
+EARTH_RADIUS_MILES = 3959
+
+# Rows of set 1 per block in count_within; small blocks keep bounding boxes
+# tight, and no block ever holds a full set 1 × set 2 distance matrix.
+PRUNED_BLOCK_ROWS = 256
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Scalar distance in miles between two points given in degrees."""
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    return EARTH_RADIUS_MILES * 2 * math.asin(math.sqrt(a))
+
+
+def to_radians(lats, lngs):
+    """Convert degree coordinates (scalars or sequences) to radian arrays."""
+    return (
+        np.radians(np.atleast_1d(np.asarray(lats, dtype=np.float64))),
+        np.radians(np.atleast_1d(np.asarray(lngs, dtype=np.float64))),
+    )
+
+
+def coords_radians(records):
+    """Radian (lat, lng) arrays for any records exposing ``lat``/``lng`` in degrees."""
+    return to_radians([r.lat for r in records], [r.lng for r in records])
+
+
+def distance_matrix(lat1, lng1, lat2, lng2):
+    """Miles from every point in set 1 (rows) to every point in set 2 (columns).
+
+    All inputs are 1-D radian arrays; the result has shape ``(len(lat1), len(lat2))``.
+    """
+    lat1 = np.asarray(lat1, dtype=np.float64)[:, None]
+    lng1 = np.asarray(lng1, dtype=np.float64)[:, None]
+    lat2 = np.asarray(lat2, dtype=np.float64)[None, :]
+    lng2 = np.asarray(lng2, dtype=np.float64)[None, :]
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return EARTH_RADIUS_MILES * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distances_from(lat, lng, lat2, lng2):
+    """Miles from a single degree point to every point of a radian array pair."""
+    plat, plng = to_radians(lat, lng)
+    return distance_matrix(plat, plng, lat2, lng2)[0]
+
+
+def count_within(lat1, lng1, lat2, lng2, radius_miles, block_rows=PRUNED_BLOCK_ROWS):
+    """For each point in set 1, how many points of set 2 lie within ``radius_miles``.
+
+    Set 1 is visited in small blocks of neighbouring points (1° latitude
+    bands, then longitude). A block measures only the set-2 points inside
+    its bounding box grown by the radius: a latitude slice of set 2 sorted
+    by latitude, then a longitude window. Every point within the radius is
+    inside that box, so the counts equal a full distance matrix while the
+    work follows local density instead of ``len(set 1) × len(set 2)``.
+    ``block_rows`` sets the block size.
+    """
+    lat1 = np.asarray(lat1, dtype=np.float64)
+    lng1 = np.asarray(lng1, dtype=np.float64)
+    counts = np.zeros(len(lat1), dtype=np.int64)
+    if len(lat1) == 0 or len(lat2) == 0:
+        return counts
+    lat2 = np.asarray(lat2, dtype=np.float64)
+    lng2 = np.asarray(lng2, dtype=np.float64)
+    by_lat = np.argsort(lat2, kind="stable")
+    s_lat, s_lng = lat2[by_lat], lng2[by_lat]
+    # Longitude windows assume normalized longitudes; otherwise only the latitude slice applies
+    lng_window = bool(np.all(np.abs(s_lng) <= math.pi))
+    reach = radius_miles / EARTH_RADIUS_MILES + 1e-9  # angular radius, with slack for rounding
+
+    order = np.lexsort((lng1, np.floor(np.degrees(lat1))))
+    block_rows = max(1, block_rows)
+    for start in range(0, len(order), block_rows):
+        rows = order[start:start + block_rows]
+        blat, blng = lat1[rows], lng1[rows]
+        lo = int(np.searchsorted(s_lat, blat.min() - reach, side="left"))
+        hi = int(np.searchsorted(s_lat, blat.max() + reach, side="right"))
+        cand_lat, cand_lng = s_lat[lo:hi], s_lng[lo:hi]
+        edge = max(abs(blat.min()), abs(blat.max())) + reach
+        if lng_window and edge < math.pi / 2 and math.sin(reach) < math.cos(edge):
+            dlng = math.asin(math.sin(reach) / math.cos(edge)) + 1e-9
+            west, east = blng.min() - dlng, blng.max() + dlng
+            if west >= -math.pi and east <= math.pi:
+                keep = (cand_lng >= west) & (cand_lng <= east)
+                cand_lat, cand_lng = cand_lat[keep], cand_lng[keep]
+        if len(cand_lat):
+            block = distance_matrix(blat, blng, cand_lat, cand_lng)
+            counts[rows] = np.count_nonzero(block <= radius_miles, axis=1)
+    return counts
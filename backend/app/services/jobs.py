@@ -0,0 +1,187 @@
+"""
+Database-backed job queue for long matching and triage runs.
+
+Web requests only insert a ``jobs`` row and return its id. A separate
+worker process (scripts/job_worker.py) claims queued rows one at a time,
+runs the same ``generate_matches`` / ``run_triage`` code the synchronous
+endpoints use, and records progress and the result on the row for
+``GET /jobs/<id>`` to report.
+
+A claim is a lease: progress reports renew ``heartbeat_at``, and a running
+job silent for ``JOB_LEASE_SECONDS`` (its worker crashed or was killed) is
+re-queued by the next ``claim_next``, or failed once it has been claimed
+``JOB_MAX_ATTEMPTS`` times. Writes from a worker that lost its lease are
+ignored.
+"""
+import os
+import socket
+import traceback
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, select, update
+from app import db
+from app.models.job import Job
+from app.services.cache_versions import forget_versions
+from app.services.matching import generate_matches
+from app.services.prediction_snapshots import build_snapshot
+from app.services.triage import run_triage
+from app.services.zip_coverage import rebuild_zip_coverage
+
+Lease = namedtuple("Lease", ["id", "worker_id", "attempts"])  # one claim of a job
+
+
+def _generate_matches_job(params, progress):
+    progress(0, 1)
+    result = generate_matches(params["solicitation_id"])
+    if isinstance(result, dict) and "error" in result:
+        raise LookupError(result["error"])
+    progress(1, 1)
+    return result
+
+
+def _triage_job(params, progress):
+    return run_triage(incremental=params.get("incremental", False), progress=progress)
+
+
+def _prediction_snapshot_job(params, progress):
+    progress(0, 1)
+    day = date.fromisoformat(params["date"]) if params.get("date") else None
+    run = build_snapshot(day)
+    progress(1, 1)
+    return run.to_dict()
+
+
+def _zip_coverage_job(params, progress):
+    progress(0, 1)
+    written = rebuild_zip_coverage(db.session.connection())
+    db.session.commit()
+    progress(1, 1)
+    return {"rows": written}
+
+
+JOB_HANDLERS = {
+    "generate_matches": _generate_matches_job,
+    "triage": _triage_job,
+    "prediction_snapshot": _prediction_snapshot_job,
+    "zip_coverage": _zip_coverage_job,
+}
+
+
+def wants_async(args):
+    """Whether a request asked for (or the deployment defaults to) a background job."""
+    flag = args.get("async")
+    if flag is None:
+        return current_app.config["ASYNC_JOBS"]
+    return flag.lower() in ("1", "true", "yes")
+
+
+def enqueue(kind, params=None):
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job(kind=kind, params=params or {}, status="queued")
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def reclaim_expired(now=None):
+    """Re-queue running jobs whose lease lapsed, or fail them when out of attempts.
+
+    Returns ``(requeued, failed)`` counts.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(seconds=current_app.config["JOB_LEASE_SECONDS"])
+    lapsed = (Job.status == "running") & (func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff)
+    out_of_attempts = func.coalesce(Job.attempts, 0) >= current_app.config["JOB_MAX_ATTEMPTS"]
+    failed = db.session.execute(
+        update(Job).where(lapsed, out_of_attempts).values(
+            status="failed", error="Worker stopped responding (lease expired)", finished_at=now,
+        )
+    ).rowcount
+    requeued = db.session.execute(
+        update(Job).where(lapsed, ~out_of_attempts).values(status="queued", worker_id=None)
+    ).rowcount
+    db.session.commit()
+    return requeued, failed
+
+
+def claim_next(worker_id):
+    """Atomically move the oldest queued job to running and return it (or None).
+
+    The conditional UPDATE only succeeds for one claimant, so any number of
+    worker processes can poll the same table. Jobs of crashed workers are
+    re-queued first.
+    """
+    reclaim_expired()
+    while True:
+        job_id = db.session.execute(
+            select(Job.id).where(Job.status == "queued").order_by(Job.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            db.session.rollback()
+            return None
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", worker_id=worker_id, started_at=now, heartbeat_at=now,
+                    attempts=func.coalesce(Job.attempts, 0) + 1)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id)
+
+
+def _holds_lease(lease):
+    # Only the claim that is still current may write to the row
+    return (Job.id == lease.id) & (Job.status == "running") & \
+        (Job.worker_id == lease.worker_id) & (Job.attempts == lease.attempts)
+
+
+def _report_progress(lease, done, total):
+    db.session.execute(
+        update(Job).where(_holds_lease(lease))
+        .values(progress_done=done, progress_total=total, heartbeat_at=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def run_job(job):
+    """Execute a claimed job and store its outcome on the row."""
+    job_id = job.id
+    # Taken now: the row's attributes reload after each commit and would follow a re-claim
+    lease = Lease(job.id, job.worker_id, job.attempts)
+    handler = JOB_HANDLERS.get(job.kind)
+    # A worker's app context outlives many jobs; read cache versions afresh
+    forget_versions()
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        result = handler(job.params or {}, lambda done, total: _report_progress(lease, done, total))
+        values = {"status": "succeeded", "result": result}
+    except Exception as exc:
+        db.session.rollback()
+        current_app.logger.error(f"Job {job_id} failed: {traceback.format_exc()}")
+        values = {"status": "failed", "error": f"{type(exc).__name__}: {exc}"}
+    db.session.execute(
+        update(Job).where(_holds_lease(lease)).values(finished_at=datetime.utcnow(), **values)
+    )
+    db.session.commit()
+
+
+def work(worker_id=None, max_jobs=None):
+    """Run queued jobs until the queue is empty (or ``max_jobs`` ran); returns the count."""
+    worker_id = worker_id or default_worker_id()
+    ran = 0
+    while max_jobs is None or ran < max_jobs:
+        job = claim_next(worker_id)
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
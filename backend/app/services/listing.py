@@ -0,0 +1,161 @@
+"""
+Keyset pagination and sparse field projection for list endpoints.
+
+Both are opt-in so existing clients keep getting whole lists of full rows.
+
+- ``limit`` / ``cursor``: a request carrying either gets one page plus a
+  ``next_cursor`` token (null on the last page). Pages are read with
+  ``WHERE <sort key> beyond cursor ORDER BY <sort key> LIMIT n``. Every sort
+  key ends in the primary key, which makes the order total and the cursor
+  unambiguous. Sort columns are NOT NULL and compared bare, so each endpoint's
+  ``(sort column, id)`` index serves a page as a range scan: a deep page costs
+  about the same as the first, though filters the index does not cover still
+  read past non-matching rows.
+- ``fields=a,b``: only those columns are loaded from the database and
+  returned. Each endpoint may also allow a few named extras (e.g. the nested
+  ``organization``), which are loaded only when asked for.
+"""
+import base64
+import binascii
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from flask import jsonify
+from sqlalchemy import JSON, Date, DateTime, and_, inspect, or_
+from sqlalchemy.orm import load_only
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+SortKey = namedtuple("SortKey", ["column", "descending"])
+
+
+class ListingError(ValueError):
+    """A malformed ``limit``, ``cursor`` or ``fields`` parameter; answered with 400."""
+
+
+def sort_key(column, descending=False):
+    """One component of an endpoint's order; ``column`` must be NOT NULL."""
+    return SortKey(column, descending)
+
+
+def _key_values(keys, row):
+    return [getattr(row, key.column.key) for key in keys]
+
+
+def encode_cursor(keys, row):
+    values = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in _key_values(keys, row)]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(keys, token):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError(token)
+        decoded = []
+        for key, value in zip(keys, values):
+            if isinstance(key.column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(key.column.type, Date):
+                value = date.fromisoformat(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, binascii.Error):
+        raise ListingError("Invalid cursor")
+
+
+def _beyond(keys, values):
+    """Rows strictly after ``values`` in ``keys`` order."""
+    clauses = []
+    for n, (key, value) in enumerate(zip(keys, values)):
+        ties = [k.column == v for k, v in zip(keys[:n], values[:n])]
+        clauses.append(and_(*ties, key.column < value if key.descending else key.column > value))
+    # The redundant bound on the leading column lets the index seek to the cursor
+    lead, start = keys[0], values[0]
+    return and_(lead.column <= start if lead.descending else lead.column >= start, or_(*clauses))
+
+
+def _page_args(args, keys):
+    if "limit" not in args and "cursor" not in args:
+        return None
+    try:
+        limit = int(args.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise ListingError("limit must be an integer")
+    if limit < 1:
+        raise ListingError("limit must be positive")
+    cursor = args.get("cursor")
+    return min(limit, MAX_LIMIT), decode_cursor(keys, cursor) if cursor else None
+
+
+def keyset_page(query, keys, args):
+    """Order ``query`` by ``keys`` and return ``(rows, page)``.
+
+    ``page`` is None for unpaginated requests, else ``{"next_cursor", "limit"}``.
+    """
+    query = query.order_by(*[k.column.desc() if k.descending else k.column.asc() for k in keys])
+    paging = _page_args(args, keys)
+    if paging is None:
+        return query.all(), None
+    limit, after = paging
+    if after is not None:
+        query = query.filter(_beyond(keys, after))
+    rows = query.limit(limit + 1).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, {"next_cursor": encode_cursor(keys, rows[-1]) if more else None, "limit": limit}
+
+
+def requested_fields(args, model, extras=()):
+    """Names asked for with ``fields=``, or None for full rows."""
+    raw = args.get("fields")
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    columns = {attr.key for attr in inspect(model).column_attrs}
+    unknown = [f for f in fields if f not in columns and f not in extras]
+    if unknown:
+        raise ListingError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def load_fields(query, model, fields, keys, also=()):
+    """Load only the requested columns, plus the primary key, sort keys and ``also``."""
+    columns = {attr.key for attr in inspect(model).column_attrs}
+    wanted = {"id", *(k.column.key for k in keys), *also, *(f for f in fields if f in columns)}
+    return query.options(load_only(*[getattr(model, name) for name in sorted(wanted)]))
+
+
+def project(obj, fields, formats=None, extras=None):
+    """``{field: value}`` for ``fields`` in the shape ``to_dict()`` would give them."""
+    formats = formats or {}
+    extras = extras or {}
+    table = obj.__table__
+    out = {}
+    for name in fields:
+        if name in extras:
+            out[name] = extras[name](obj)
+            continue
+        value = getattr(obj, name)
+        if name in formats:
+            value = formats[name](value)
+        elif isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        elif value is None and isinstance(table.c[name].type, JSON):
+            value = []
+        out[name] = value
+    return out
+
+
+def listing_response(items, page):
+    """A bare list when unpaginated, else ``{"items", "next_cursor", "limit"}``."""
+    if page is None:
+        return items
+    return {"items": items, **page}
+
+
+def init_app(app):
+    @app.errorhandler(ListingError)
+    def _bad_listing_request(exc):
+        return jsonify({"error": str(exc)}), 400
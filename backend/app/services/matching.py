@@ -1,31 +1,26 @@
-import math
+import hashlib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
 from openai import OpenAI
+from sqlalchemy import insert
 from app import db
 from app.models.solicitation import Solicitation
 from app.models.organization import Organization
-from app.models.zip_need_score import ZipNeedScore
 from app.models.match_result import MatchResult
-
-
-def haversine(lat1, lng1, lat2, lng2):
-    R = 3959  # Earth radius in miles
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
-    return R * 2 * math.asin(math.sqrt(a))
+from app.models.match_input_version import MatchInputVersion
+from app.services.capabilities import overlap_percent, overlap_percents, term_mask
+from app.services.listing import project
+from app.services.spatial_index import organizations_covering
+from app.services.zip_reference import zip_need_score
+from app.services import score_cache
 
 
 def capability_overlap_score(sol_categories, org_capabilities):
     if not sol_categories or not org_capabilities:
         return 0.0
-    sol_set = set(c.lower().strip() for c in sol_categories)
-    org_set = set(c.lower().strip() for c in org_capabilities)
-    if not sol_set:
-        return 0.0
-    overlap = len(sol_set & org_set)
-    return (overlap / len(sol_set)) * 100
+    return overlap_percent(term_mask(sol_categories), term_mask(org_capabilities))
 
 
 def proximity_score(distance, max_distance=500):
@@ -35,31 +30,103 @@ def proximity_score(distance, max_distance=500):
 
 
 def get_need_score(zip_code):
-    zns = ZipNeedScore.query.filter_by(zip_code=zip_code).first()
-    return zns.need_score if zns else 50.0
+    return zip_need_score(zip_code)
 
 
 def prefilter_candidates(solicitation):
-    orgs = Organization.query.all()
-    candidates = []
-    for org in orgs:
-        dist = haversine(solicitation.lat, solicitation.lng, org.lat, org.lng)
-        if dist <= org.service_radius_miles * 1.5:  # generous filter
-            cap = capability_overlap_score(solicitation.categories, org.capabilities)
-            candidates.append({"org": org, "distance": dist, "capability_overlap": cap})
+    # Range query: organizations whose service_radius_miles * 1.5 covers the point
+    in_range = organizations_covering(solicitation.lat, solicitation.lng)
+    if not in_range:
+        return []
+    orgs = Organization.query.filter(Organization.id.in_(in_range)).order_by(Organization.id).all()
+    caps = overlap_percents(term_mask(solicitation.categories), [term_mask(o.capabilities) for o in orgs])
+    candidates = [
+        {"org": org, "distance": in_range[org.id], "capability_overlap": cap}
+        for org, cap in zip(orgs, caps.tolist())
+    ]
     # Sort by capability overlap descending, take top 10
     candidates.sort(key=lambda x: x["capability_overlap"], reverse=True)
     return candidates[:10]
 
 
-def llm_score_match(solicitation, org, distance, need_score):
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    if not api_key:
-        # Return a deterministic fallback score if no API key
-        return fallback_score(solicitation, org, distance, need_score)
+def match_inputs(solicitation, need_score):
+    """The versions a solicitation's match set depends on: the solicitation
+    itself, every organization in range, and the ZIP need score."""
+    in_range = organizations_covering(solicitation.lat, solicitation.lng)
+    rows = db.session.query(Organization.id, Organization.updated_at).filter(
+        Organization.id.in_(in_range)
+    ).order_by(Organization.id).all() if in_range else []
+    digest = hashlib.sha256(
+        "\n".join(f"{org_id}:{updated.isoformat() if updated else ''}" for org_id, updated in rows).encode()
+    ).hexdigest()
+    return {
+        "solicitation_updated_at": solicitation.updated_at,
+        "org_set_digest": digest,
+        "need_score": need_score,
+    }
+
+
+def match_inputs_unchanged(solicitation, need_score):
+    stored = db.session.get(MatchInputVersion, solicitation.id)
+    if stored is None:
+        return False
+    current = match_inputs(solicitation, need_score)
+    return all(getattr(stored, k) == v for k, v in current.items())
+
+
+def stored_matches(solicitation_id):
+    matches = MatchResult.query.filter_by(solicitation_id=solicitation_id).order_by(MatchResult.score.desc()).all()
+    return serialize_matches(matches)
+
+
+def _organizations_for(matches):
+    ids = {m.organization_id for m in matches}
+    return {o.id: o for o in Organization.query.filter(Organization.id.in_(ids)).all()} if ids else {}
+
+
+def serialize_matches(matches, organizations=None):
+    """Compact match dicts (organization embedded, no solicitation).
+
+    Organizations are loaded in one query unless ``organizations``
+    (``{id: Organization}``) is supplied.
+    """
+    if organizations is None:
+        organizations = _organizations_for(matches)
+    return [m.to_compact_dict(organizations.get(m.organization_id)) for m in matches]
+
 
-    client = OpenAI(api_key=api_key)
-    prompt = f"""Score this match between a government food solicitation and an organization from 0-100.
+# Scores are reported to one decimal, as in MatchResult.to_compact_dict()
+MATCH_FORMATS = {
+    name: (lambda v: round(v, 1))
+    for name in ("score", "capability_overlap", "distance_miles", "need_score_component", "llm_score")
+}
+MATCH_EXTRAS = ("organization", "solicitation")
+
+
+def serialize_match_listing(matches, fields=None):
+    """Matches spanning any number of solicitations, each solicitation emitted once.
+
+    With ``fields`` the match dicts carry only those keys; organizations and
+    the solicitations map are loaded only if "organization" / "solicitation"
+    are among them.
+    """
+    listing = {}
+    if fields is None or "solicitation" in fields:
+        sol_ids = {m.solicitation_id for m in matches}
+        solicitations = Solicitation.query.filter(Solicitation.id.in_(sol_ids)).order_by(Solicitation.id).all() if sol_ids else []
+        listing["solicitations"] = {str(s.id): s.to_dict() for s in solicitations}
+    if fields is None:
+        listing["matches"] = serialize_matches(matches)
+        return listing
+    organizations = _organizations_for(matches) if "organization" in fields else {}
+    nested = {"organization": lambda m: organizations[m.organization_id].to_dict() if m.organization_id in organizations else None}
+    row_fields = [f for f in fields if f != "solicitation"]
+    listing["matches"] = [project(m, row_fields, MATCH_FORMATS, nested) for m in matches]
+    return listing
+
+
+def build_match_prompt(solicitation, org, distance, need_score):
+    return f"""Score this match between a government food solicitation and an organization from 0-100.
 Provide your response as JSON: {{"score": <number>, "explanation": "<2-3 sentences>"}}
 
 Solicitation:
@@ -82,27 +149,162 @@ Context:
 
 Consider: capability alignment, certifications relevant to set-asides, proximity, and community need."""
 
+
+def build_batch_prompt(solicitation, candidates, need_score):
+    """One prompt carrying the solicitation once and every candidate organization."""
+    orgs = "\n\n".join(
+        f"""{i}. Name: {c["org"].name}
+   Type: {c["org"].org_type}
+   Capabilities: {', '.join(c["org"].capabilities or [])}
+   Certifications: {', '.join(c["org"].certifications or [])}
+   Description: {c["org"].description or 'N/A'}
+   Distance: {c["distance"]:.0f} miles"""
+        for i, c in enumerate(candidates, 1)
+    )
+    return f"""Score each match between a government food solicitation and the organizations below from 0-100.
+Provide your response as a JSON array with one entry per organization:
+[{{"index": <organization number>, "score": <number>, "explanation": "<2-3 sentences>"}}]
+
+Solicitation:
+- Title: {solicitation.title}
+- Description: {solicitation.description}
+- Agency: {solicitation.agency}
+- Categories: {', '.join(solicitation.categories or [])}
+- Set-aside: {solicitation.set_aside_type or 'None'}
+- ZIP food insecurity need score: {need_score:.0f}/100
+
+Organizations:
+{orgs}
+
+Consider: capability alignment, certifications relevant to set-asides, proximity, and community need."""
+
+
+def _llm_client(api_key, timeout=None):
+    if timeout is None:
+        return OpenAI(api_key=api_key)
+    # Fail fast: a candidate that times out gets fallback_score instead of a retry
+    return OpenAI(api_key=api_key, timeout=timeout, max_retries=0)
+
+
+def _parse_llm_json(content):
+    content = content.strip()
+    # Try to parse JSON from response
+    if content.startswith("```"):
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[4:]
+    return json.loads(content)
+
+
+def _request_llm_score(client, prompt, model):
+    """One chat completion for a single match. Returns None on any failure.
+
+    Runs on worker threads, so it only touches the prompt string — never ORM objects.
+    """
     try:
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
             max_tokens=200,
         )
-        content = response.choices[0].message.content.strip()
-        # Try to parse JSON from response
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        parsed = json.loads(content)
+        parsed = _parse_llm_json(response.choices[0].message.content)
         return {
             "score": min(100, max(0, float(parsed.get("score", 50)))),
             "explanation": parsed.get("explanation", ""),
         }
     except Exception:
+        return None
+
+
+def _request_batch_scores(client, prompt, count, model):
+    """One chat completion scoring ``count`` organizations.
+
+    Returns a list of ``count`` results in prompt order; entries the model
+    omitted or malformed are None so the caller can fall back per candidate.
+    """
+    results = [None] * count
+    try:
+        response = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=min(4000, 150 * count + 100),
+        )
+        parsed = _parse_llm_json(response.choices[0].message.content)
+    except Exception:
+        return results
+    if isinstance(parsed, dict):
+        parsed = parsed.get("scores") or parsed.get("results") or []
+    if not isinstance(parsed, list):
+        return results
+    for position, entry in enumerate(parsed):
+        try:
+            index = int(entry.get("index", position + 1)) - 1
+            if not 0 <= index < count or results[index] is not None:
+                continue
+            results[index] = {
+                "score": min(100, max(0, float(entry["score"]))),
+                "explanation": str(entry.get("explanation", "")),
+            }
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+    return results
+
+
+def llm_score_match(solicitation, org, distance, need_score):
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if not api_key:
+        # Return a deterministic fallback score if no API key
         return fallback_score(solicitation, org, distance, need_score)
 
+    prompt = build_match_prompt(solicitation, org, distance, need_score)
+    result = _request_llm_score(_llm_client(api_key), prompt, current_app.config["LLM_MODEL"])
+    return result or fallback_score(solicitation, org, distance, need_score)
+
+
+def score_candidates(solicitation, candidates, need_score):
+    """LLM-score prefiltered candidates concurrently, returning results in candidate order.
+
+    Pairs already in the score cache are not re-prompted. With LLM_BATCH_SCORING
+    the remaining candidates share a single prompt; otherwise at most
+    LLM_MAX_CONCURRENCY per-pair requests are in flight. Any candidate whose
+    call fails, times out or comes back malformed falls back to fallback_score.
+    """
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if not api_key or not candidates:
+        return [fallback_score(solicitation, c["org"], c["distance"], need_score) for c in candidates]
+
+    config = current_app.config
+    model = config["LLM_MODEL"]
+    prompts = [build_match_prompt(solicitation, c["org"], c["distance"], need_score) for c in candidates]
+    keys = [score_cache.fingerprint(p, model) for p in prompts]
+    responses = score_cache.lookup_many(keys)
+
+    pending = {}
+    for c, k, p in zip(candidates, keys, prompts):
+        if k not in responses:
+            pending.setdefault(k, (c, p))
+    if pending:
+        client = _llm_client(api_key, timeout=config["LLM_TIMEOUT_SECONDS"])
+        if config["LLM_BATCH_SCORING"]:
+            batch = [c for c, _ in pending.values()]
+            prompt = build_batch_prompt(solicitation, batch, need_score)
+            fresh = dict(zip(pending, _request_batch_scores(client, prompt, len(batch), model)))
+        else:
+            workers = max(1, min(config["LLM_MAX_CONCURRENCY"], len(pending)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                fresh = dict(zip(pending, pool.map(
+                    lambda p: _request_llm_score(client, p, model), [p for _, p in pending.values()]
+                )))
+        score_cache.store_many({k: r for k, r in fresh.items() if r is not None}, model)
+        responses.update(fresh)
+
+    return [
+        responses.get(k) or fallback_score(solicitation, c["org"], c["distance"], need_score)
+        for c, k in zip(candidates, keys)
+    ]
+
 
 def fallback_score(solicitation, org, distance, need_score):
     cap = capability_overlap_score(solicitation.categories, org.capabilities)
@@ -113,7 +315,7 @@ def fallback_score(solicitation, org, distance, need_score):
     overlapping = set(c.lower() for c in (solicitation.categories or [])) & set(c.lower() for c in (org.capabilities or []))
     explanation = f"{org.name} has {len(overlapping)} overlapping capabilities"
     if overlapping:
-        explanation += f" ({', '.join(list(overlapping)[:3])})"
+        explanation += f" ({', '.join(sorted(overlapping)[:3])})"
     explanation += f". Located {distance:.0f} miles away."
     if need_score > 70:
         explanation += f" This area has high food insecurity (need score: {need_score:.0f}/100)."
@@ -126,20 +328,21 @@ def generate_matches(solicitation_id):
     if not solicitation:
         return {"error": "Solicitation not found"}
 
-    # Clear existing matches for this solicitation
-    MatchResult.query.filter_by(solicitation_id=solicitation_id).delete()
-
     candidates = prefilter_candidates(solicitation)
     need = get_need_score(solicitation.zip_code)
+    inputs = match_inputs(solicitation, need)
 
-    results = []
-    for c in candidates:
-        org = c["org"]
+    llm_results = score_candidates(solicitation, candidates, need)
+
+    # Clear existing matches only once scoring is done, so the write
+    # transaction never stays open across LLM round trips
+    MatchResult.query.filter_by(solicitation_id=solicitation_id).delete()
+
+    rows = []
+    for c, llm_result in zip(candidates, llm_results):
         dist = c["distance"]
         cap_score = c["capability_overlap"]
 
-        llm_result = llm_score_match(solicitation, org, dist, need)
-
         prox = proximity_score(dist)
         composite = (
             0.3 * cap_score
@@ -148,76 +351,23 @@ def generate_matches(solicitation_id):
             + 0.3 * llm_result["score"]
         )
 
-        match = MatchResult(
-            solicitation_id=solicitation_id,
-            organization_id=org.id,
-            score=composite,
-            explanation=llm_result["explanation"],
-            capability_overlap=cap_score,
-            distance_miles=dist,
-            need_score_component=need,
-            llm_score=llm_result["score"],
-        )
-        db.session.add(match)
-        results.append(match)
+        rows.append({
+            "solicitation_id": solicitation_id,
+            "organization_id": c["org"].id,
+            "score": composite,
+            "explanation": llm_result["explanation"],
+            "capability_overlap": cap_score,
+            "distance_miles": dist,
+            "need_score_component": need,
+            "llm_score": llm_result["score"],
+        })
 
-    db.session.commit()
+    # One multi-row INSERT ... RETURNING instead of a flush per match
+    results = db.session.scalars(insert(MatchResult).returning(MatchResult), rows).all() if rows else []
     results.sort(key=lambda m: m.score, reverse=True)
-    return [m.to_dict() for m in results]
-
-
-def run_triage():
-    """Batch-run matching across all open solicitations, prioritized by need score."""
-    # Get all open solicitations with their ZIP need scores
-    solicitations = Solicitation.query.filter_by(status="open").all()
-
-    # Pair each solicitation with its ZIP need score and sort by urgency
-    ranked = []
-    for sol in solicitations:
-        need = get_need_score(sol.zip_code)
-        ranked.append((sol, need))
-    ranked.sort(key=lambda x: x[1], reverse=True)
-
-    action_plan = []
-    for priority, (sol, need) in enumerate(ranked, 1):
-        # Run existing matching engine for this solicitation
-        matches = generate_matches(sol.id)
-
-        top_match = None
-        recommended_action = "Expand search — no organizations in range"
-        if isinstance(matches, list) and len(matches) > 0:
-            top_match = matches[0]
-            score = top_match.get("score", 0)
-            if score >= 80:
-                recommended_action = "Deploy immediately — high-confidence match"
-            elif score >= 60:
-                recommended_action = "Contact organization — strong potential"
-            else:
-                recommended_action = "Review match — consider expanding criteria"
-
-        action_plan.append({
-            "priority": priority,
-            "solicitation": {
-                "id": sol.id,
-                "title": sol.title,
-                "agency": sol.agency if sol.source_type != "commercial" else sol.company_name,
-                "zip_code": sol.zip_code,
-                "source_type": sol.source_type,
-                "estimated_value": sol.estimated_value,
-            },
-            "need_score": round(need, 1),
-            "total_matches": len(matches) if isinstance(matches, list) else 0,
-            "top_match": {
-                "organization_name": top_match.get("organization", {}).get("name", "Unknown"),
-                "org_type": top_match.get("organization", {}).get("org_type", ""),
-                "score": round(top_match.get("score", 0), 1),
-                "distance_miles": round(top_match.get("distance_miles", 0), 1),
-                "explanation": top_match.get("explanation", ""),
-            } if top_match else None,
-            "recommended_action": recommended_action,
-        })
+    # Serialize before commit expires the freshly loaded rows
+    serialized = serialize_matches(results, {c["org"].id: c["org"] for c in candidates})
 
-    return {
-        "total_solicitations": len(action_plan),
-        "action_plan": action_plan,
-    }
+    db.session.merge(MatchInputVersion(solicitation_id=solicitation_id, **inputs))
+    db.session.commit()
+    return serialized
@@ -0,0 +1,173 @@
+"""
+Cached supplier × distributor geometry for portal partner lists.
+
+Partner ranking needs, for every supplier/distributor pair, the distance
+between them, plus each organization's position and capability mask. None
+of that depends on the solicitation being viewed, so it is built once per
+organization set and held per worker. Rows and columns are kept in id order,
+which is the order the portals always listed partners in, so ties rank the
+same way. An organization write only touches its own row/column.
+"""
+import numpy as np
+from app import db
+from app.models.organization import Organization
+from app.services.cache_versions import VersionedCache, watch
+from app.services.capabilities import term_mask, vocabulary
+from app.services.geo import distance_matrix, haversine, to_radians
+
+PARTNER_ROLES = ("supplier", "distributor")
+
+
+class RoleSet:
+    """Id-ordered positions (radians) and capability masks of one org type."""
+
+    def __init__(self):
+        self.ids = []
+        self.index = {}
+        self.lat = np.zeros(0)
+        self.lng = np.zeros(0)
+        self.masks = []
+        self._mask_matrix = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _reindex(self):
+        self.index = {org_id: i for i, org_id in enumerate(self.ids)}
+        self._mask_matrix = None
+
+    def load(self, rows):
+        self.ids = [r[0] for r in rows]
+        self.lat, self.lng = to_radians([r[1] for r in rows], [r[2] for r in rows])
+        self.masks = [term_mask(r[3]) for r in rows]
+        self._reindex()
+
+    def insert(self, org_id, lat, lng, capabilities):
+        """Insert in id order and return the new position."""
+        pos = int(np.searchsorted(np.asarray(self.ids, dtype=np.int64), org_id))
+        rlat, rlng = to_radians(lat, lng)
+        self.ids.insert(pos, org_id)
+        self.lat = np.insert(self.lat, pos, rlat)
+        self.lng = np.insert(self.lng, pos, rlng)
+        self.masks.insert(pos, term_mask(capabilities))
+        self._reindex()
+        return pos
+
+    def remove(self, org_id):
+        """Drop ``org_id`` and return its old position (None if absent)."""
+        pos = self.index.get(org_id)
+        if pos is None:
+            return None
+        del self.ids[pos]
+        del self.masks[pos]
+        self.lat = np.delete(self.lat, pos)
+        self.lng = np.delete(self.lng, pos)
+        self._reindex()
+        return pos
+
+    def mask_matrix(self):
+        """Capability masks as a uint64 word matrix, rebuilt when the vocabulary grows."""
+        words = max(1, (len(vocabulary) + 63) // 64)
+        if self._mask_matrix is None or self._mask_matrix.shape[1] != words:
+            self._mask_matrix = vocabulary.matrix(self.masks)
+        return self._mask_matrix
+
+    def overlap_percents(self, mask):
+        """Share of ``mask``'s terms each member covers, 0-100, in id order."""
+        total = mask.bit_count()
+        if not total or not self.ids:
+            return np.zeros(len(self.ids))
+        matrix = self.mask_matrix()
+        query = vocabulary.matrix([mask])[0, :matrix.shape[1]]
+        return np.bitwise_count(matrix & query).sum(axis=1) / total * 100
+
+
+class OrgPairs:
+    """Supplier and distributor role sets plus the supplier × distributor distance matrix."""
+
+    def __init__(self):
+        self.roles = {role: RoleSet() for role in PARTNER_ROLES}
+        self.distances = np.zeros((0, 0))  # miles, rows: suppliers, columns: distributors
+
+    @property
+    def suppliers(self):
+        return self.roles["supplier"]
+
+    @property
+    def distributors(self):
+        return self.roles["distributor"]
+
+    def load(self, rows):
+        for role, role_set in self.roles.items():
+            role_set.load([r[1:] for r in rows if r[0] == role])
+        s, d = self.suppliers, self.distributors
+        self.distances = distance_matrix(s.lat, s.lng, d.lat, d.lng)
+
+    def remove(self, org_id):
+        for axis, role_set in enumerate((self.suppliers, self.distributors)):
+            pos = role_set.remove(org_id)
+            if pos is not None:
+                self.distances = np.delete(self.distances, pos, axis=axis)
+
+    def upsert(self, org_id, org_type, lat, lng, capabilities):
+        self.remove(org_id)
+        if org_type == "supplier":
+            pos = self.suppliers.insert(org_id, lat, lng, capabilities)
+            d = self.distributors
+            row = distance_matrix(self.suppliers.lat[pos:pos + 1], self.suppliers.lng[pos:pos + 1], d.lat, d.lng)
+            self.distances = np.insert(self.distances, pos, row[0], axis=0)
+        elif org_type == "distributor":
+            pos = self.distributors.insert(org_id, lat, lng, capabilities)
+            s = self.suppliers
+            col = distance_matrix(s.lat, s.lng, self.distributors.lat[pos:pos + 1], self.distributors.lng[pos:pos + 1])
+            self.distances = np.insert(self.distances, pos, col[:, 0], axis=1)
+
+    def supplier_row(self, supplier_id, lat=None, lng=None):
+        """Miles from a supplier to every distributor, in id order.
+
+        A supplier the cache has not seen yet (written outside the ORM, or by
+        another worker since the last refresh) is measured from ``lat``/``lng``.
+        """
+        i = self.suppliers.index.get(supplier_id)
+        if i is not None:
+            return self.distances[i]
+        d = self.distributors
+        return distance_matrix(*to_radians([lat], [lng]), d.lat, d.lng)[0]
+
+    def distributor_column(self, distributor_id, lat=None, lng=None):
+        """Miles from a distributor to every supplier, in id order; uncached ones use ``lat``/``lng``."""
+        j = self.distributors.index.get(distributor_id)
+        if j is not None:
+            return self.distances[:, j]
+        s = self.suppliers
+        return distance_matrix(s.lat, s.lng, *to_radians([lat], [lng]))[:, 0]
+
+    def distance(self, supplier, distributor):
+        """Miles between two organizations, measured directly if either is not cached."""
+        i, j = self.suppliers.index.get(supplier.id), self.distributors.index.get(distributor.id)
+        if i is not None and j is not None:
+            return float(self.distances[i, j])
+        return haversine(supplier.lat, supplier.lng, distributor.lat, distributor.lng)
+
+
+def _build_org_pairs():
+    pairs = OrgPairs()
+    rows = db.session.query(
+        Organization.org_type, Organization.id, Organization.lat, Organization.lng, Organization.capabilities
+    ).filter(Organization.org_type.in_(PARTNER_ROLES)).order_by(Organization.id).all()
+    pairs.load(rows)
+    return pairs
+
+
+def _patch_org_pairs(pairs, changes):
+    for change in changes:
+        values = change.values
+        if change.op == "delete":
+            pairs.remove(values["id"])
+        else:
+            pairs.upsert(values["id"], values["org_type"], values["lat"], values["lng"], values["capabilities"])
+
+
+# Shares the "organizations" version with the spatial index
+watch(Organization, "organizations")
+org_pairs = VersionedCache("organizations", _build_org_pairs, _patch_org_pairs)
@@ -4,14 +4,17 @@ Predicts where food insecurity will strike using demographic, socioeconomic,
 climate risk, and food desert data. Incorporates race, class, and geographic
 susceptibility to emergency disasters.
 """
-import math
-import random
 from datetime import date, timedelta
+import numpy as np
 from app import db
 from app.models.zip_need_score import ZipNeedScore
 from app.models.organization import Organization
 from app.models.solicitation import Solicitation
 from app.models.emergency_capacity import EmergencyCapacity
+from app.services.geo import coords_radians, distance_matrix
+from app.services.capacity_summary import capacity_summary
+from app.services.stable_random import stable_draw_columns
+from app.services.zip_coverage import nearby_organizations
 
 # Climate risk zones — states with higher disaster susceptibility
 HURRICANE_STATES = {"FL", "TX", "LA", "MS", "AL", "GA", "SC", "NC"}
@@ -46,33 +49,6 @@ def _climate_risk_score(state):
     return min(100, score)
 
 
-def _socioeconomic_vulnerability(zip_data):
-    """Score socioeconomic vulnerability considering food insecurity,
-    SNAP rates, and population density — which disproportionately
-    affect communities of color and low-income areas."""
-    fi_rate = zip_data.food_insecurity_rate or 0
-    snap_rate = zip_data.snap_participation_rate or 0
-    need = zip_data.need_score or 0
-
-    # Weight: food insecurity is strongest signal, SNAP participation
-    # indicates economic strain, need_score is composite
-    score = (fi_rate * 200) + (snap_rate * 150) + (need * 0.3)
-    return min(100, score)
-
-
-def _food_desert_score(zip_data, orgs_in_range):
-    """Score how much of a food desert this area is.
-    Fewer organizations nearby = more of a food desert."""
-    if len(orgs_in_range) == 0:
-        return 100  # Complete food desert
-    elif len(orgs_in_range) == 1:
-        return 75
-    elif len(orgs_in_range) <= 3:
-        return 50
-    else:
-        return max(0, 30 - len(orgs_in_range) * 3)
-
-
 def _disaster_types_for_state(state):
     types = []
     if state in HURRICANE_STATES:
@@ -90,230 +66,207 @@ def _disaster_types_for_state(state):
     return types
 
 
-def haversine(lat1, lng1, lat2, lng2):
-    R = 3959
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
-    return R * 2 * math.asin(math.sqrt(a))
+def _clamp(values, lo=None, hi=None):
+    """``min(hi, max(lo, v))`` over an array, plus a mask of the entries that hit a bound."""
+    hit = np.zeros(len(values), dtype=bool)
+    # Inclusive, because max(lo, v) and min(hi, v) return the bound itself on a tie
+    if lo is not None:
+        hit |= values <= lo
+        values = np.where(values <= lo, lo, values)
+    if hi is not None:
+        hit |= values >= hi
+        values = np.where(values >= hi, hi, values)
+    return values, hit
 
 
-def predict_food_insecurity():
-    """Run ML prediction model across all monitored ZIP codes.
-    Returns predictions with 30/60/90 day probabilities."""
-    zips = ZipNeedScore.query.all()
-    orgs = Organization.query.all()
-    capacities = EmergencyCapacity.query.filter_by(status="available").all()
-    solicitations = Solicitation.query.filter_by(status="open").all()
+def _reported(values, bounded):
+    """One-decimal Python numbers; bounded entries are the int bound, as the
+    scalar ``min``/``max`` returned them."""
+    return [int(v) if b else round(v, 1) for v, b in zip(values.tolist(), bounded.tolist())]
 
-    sol_zips = set(s.zip_code for s in solicitations)
-    cap_zips = set(c.zip_code for c in capacities)
 
-    predictions = []
-    for z in zips:
-        # Find organizations within 100 miles
-        orgs_nearby = [
-            o for o in orgs
-            if haversine(z.lat, z.lng, o.lat, o.lng) <= 100
-        ]
+def _round1(values):
+    """``round(v, 1)`` of every element, exactly as Python rounds each float."""
+    rounded = np.round(values, 1)
+    # np.round scales by 10 first, which can tip values next to a .x5 tie
+    scaled = values * 10
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_tie] = [round(v, 1) for v in values[near_tie].tolist()]
+    return rounded
 
-        climate = _climate_risk_score(z.state)
-        socioeconomic = _socioeconomic_vulnerability(z)
-        desert = _food_desert_score(z, orgs_nearby)
-
-        # Composite risk score (ML model output)
-        # Weights: socioeconomic (35%), climate (25%), food desert (25%), base need (15%)
-        composite = (
-            socioeconomic * 0.35
-            + climate * 0.25
-            + desert * 0.25
-            + (z.need_score or 0) * 0.15
-        )
-        composite = min(100, composite)
-
-        # Time-horizon probabilities
-        # Higher composite = higher near-term probability
-        # Use deterministic seed based on zip for consistency
-        random.seed(hash(z.zip_code) + date.today().toordinal())
-        noise_30 = random.uniform(-5, 5)
-        noise_60 = random.uniform(-8, 8)
-        noise_90 = random.uniform(-10, 10)
-
-        prob_30 = min(99, max(5, composite * 0.85 + noise_30))
-        prob_60 = min(99, max(10, composite * 0.95 + noise_60))
-        prob_90 = min(99, max(15, composite * 1.05 + noise_90))
-
-        # Determine needed supplies based on disaster type and population
-        disaster_types = _disaster_types_for_state(z.state)
-        needed_supplies = _estimate_needed_supplies(z, disaster_types)
 
+def predict_food_insecurity(day=None):
+    """Run ML prediction model across all monitored ZIP codes.
+    Returns predictions with 30/60/90 day probabilities for ``day`` (default today).
+
+    Every score is computed column-wise over NumPy arrays of the ZIP rows."""
+    zips = db.session.query(
+        ZipNeedScore.zip_code, ZipNeedScore.lat, ZipNeedScore.lng, ZipNeedScore.state,
+        ZipNeedScore.city, ZipNeedScore.food_insecurity_rate, ZipNeedScore.population,
+        ZipNeedScore.snap_participation_rate, ZipNeedScore.need_score,
+    ).all()
+    sol_zips = {z for (z,) in db.session.query(Solicitation.zip_code).filter_by(status="open").distinct()}
+    cap_zips = {z for (z,) in db.session.query(EmergencyCapacity.zip_code).filter_by(status="available").distinct()}
+    if not zips:
+        return []
+    zip_codes, lats, lngs, zip_states, cities, fi_raw, population, snap_raw, need_raw = map(list, zip(*zips))
+
+    # Organizations within 100 miles of every ZIP, maintained in zip_coverage
+    nearby = nearby_organizations(zips, 100)
+
+    fi_rate = np.array([v or 0 for v in fi_raw], dtype=np.float64)
+    snap_rate = np.array([v or 0 for v in snap_raw], dtype=np.float64)
+    need = np.array([v or 0 for v in need_raw], dtype=np.float64)
+
+    # Climate terms depend only on the state (a missing state scores like "")
+    states, state_of = np.unique(np.array([s or "" for s in zip_states], dtype=object), return_inverse=True)
+    climate = np.array([_climate_risk_score(s) for s in states], dtype=np.int64)[state_of]
+    disaster_by_state = [_disaster_types_for_state(s) for s in states]
+
+    # Socioeconomic vulnerability: food insecurity is the strongest signal,
+    # SNAP participation indicates economic strain, need_score is composite
+    socioeconomic, socio_capped = _clamp((fi_rate * 200) + (snap_rate * 150) + (need * 0.3), hi=100)
+    # Food desert: fewer organizations nearby = more of a food desert (100 = none at all)
+    desert = np.select(
+        [nearby == 0, nearby == 1, nearby <= 3],
+        [100, 75, 50],
+        np.maximum(0, 30 - nearby * 3),
+    )
+
+    # Composite risk score (ML model output)
+    # Weights: socioeconomic (35%), climate (25%), food desert (25%), base need (15%)
+    composite, composite_capped = _clamp(
+        socioeconomic * 0.35 + climate * 0.25 + desert * 0.25 + need * 0.15, hi=100
+    )
+
+    # Time-horizon probabilities
+    # Higher composite = higher near-term probability
+    # Noise is keyed on (zip, day), so every worker computes the same value
+    today = (day or date.today()).toordinal()
+    draws = stable_draw_columns(zip_codes, today, n=3)
+    prob_30, bound_30 = _clamp(composite * 0.85 + (-5 + 10 * draws[:, 0]), lo=5, hi=99)
+    prob_60, bound_60 = _clamp(composite * 0.95 + (-8 + 16 * draws[:, 1]), lo=10, hi=99)
+    prob_90, bound_90 = _clamp(composite * 1.05 + (-10 + 20 * draws[:, 2]), lo=15, hi=99)
+
+    # Severity classification
+    severity = np.select(
+        [composite >= 80, composite >= 65, composite >= 50],
+        ["critical", "high", "elevated"],
+        "moderate",
+    ).tolist()
+
+    disaster_types = [disaster_by_state[k] for k in state_of.tolist()]
+    # Determine needed supplies based on disaster type and population
+    supplies = _needed_supplies_columns(population, disaster_types)
+    columns = {
+        "zip_code": zip_codes,
+        "city": cities,
+        "state": zip_states,
+        "lat": lats,
+        "lng": lngs,
+        "population": population,
+        "food_insecurity_rate": [round((v or 0) * 100, 1) for v in fi_raw],
+        "snap_participation_rate": [round((v or 0) * 100, 1) for v in snap_raw],
+        "need_score": need_raw,
+        "composite_risk": _reported(composite, composite_capped),
+        "severity": severity,
+        "climate_risk": climate.tolist(),
+        "socioeconomic_vulnerability": _reported(socioeconomic, socio_capped),
+        "food_desert_score": desert.tolist(),
+        "disaster_types": [list(types) for types in disaster_types],
+        "probability_30_days": _reported(prob_30, bound_30),
+        "probability_60_days": _reported(prob_60, bound_60),
+        "probability_90_days": _reported(prob_90, bound_90),
+        "needed_supplies": supplies,
+        "nearby_organizations": nearby.tolist(),
         # Check if area has coverage
-        has_solicitation = z.zip_code in sol_zips
-        has_capacity = z.zip_code in cap_zips
-        coverage_status = "covered" if (has_solicitation or has_capacity) else "gap"
-
-        # Severity classification
-        if composite >= 80:
-            severity = "critical"
-        elif composite >= 65:
-            severity = "high"
-        elif composite >= 50:
-            severity = "elevated"
-        else:
-            severity = "moderate"
-
-        predictions.append({
-            "zip_code": z.zip_code,
-            "city": z.city,
-            "state": z.state,
-            "lat": z.lat,
-            "lng": z.lng,
-            "population": z.population,
-            "food_insecurity_rate": round((z.food_insecurity_rate or 0) * 100, 1),
-            "snap_participation_rate": round((z.snap_participation_rate or 0) * 100, 1),
-            "need_score": z.need_score,
-            "composite_risk": round(composite, 1),
-            "severity": severity,
-            "climate_risk": round(climate, 1),
-            "socioeconomic_vulnerability": round(socioeconomic, 1),
-            "food_desert_score": round(desert, 1),
-            "disaster_types": disaster_types,
-            "probability_30_days": round(prob_30, 1),
-            "probability_60_days": round(prob_60, 1),
-            "probability_90_days": round(prob_90, 1),
-            "needed_supplies": needed_supplies,
-            "nearby_organizations": len(orgs_nearby),
-            "coverage_status": coverage_status,
-        })
+        "coverage_status": ["covered" if z in sol_zips or z in cap_zips else "gap" for z in zip_codes],
+    }
+    keys = list(columns)
+    predictions = [dict(zip(keys, row)) for row in zip(*columns.values())]
 
     predictions.sort(key=lambda p: p["composite_risk"], reverse=True)
     return predictions
 
 
-def _estimate_needed_supplies(zip_data, disaster_types):
-    """Estimate what supplies an area will need based on disaster type and population."""
-    pop = zip_data.population or 10000
-    # Assume 20% of population affected in emergency
-    affected = int(pop * 0.2)
-
-    supplies = []
-    # Everyone needs water and non-perishables
-    supplies.append({
-        "type": "water",
-        "name": "Drinking Water",
-        "quantity": affected * 3,  # 3 gallons per person
-        "unit": "gallons",
-    })
-    supplies.append({
-        "type": "non_perishable",
-        "name": "MREs / Shelf-Stable Meals",
-        "quantity": affected * 9,  # 3 meals x 3 days
-        "unit": "meals",
-    })
-
-    if "Hurricane" in disaster_types or "Flood" in disaster_types:
-        supplies.append({
-            "type": "shelf_stable",
-            "name": "Canned Goods",
-            "quantity": int(affected * 5),
-            "unit": "cans",
-        })
-        supplies.append({
-            "type": "hygiene_supplies",
-            "name": "Emergency Hygiene Kits",
-            "quantity": int(affected * 0.5),
-            "unit": "kits",
-        })
-
-    if "Winter Storm" in disaster_types:
-        supplies.append({
-            "type": "shelf_stable",
-            "name": "Hot Meal Kits",
-            "quantity": affected * 3,
-            "unit": "kits",
-        })
-
-    # Baby formula for ~3% of affected pop
-    supplies.append({
-        "type": "baby_formula",
-        "name": "Infant Formula",
-        "quantity": max(10, int(affected * 0.03 * 7)),
-        "unit": "cans",
-    })
+def _needed_supplies_columns(population, disaster_types):
+    """Estimate what supplies each area will need based on disaster type and population.
 
-    # Medical nutrition for ~5% (elderly, diabetic, etc)
-    supplies.append({
-        "type": "medical_nutrition",
-        "name": "Medical Nutrition Supplements",
-        "quantity": max(20, int(affected * 0.05 * 7)),
-        "unit": "units",
-    })
-
-    return supplies
+    ``population`` holds raw values (None allowed); ``disaster_types`` is
+    each row's list. Quantities are computed as arrays, lists are per row.
+    """
+    pop = np.array([p or 10000 for p in population], dtype=np.float64)
+    # Assume 20% of population affected in emergency
+    affected = (pop * 0.2).astype(np.int64)
+    water = (affected * 3).tolist()  # 3 gallons per person
+    meals = (affected * 9).tolist()  # 3 meals x 3 days
+    canned = (affected * 5).tolist()
+    hygiene = (affected * 0.5).astype(np.int64).tolist()
+    hot_meal_kits = (affected * 3).tolist()
+    # Baby formula for ~3% of affected pop, medical nutrition for ~5% (elderly, diabetic, etc)
+    formula = np.maximum(10, (affected * 0.03 * 7).astype(np.int64)).tolist()
+    medical = np.maximum(20, (affected * 0.05 * 7).astype(np.int64)).tolist()
+
+    columns = []
+    for i, types in enumerate(disaster_types):
+        supplies = [
+            {"type": "water", "name": "Drinking Water", "quantity": water[i], "unit": "gallons"},
+            {"type": "non_perishable", "name": "MREs / Shelf-Stable Meals", "quantity": meals[i], "unit": "meals"},
+        ]
+        if "Hurricane" in types or "Flood" in types:
+            supplies.append({"type": "shelf_stable", "name": "Canned Goods", "quantity": canned[i], "unit": "cans"})
+            supplies.append({"type": "hygiene_supplies", "name": "Emergency Hygiene Kits", "quantity": hygiene[i], "unit": "kits"})
+        if "Winter Storm" in types:
+            supplies.append({"type": "shelf_stable", "name": "Hot Meal Kits", "quantity": hot_meal_kits[i], "unit": "kits"})
+        supplies.append({"type": "baby_formula", "name": "Infant Formula", "quantity": formula[i], "unit": "cans"})
+        supplies.append({"type": "medical_nutrition", "name": "Medical Nutrition Supplements", "quantity": medical[i], "unit": "units"})
+        columns.append(supplies)
+    return columns
 
 
 def find_surplus_shortage_matches():
     """Match areas with surplus capacity to areas with shortage.
-    E.g., a food desert in Kansas gets matched with a vendor with surplus in Florida."""
-    zips = ZipNeedScore.query.all()
-    capacities = EmergencyCapacity.query.filter_by(status="available").all()
-    orgs = Organization.query.all()
+    E.g., a food desert in Kansas gets matched with a vendor with surplus in Florida.
+
+    Capacity comes from the grouped per-organization summary and every
+    shortage × surplus score is computed on one distance matrix."""
+    capacity = capacity_summary.get()
 
     # Identify shortage areas (high need, low coverage)
-    sol_zips = set(s.zip_code for s in Solicitation.query.all())
-    org_zips = set(o.zip_code for o in orgs)
-
-    shortage_areas = []
-    for z in zips:
-        if z.need_score >= 65:
-            orgs_nearby = [
-                o for o in orgs
-                if haversine(z.lat, z.lng, o.lat, o.lng) <= 150
-            ]
-            if len(orgs_nearby) <= 2:
-                shortage_areas.append(z)
-
-    # Identify surplus areas (orgs with capacity that can expand)
-    surplus_orgs = []
-    for org in orgs:
-        caps = [c for c in capacities if c.organization_id == org.id]
-        total_qty = sum(c.quantity for c in caps)
-        if total_qty > 0 or org.service_radius_miles >= 300:
-            surplus_orgs.append({
-                "org": org,
-                "capacity": caps,
-                "total_quantity": total_qty,
-            })
-
-    # Also count orgs with large service radii as potential surplus providers
-    for org in orgs:
-        if org.service_radius_miles >= 300 and not any(s["org"].id == org.id for s in surplus_orgs):
-            surplus_orgs.append({
-                "org": org,
-                "capacity": [],
-                "total_quantity": 0,
-            })
+    high_need = ZipNeedScore.query.filter(ZipNeedScore.need_score >= 65).all()
+    nearby_counts = nearby_organizations(high_need, 150)
+    shortage_areas = [z for z, n in zip(high_need, nearby_counts.tolist()) if n <= 2]
+
+    # Surplus roster: organizations with available stock, plus large service
+    # radii that can expand into distant areas
+    stocked = {org_id for org_id in capacity.organizations() if capacity.quantity(org_id) > 0}
+    surplus_orgs = [org for org in Organization.query.all()
+                    if org.id in stocked or org.service_radius_miles >= 300]
+
+    # Shortage × surplus distances and scores in one matrix
+    sh_lat, sh_lng = coords_radians(shortage_areas)
+    su_lat, su_lng = coords_radians(surplus_orgs)
+    distances = distance_matrix(sh_lat, sh_lng, su_lat, su_lng)
+    radius = np.array([org.service_radius_miles for org in surplus_orgs], dtype=np.float64)
+    has_stock = np.array([org.id in stocked for org in surplus_orgs], dtype=bool)
+    eligible = (distances <= radius * 1.5) & (distances > 50)  # Not already local
+    # Score: closer + more capacity = better
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.maximum(0, 100 - (distances / radius) * 50) + np.where(has_stock, 20, 0)
+    scores = _round1(np.where(eligible, scores, 0))
 
     matches = []
-    for shortage in shortage_areas:
-        best_matches = []
-        for surplus in surplus_orgs:
-            org = surplus["org"]
-            dist = haversine(shortage.lat, shortage.lng, org.lat, org.lng)
-            if dist <= org.service_radius_miles * 1.5 and dist > 50:  # Not already local
-                # Score: closer + more capacity = better
-                score = max(0, 100 - (dist / org.service_radius_miles) * 50)
-                if surplus["total_quantity"] > 0:
-                    score += 20
-                best_matches.append({
-                    "organization": org.to_dict(),
-                    "distance_miles": round(dist, 1),
-                    "score": round(score, 1),
-                    "available_capacity": surplus["total_quantity"],
-                    "supply_types": list(set(c.supply_type for c in surplus["capacity"])),
-                })
-
-        best_matches.sort(key=lambda m: m["score"], reverse=True)
+    for row, shortage in enumerate(shortage_areas):
+        cols = np.flatnonzero(eligible[row])
+        # Best five by score; equal scores keep roster order
+        best = cols[np.lexsort((cols, -scores[row, cols]))[:5]].tolist()
+        best_matches = [{
+            "organization": surplus_orgs[col].to_dict(),
+            "distance_miles": round(float(distances[row, col]), 1),
+            "score": float(scores[row, col]),
+            "available_capacity": capacity.quantity(surplus_orgs[col].id),
+            "supply_types": capacity.supply_types(surplus_orgs[col].id),
+        } for col in best]
 
         matches.append({
             "shortage_area": {
@@ -326,7 +279,7 @@ def find_surplus_shortage_matches():
                 "population": shortage.population,
                 "food_insecurity_rate": round((shortage.food_insecurity_rate or 0) * 100, 1),
             },
-            "matched_suppliers": best_matches[:5],
+            "matched_suppliers": best_matches,
         })
 
     matches.sort(key=lambda m: m["shortage_area"]["need_score"], reverse=True)
@@ -0,0 +1,104 @@
+"""
+Daily materialized food-insecurity predictions.
+
+The model's noise is seeded by the day and its inputs (ZIP scores,
+organizations, open solicitations, available capacity) change rarely, so
+predictions are computed once and stored in ``prediction_snapshots``, one
+row per ZIP with indexed date/state/severity columns. ``ensure_snapshot``
+rebuilds on the first request of a day, or when the cache version of an
+input table moved since the snapshot was built.
+scripts/build_prediction_snapshot.py (or a "prediction_snapshot" job) runs
+the same build ahead of traffic.
+"""
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, func, insert
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.prediction_snapshot import PredictionSnapshot
+from app.models.prediction_snapshot_run import PredictionSnapshotRun
+from app.services.cache_versions import current_version
+from app.services.prediction_model import predict_food_insecurity
+
+# Cache-version names of the tables predict_food_insecurity reads
+INPUT_VERSIONS = ("zip_need_scores", "organizations", "solicitations", "emergency_capacities")
+
+
+def input_versions():
+    return {name: current_version(name) for name in INPUT_VERSIONS}
+
+
+def build_snapshot(day=None):
+    """Compute ``day``'s predictions and replace its snapshot rows; returns the run."""
+    day = day or date.today()
+    versions = input_versions()
+    predictions = predict_food_insecurity(day)
+    db.session.execute(delete(PredictionSnapshot).where(PredictionSnapshot.snapshot_date == day))
+    rows = [{
+        "snapshot_date": day,
+        "rank": rank,
+        "zip_code": p["zip_code"],
+        "state": p["state"],
+        "severity": p["severity"],
+        "composite_risk": p["composite_risk"],
+        "population": p["population"],
+        "coverage_status": p["coverage_status"],
+        "payload": p,
+    } for rank, p in enumerate(predictions)]
+    if rows:
+        db.session.execute(insert(PredictionSnapshot), rows)
+    run = db.session.merge(PredictionSnapshotRun(
+        snapshot_date=day, input_versions=versions, zones=len(rows), built_at=datetime.utcnow(),
+    ))
+
+    cutoff = day - timedelta(days=current_app.config["PREDICTION_SNAPSHOT_RETENTION_DAYS"])
+    db.session.execute(delete(PredictionSnapshot).where(PredictionSnapshot.snapshot_date < cutoff))
+    db.session.execute(delete(PredictionSnapshotRun).where(PredictionSnapshotRun.snapshot_date < cutoff))
+    db.session.commit()
+    return run
+
+
+def ensure_snapshot(day=None):
+    """Make sure ``day``'s snapshot exists and is current; returns the day."""
+    day = day or date.today()
+    run = db.session.get(PredictionSnapshotRun, day)
+    if run is None or run.input_versions != input_versions():
+        try:
+            build_snapshot(day)
+        except IntegrityError:
+            # Another worker built the same day concurrently; its rows stand
+            db.session.rollback()
+    return day
+
+
+def snapshot_query(day, severity=None, state=None):
+    query = PredictionSnapshot.query.filter(PredictionSnapshot.snapshot_date == day)
+    if severity:
+        query = query.filter(PredictionSnapshot.severity == severity)
+    if state:
+        query = query.filter(PredictionSnapshot.state == state.upper())
+    return query
+
+
+def snapshot_summary(query):
+    """Zone counts by severity, population at risk and coverage gaps, in one GROUP BY."""
+    grouped = query.order_by(None).with_entities(
+        PredictionSnapshot.severity,
+        PredictionSnapshot.coverage_status,
+        func.count(PredictionSnapshot.id),
+        func.sum(PredictionSnapshot.population),
+    ).group_by(PredictionSnapshot.severity, PredictionSnapshot.coverage_status).all()
+    counts = {"critical": 0, "high": 0, "elevated": 0, "moderate": 0}
+    at_risk = gaps = 0
+    for severity, coverage, zones, population in grouped:
+        counts[severity] = counts.get(severity, 0) + zones
+        if severity in ("critical", "high"):
+            at_risk += population or 0
+        if coverage == "gap":
+            gaps += zones
+    return {
+        "total_zones": sum(counts.values()),
+        **counts,
+        "total_population_at_risk": at_risk,
+        "coverage_gaps": gaps,
+    }
@@ -0,0 +1,95 @@
+"""
+Bounded top-k selection for ranking endpoints.
+
+Endpoints score every candidate but return only the best few. ``TopK``
+keeps the k best ``(score, item)`` pairs in a heap, so response payloads
+are built for the winners only. Ties keep arrival order, exactly like a
+stable ``sorted(...)[:k]``.
+
+``top_k_pairs`` ranks row × column pairs whose score is bounded by a
+row-only plus a column-only term without scoring every pair.
+"""
+import heapq
+
+
+class TopK:
+    """The ``k`` highest (or, with ``largest=False``, lowest) scored items seen."""
+
+    def __init__(self, k, largest=True):
+        self.k = k
+        self.sign = 1 if largest else -1
+        self.heap = []  # (signed score, -arrival, item); the root is the current worst
+        self.seen = 0
+
+    def __len__(self):
+        return self.seen
+
+    def push(self, score, item, order=None):
+        """Offer ``item``; among equal scores, lower ``order`` (default: arrival) wins."""
+        entry = (self.sign * score, -(self.seen if order is None else order), item)
+        self.seen += 1
+        if self.k <= 0:
+            return
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, entry)
+
+    def threshold(self):
+        """Score of the worst kept item once k are held, else None."""
+        if self.k <= 0 or len(self.heap) < self.k:
+            return None
+        return self.sign * self.heap[0][0]
+
+    def items(self):
+        """Kept items, best first."""
+        return [item for _, _, item in sorted(self.heap, key=lambda e: e[:2], reverse=True)]
+
+
+def top_k(items, k, key, largest=True):
+    """``sorted(items, key=key, reverse=largest)[:k]`` without sorting everything."""
+    ranked = TopK(k, largest)
+    for item in items:
+        ranked.push(key(item), item)
+    return ranked.items()
+
+
+def top_k_pairs(row_scores, col_scores, k, exact, key=lambda total: total, brute_force=False, slack=1e-9):
+    """Exact top-k ``(i, j)`` pairs by ``exact(i, j)``, ties in row-major order.
+
+    Returns the ``TopK``: ``items()`` are the pairs, best first, and
+    ``len()`` is how many pairs were scored.
+
+    Requires ``exact(i, j) <= key(row_scores[i] + col_scores[j] + slack)``
+    with ``key`` non-decreasing (e.g. a cap followed by rounding). Pairs are
+    visited best-bound first, merging both score lists sorted descending,
+    and the search stops once no remaining bound can reach the k-th score.
+    ``brute_force`` scores every pair; it is the reference for tests.
+    """
+    n_rows, n_cols = len(row_scores), len(col_scores)
+    ranked = TopK(k)
+    if k <= 0 or not n_rows or not n_cols:
+        return ranked
+    if brute_force:
+        for i in range(n_rows):
+            for j in range(n_cols):
+                ranked.push(exact(i, j), (i, j), order=i * n_cols + j)
+        return ranked
+
+    rows = sorted(range(n_rows), key=lambda i: row_scores[i], reverse=True)
+    cols = sorted(range(n_cols), key=lambda j: col_scores[j], reverse=True)
+    frontier = [(-(row_scores[rows[0]] + col_scores[cols[0]]), 0, 0)]
+    queued = {(0, 0)}
+    while frontier:
+        neg_bound, a, b = heapq.heappop(frontier)
+        worst = ranked.threshold()
+        # Equal bounds keep searching: a tie earlier in row-major order still wins
+        if worst is not None and key(-neg_bound + slack) < worst:
+            break
+        i, j = rows[a], cols[b]
+        ranked.push(exact(i, j), (i, j), order=i * n_cols + j)
+        for na, nb in ((a + 1, b), (a, b + 1)):
+            if na < n_rows and nb < n_cols and (na, nb) not in queued:
+                queued.add((na, nb))
+                heapq.heappush(frontier, (-(row_scores[rows[na]] + col_scores[cols[nb]]), na, nb))
+    return ranked
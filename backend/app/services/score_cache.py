@@ -0,0 +1,98 @@
+"""
+LLM match-score cache.
+
+Scores are keyed by a hash of the model name and the rendered match prompt.
+The prompt carries every prompt-relevant field of both records, so editing
+either side changes the key and the stale entry is simply never read again.
+A per-process LRU sits in front of the ``llm_score_cache`` table.
+"""
+import hashlib
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.llm_score_cache import LlmScoreCache
+
+
+def fingerprint(prompt, model):
+    return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def _state():
+    state = current_app.extensions.get("foodmatch_score_cache")
+    if state is None:
+        state = {
+            "lru": OrderedDict(),
+            "stats": {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0},
+        }
+        current_app.extensions["foodmatch_score_cache"] = state
+    return state
+
+
+def _remember(lru, key, result):
+    lru[key] = result
+    lru.move_to_end(key)
+    while len(lru) > current_app.config["LLM_CACHE_SIZE"]:
+        lru.popitem(last=False)
+
+
+def lookup_many(keys):
+    """``{fingerprint: {"score", "explanation"}}`` for every key already scored."""
+    state = _state()
+    lru, stats = state["lru"], state["stats"]
+    found = {}
+    missing = []
+    for key in keys:
+        if key in lru:
+            lru.move_to_end(key)
+            found[key] = lru[key]
+            stats["memory_hits"] += 1
+        else:
+            missing.append(key)
+    if missing:
+        rows = LlmScoreCache.query.filter(LlmScoreCache.fingerprint.in_(set(missing))).all()
+        for row in rows:
+            result = {"score": row.score, "explanation": row.explanation or ""}
+            found[row.fingerprint] = result
+            _remember(lru, row.fingerprint, result)
+        for key in missing:
+            stats["db_hits" if key in found else "misses"] += 1
+    return found
+
+
+def store_many(entries, model):
+    """Persist ``{fingerprint: result}`` in the caller's transaction."""
+    if not entries:
+        return
+    state = _state()
+    rows = [
+        {"fingerprint": key, "model": model, "score": r["score"], "explanation": r["explanation"]}
+        for key, r in entries.items()
+    ]
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(LlmScoreCache).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(LlmScoreCache).on_conflict_do_nothing()
+    else:
+        stmt = LlmScoreCache.__table__.insert()
+    # Another worker may have scored the same pair meanwhile; first write wins
+    db.session.execute(stmt, rows)
+    for key, result in entries.items():
+        _remember(state["lru"], key, result)
+    state["stats"]["stores"] += len(entries)
+
+
+def cache_stats():
+    state = _state()
+    stats = dict(state["stats"])
+    lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+    stats["hits"] = stats["memory_hits"] + stats["db_hits"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    stats["memory_entries"] = len(state["lru"])
+    return stats
+
+
+def clear_memory():
+    """Drop the in-process LRU (the table is left intact)."""
+    _state()["lru"].clear()
@@ -0,0 +1,88 @@
+"""
+Inverted index from category to open solicitations.
+
+Each open solicitation is posted under the vocabulary bit of every category
+it lists (see capabilities.py). An organization's relevant solicitations
+are then the union of the postings for its capability bits, so portal work
+scales with the solicitations that share a category, not the whole open
+backlog. Writes to ``Solicitation`` bump the "solicitations" cache version;
+the writing worker patches its copy in place.
+"""
+from app import db
+from app.models.solicitation import Solicitation
+from app.services.cache_versions import VersionedCache, watch
+from app.services.capabilities import term_mask
+
+
+class CategoryIndex:
+    """``bit -> {solicitation_id}`` postings plus each indexed solicitation's mask."""
+
+    def __init__(self):
+        self.postings = {}
+        self.masks = {}
+
+    def __len__(self):
+        return len(self.masks)
+
+    @staticmethod
+    def _bits(mask):
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def add(self, sol_id, categories):
+        self.remove(sol_id)
+        mask = term_mask(categories)
+        self.masks[sol_id] = mask
+        for bit in self._bits(mask):
+            self.postings.setdefault(bit, set()).add(sol_id)
+
+    def remove(self, sol_id):
+        mask = self.masks.pop(sol_id, None)
+        if mask is None:
+            return
+        for bit in self._bits(mask):
+            posting = self.postings.get(bit)
+            if posting is not None:
+                posting.discard(sol_id)
+                if not posting:
+                    del self.postings[bit]
+
+    def sharing(self, mask):
+        """Sorted ids of indexed solicitations with at least one bit of ``mask``."""
+        ids = set()
+        for bit in self._bits(mask):
+            ids.update(self.postings.get(bit, ()))
+        return sorted(ids)
+
+
+def _build_category_index():
+    index = CategoryIndex()
+    rows = db.session.query(Solicitation.id, Solicitation.categories).filter(
+        Solicitation.status == "open"
+    ).all()
+    for sol_id, categories in rows:
+        index.add(sol_id, categories)
+    return index
+
+
+def _patch_category_index(index, changes):
+    for change in changes:
+        values = change.values
+        if change.op == "delete" or values["status"] != "open":
+            index.remove(values["id"])
+        else:
+            index.add(values["id"], values["categories"])
+
+
+watch(Solicitation, "solicitations")
+category_index = VersionedCache("solicitations", _build_category_index, _patch_category_index)
+
+
+def open_solicitations_sharing(capabilities):
+    """Open solicitations (by id) that list at least one of ``capabilities``."""
+    ids = category_index.get().sharing(term_mask(capabilities))
+    if not ids:
+        return []
+    return Solicitation.query.filter(Solicitation.id.in_(ids)).order_by(Solicitation.id).all()
@@ -0,0 +1,137 @@
+"""
+In-memory spatial index over organization coverage areas.
+
+Each organization is registered in every grid cell its reach
+(``service_radius_miles * 1.5``) can touch, so "which organizations cover
+this point" is a single cell lookup followed by an exact distance check on
+the handful of organizations found there.
+"""
+import math
+import numpy as np
+from app import db
+from app.models.organization import Organization
+from app.services.cache_versions import VersionedCache, watch
+from app.services.geo import EARTH_RADIUS_MILES, distances_from
+
+COVERAGE_FACTOR = 1.5  # same generous filter prefilter_candidates has always used
+MILES_PER_DEGREE_LAT = 69.0
+
+# Cell sizes (degrees) of the multi-resolution grid. Each area goes to the
+# finest level whose cells are at least as tall as its reach, so it touches
+# only a handful of cells whether it spans 10 miles or 1,500. Every size
+# divides 360 so longitude columns wrap cleanly at the antimeridian.
+LEVELS = (0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+
+class CoverageIndex:
+    """Multi-resolution lat/lng grid mapping cells to the keys of areas that reach them."""
+
+    def __init__(self, levels=LEVELS):
+        self.levels = levels
+        self.grids = {size: {} for size in levels}
+        self.entries = {}  # key -> (lat, lng, reach_miles, level, cells)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _cell(size, lat, lng):
+        return (
+            int((min(lat, 90.0 - 1e-9) + 90) // size),
+            int((lng + 180) // size) % int(360 // size),
+        )
+
+    def _level_for(self, reach_miles):
+        reach_degrees = reach_miles / MILES_PER_DEGREE_LAT
+        for size in self.levels:
+            if size >= reach_degrees:
+                return size
+        return self.levels[-1]
+
+    def _cells_within(self, size, lat, lng, reach_miles):
+        """Cells intersecting the bounding box of a circle (Matuschek's method)."""
+        lng_cells = int(360 // size)
+        r = reach_miles / EARTH_RADIUS_MILES
+        lat_r = math.radians(lat)
+        lat_min = max(-90.0, math.degrees(lat_r - r))
+        lat_max = min(90.0, math.degrees(lat_r + r))
+        if lat_min <= -90.0 or lat_max >= 90.0 or math.sin(r) >= math.cos(lat_r):
+            cols = range(lng_cells)  # circle contains a pole
+        else:
+            dlng = math.degrees(math.asin(math.sin(r) / math.cos(lat_r)))
+            start = int((lng - dlng + 180) // size)
+            stop = min(int((lng + dlng + 180) // size), start + lng_cells - 1)
+            cols = [c % lng_cells for c in range(start, stop + 1)]
+        row_min = self._cell(size, lat_min, 0)[0]
+        row_max = self._cell(size, lat_max, 0)[0]
+        return [(row, col) for row in range(row_min, row_max + 1) for col in cols]
+
+    def insert(self, key, lat, lng, reach_miles):
+        self.remove(key)
+        size = self._level_for(reach_miles)
+        cells = self._cells_within(size, lat, lng, reach_miles)
+        grid = self.grids[size]
+        for cell in cells:
+            grid.setdefault(cell, set()).add(key)
+        self.entries[key] = (lat, lng, reach_miles, size, cells)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        grid = self.grids[entry[3]]
+        for cell in entry[4]:
+            bucket = grid.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del grid[cell]
+
+    def covering(self, lat, lng):
+        """``{key: distance_miles}`` for every area whose reach includes the point."""
+        keys = set()
+        for size, grid in self.grids.items():
+            if grid:
+                keys.update(grid.get(self._cell(size, lat, lng), ()))
+        if not keys:
+            return {}
+        keys = sorted(keys)
+        entries = [self.entries[k] for k in keys]
+        lats = np.radians([e[0] for e in entries])
+        lngs = np.radians([e[1] for e in entries])
+        reach = np.array([e[2] for e in entries])
+        distances = distances_from(lat, lng, lats, lngs)
+        inside = distances <= reach
+        return {k: d for k, d, ok in zip(keys, distances.tolist(), inside.tolist()) if ok}
+
+
+def _reach(radius):
+    return (radius if radius is not None else 100.0) * COVERAGE_FACTOR
+
+
+def _build_org_index():
+    index = CoverageIndex()
+    rows = db.session.query(
+        Organization.id, Organization.lat, Organization.lng, Organization.service_radius_miles
+    ).all()
+    for org_id, lat, lng, radius in rows:
+        index.insert(org_id, lat, lng, _reach(radius))
+    return index
+
+
+def _patch_org_index(index, changes):
+    for change in changes:
+        values = change.values
+        if change.op == "delete":
+            index.remove(values["id"])
+        else:
+            index.insert(values["id"], values["lat"], values["lng"], _reach(values["service_radius_miles"]))
+
+
+watch(Organization, "organizations")
+organization_index = VersionedCache("organizations", _build_org_index, _patch_org_index)
+
+
+def organizations_covering(lat, lng):
+    """``{organization_id: distance_miles}`` for organizations whose reach covers the point."""
+    return organization_index.get().covering(lat, lng)
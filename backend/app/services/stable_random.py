@@ -0,0 +1,42 @@
+"""
+Deterministic pseudo-random draws that are identical in every process.
+
+``hash(str)`` is salted per interpreter (PYTHONHASHSEED), so seeding from
+it gave each worker different prediction noise and vendor prices for the
+same request, and reseeding the global ``random`` module raced between
+threads. Draws here come from a SHA-256 digest of the key parts instead:
+the same key yields the same numbers on every worker, run and platform,
+and no shared generator state is touched.
+
+Each digest supplies up to four 53-bit uniforms in ``[0, 1)``.
+"""
+import hashlib
+import numpy as np
+
+MAX_DRAWS = 4  # 32 digest bytes, 8 per draw
+
+
+def _digest(parts):
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).digest()
+
+
+def _uniforms(words):
+    # Top 53 bits of each big-endian word, scaled like random.random()
+    return (words >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def stable_draws(*parts, n=1):
+    """``n`` uniforms in ``[0, 1)`` determined by ``parts`` alone."""
+    if not 0 < n <= MAX_DRAWS:
+        raise ValueError(f"n must be between 1 and {MAX_DRAWS}")
+    words = np.frombuffer(_digest(parts), dtype=">u8")[:n].astype(np.uint64)
+    return _uniforms(words).tolist()
+
+
+def stable_draw_columns(keys, *salt, n=1):
+    """``(len(keys), n)`` array; row ``i`` equals ``stable_draws(keys[i], *salt, n=n)``."""
+    if not 0 < n <= MAX_DRAWS:
+        raise ValueError(f"n must be between 1 and {MAX_DRAWS}")
+    digests = b"".join(_digest((key, *salt)) for key in keys)
+    words = np.frombuffer(digests, dtype=">u8").reshape(len(keys), MAX_DRAWS)[:, :n].astype(np.uint64)
+    return _uniforms(words)
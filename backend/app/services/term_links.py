@@ -0,0 +1,95 @@
+"""
+Association tables mirroring the JSON term lists of organizations and solicitations.
+
+``Organization.naics_codes``, ``Organization.capabilities`` and
+``Solicitation.categories`` stay the source of truth. Each list is also
+stored one term per row in a narrow table indexed on ``(term, owner_id)``,
+so directory filters become indexed joins instead of ``LIKE`` scans over
+JSON text or Python loops over every row. Flushes that insert, change or
+delete an owner rewrite its rows in the same transaction; existing
+databases are backfilled by ``_run_migrations``.
+"""
+from collections import namedtuple
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from app.models.organization import Organization
+from app.models.organization_capability import OrganizationCapability
+from app.models.organization_naics import OrganizationNaics
+from app.models.solicitation import Solicitation
+from app.models.solicitation_category import SolicitationCategory
+
+TermLink = namedtuple("TermLink", ["model", "attr", "table", "owner", "term"])
+
+LINKS = [
+    TermLink(Organization, "naics_codes", OrganizationNaics.__table__, "organization_id", "naics_code"),
+    TermLink(Organization, "capabilities", OrganizationCapability.__table__, "organization_id", "capability"),
+    TermLink(Solicitation, "categories", SolicitationCategory.__table__, "solicitation_id", "category"),
+]
+_BY_ATTR = {(link.model, link.attr): link for link in LINKS}
+
+
+def _terms(values):
+    """Distinct non-empty terms of a JSON list, as strings, in first-seen order."""
+    return list(dict.fromkeys(str(v) for v in (values or []) if v not in (None, "")))
+
+
+def _rows(link, owner_id, values):
+    return [{link.owner: owner_id, link.term: term} for term in _terms(values)]
+
+
+def _replace(connection, link, owner_id, values):
+    table = link.table
+    connection.execute(table.delete().where(table.c[link.owner] == owner_id))
+    rows = _rows(link, owner_id, values)
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_term_links(session, flush_context):
+    connection = None
+    for link in LINKS:
+        for obj in session.new:
+            if isinstance(obj, link.model):
+                connection = connection or session.connection()
+                _replace(connection, link, obj.id, getattr(obj, link.attr))
+        for obj in session.dirty:
+            if isinstance(obj, link.model) and inspect(obj).attrs[link.attr].history.has_changes():
+                connection = connection or session.connection()
+                _replace(connection, link, obj.id, getattr(obj, link.attr))
+        for obj in session.deleted:
+            if isinstance(obj, link.model):
+                connection = connection or session.connection()
+                _replace(connection, link, obj.id, None)
+
+
+def backfill_term_links(connection):
+    """Fill empty association tables from the JSON columns; returns rows written."""
+    written = 0
+    for link in LINKS:
+        if connection.execute(select(link.table).limit(1)).first() is not None:
+            continue
+        source = link.model.__table__
+        rows = []
+        for owner_id, values in connection.execute(select(source.c.id, source.c[link.attr])):
+            rows.extend(_rows(link, owner_id, values))
+        if rows:
+            connection.execute(link.table.insert(), rows)
+            written += len(rows)
+    return written
+
+
+def with_term(query, model, attr, term):
+    """Restrict ``query`` to ``model`` rows whose ``attr`` list contains ``term`` exactly."""
+    link = _BY_ATTR[(model, attr)]
+    table = link.table
+    return query.join(table, table.c[link.owner] == model.id).filter(table.c[link.term] == term)
+
+
+def with_term_containing(query, model, attr, fragment):
+    """Restrict ``query`` to ``model`` rows with a term containing ``fragment``, ignoring case."""
+    link = _BY_ATTR[(model, attr)]
+    table = link.table
+    escaped = fragment.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    owners = select(table.c[link.owner]).where(func.lower(table.c[link.term]).like(f"%{escaped}%", escape="\\"))
+    return query.filter(model.id.in_(owners))
@@ -0,0 +1,184 @@
+"""
+Triage engine: batch matching across all open solicitations, prioritized by need.
+
+With TRIAGE_WORKERS > 1 the ranked solicitations are split into chunks of
+TRIAGE_CHUNK_SIZE and matched in a process pool. Each worker process builds
+its own app, engine and session. Chunks are merged back in priority order.
+
+Incremental triage skips solicitations whose match inputs (see
+matching.match_inputs) are unchanged since their matches were generated and
+reuses the stored MatchResult rows.
+
+iter_action_plan yields entries in priority order as they complete, so the
+streaming endpoint can send each one without holding the whole plan.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from flask import current_app
+from app import db
+from app.models.solicitation import Solicitation
+from app.services.matching import (
+    generate_matches, get_need_score, match_inputs_unchanged, stored_matches,
+)
+
+# Settings a worker process must share with the app that started it
+WORKER_CONFIG_KEYS = (
+    "LLM_MODEL", "LLM_MAX_CONCURRENCY", "LLM_TIMEOUT_SECONDS",
+    "LLM_CACHE_SIZE", "LLM_BATCH_SCORING",
+)
+
+_worker_app = None
+
+
+def rank_open_solicitations():
+    """Open solicitations paired with their ZIP need score, most urgent first."""
+    solicitations = Solicitation.query.filter_by(status="open").all()
+    ranked = [(sol, get_need_score(sol.zip_code)) for sol in solicitations]
+    ranked.sort(key=lambda x: x[1], reverse=True)
+    return ranked
+
+
+def build_action_entry(sol, need, matches):
+    """Action-plan entry for one solicitation (without its priority)."""
+    top_match = None
+    recommended_action = "Expand search — no organizations in range"
+    if isinstance(matches, list) and len(matches) > 0:
+        top_match = matches[0]
+        score = top_match.get("score", 0)
+        if score >= 80:
+            recommended_action = "Deploy immediately — high-confidence match"
+        elif score >= 60:
+            recommended_action = "Contact organization — strong potential"
+        else:
+            recommended_action = "Review match — consider expanding criteria"
+
+    return {
+        "solicitation": {
+            "id": sol.id,
+            "title": sol.title,
+            "agency": sol.agency if sol.source_type != "commercial" else sol.company_name,
+            "zip_code": sol.zip_code,
+            "source_type": sol.source_type,
+            "estimated_value": sol.estimated_value,
+        },
+        "need_score": round(need, 1),
+        "total_matches": len(matches) if isinstance(matches, list) else 0,
+        "top_match": {
+            "organization_name": top_match.get("organization", {}).get("name", "Unknown"),
+            "org_type": top_match.get("organization", {}).get("org_type", ""),
+            "score": round(top_match.get("score", 0), 1),
+            "distance_miles": round(top_match.get("distance_miles", 0), 1),
+            "explanation": top_match.get("explanation", ""),
+        } if top_match else None,
+        "recommended_action": recommended_action,
+    }
+
+
+def _triage_one(sol, need):
+    # Run existing matching engine for this solicitation
+    return build_action_entry(sol, need, generate_matches(sol.id))
+
+
+def _init_worker(database_uri, config):
+    """Process-pool initializer: a private app (engine + session) per worker."""
+    global _worker_app
+    os.environ["DATABASE_URL"] = database_uri
+    from app import create_app
+    _worker_app = create_app()
+    _worker_app.config.update(config)
+
+
+def _triage_chunk(chunk):
+    """Match one chunk of ``(solicitation_id, need)`` pairs inside a worker."""
+    entries = []
+    with _worker_app.app_context():
+        try:
+            for sol_id, need in chunk:
+                sol = db.session.get(Solicitation, sol_id)
+                entries.append(_triage_one(sol, need) if sol else None)
+        finally:
+            db.session.remove()
+    return entries
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def plan_triage(incremental=False):
+    """Rank open solicitations and pick the ones to re-match.
+
+    Returns ``(ranked, stale)``: ``(solicitation, need)`` pairs most urgent
+    first, and the set of indexes into ``ranked`` whose matches must be
+    regenerated (all of them unless ``incremental``).
+    """
+    ranked = rank_open_solicitations()
+    stale = {
+        i for i, (sol, need) in enumerate(ranked)
+        if not (incremental and match_inputs_unchanged(sol, need))
+    }
+    return ranked, stale
+
+
+def iter_action_plan(ranked, stale, workers=None, chunk_size=None, progress=None):
+    """Yield action-plan entries in priority order as soon as each is ready.
+
+    ``progress(done, total)`` is called as solicitations complete.
+    """
+    config = current_app.config
+    workers = workers or config["TRIAGE_WORKERS"]
+    chunk_size = chunk_size or config["TRIAGE_CHUNK_SIZE"]
+
+    matched = _match_all([pair for i, pair in enumerate(ranked) if i in stale], workers, chunk_size)
+    done = len(ranked) - len(stale)
+    if progress:
+        progress(done, len(ranked))
+    priority = 0
+    try:
+        for i, (sol, need) in enumerate(ranked):
+            if i in stale:
+                entry = next(matched)
+                done += 1
+                if progress:
+                    progress(done, len(ranked))
+            else:
+                entry = build_action_entry(sol, need, stored_matches(sol.id))
+            if entry:
+                priority += 1
+                yield {"priority": priority, **entry}
+    finally:
+        matched.close()  # shuts the process pool down, even if the consumer stopped early
+
+
+def run_triage(workers=None, chunk_size=None, incremental=False, progress=None):
+    """Batch-run matching across all open solicitations, prioritized by need score."""
+    ranked, stale = plan_triage(incremental)
+    action_plan = list(iter_action_plan(ranked, stale, workers, chunk_size, progress))
+    return {
+        "total_solicitations": len(action_plan),
+        "rematched": len(stale),
+        "action_plan": action_plan,
+    }
+
+
+def _match_all(ranked, workers, chunk_size):
+    """Yield action entries for ``ranked`` in order; None for solicitations that vanished."""
+    config = current_app.config
+    if workers > 1 and len(ranked) > chunk_size:
+        chunks = _chunks([(sol.id, need) for sol, need in ranked], chunk_size)
+        worker_config = {k: config[k] for k in WORKER_CONFIG_KEYS}
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(config["SQLALCHEMY_DATABASE_URI"], worker_config),
+        ) as pool:
+            # map() yields chunks in submission order, so priority order is kept
+            for chunk in pool.map(_triage_chunk, chunks):
+                # Worker commits are invisible to this session's identity map until expired
+                db.session.expire_all()
+                yield from chunk
+        return
+    for sol, need in ranked:
+        yield _triage_one(sol, need)
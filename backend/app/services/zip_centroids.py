@@ -0,0 +1,86 @@
+"""
+Offline ZIP centroid reference.
+
+``data/zip_centroids.npy`` holds one ``(zip, lat, lng)`` record per ZIP,
+sorted by ZIP as an unsigned integer, in a plain structured ``.npy`` file
+(12 bytes a row). It is memory-mapped once per process, so the OS pages in
+only what lookups touch and forked workers share it. A lookup is a binary
+search. A ZIP missing from the file falls back to the numerically nearest
+ZIP with the same 3-digit prefix (the USPS sectional center), which is
+geographically close. Regenerate the file with scripts/build_zip_centroids.py.
+"""
+import os
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+from flask import current_app
+
+CENTROID_DTYPE = np.dtype([("zip", "<u4"), ("lat", "<f4"), ("lng", "<f4")])
+
+ZipPoint = namedtuple("ZipPoint", ["zip_code", "lat", "lng", "exact"])
+
+
+def normalize_zip(zip_code):
+    """Five-digit string for ``"38614"``, ``"38614-1234"`` or ``"2101"``; None if not a ZIP."""
+    if zip_code is None:
+        return None
+    head = str(zip_code).strip().split("-", 1)[0]
+    if not head.isdigit() or len(head) > 5:
+        return None
+    return head.zfill(5)
+
+
+class ZipCentroids:
+    """Binary-searchable view over a centroid array sorted by ZIP."""
+
+    def __init__(self, records):
+        self.zips = records["zip"]
+        self.lat = records["lat"]
+        self.lng = records["lng"]
+
+    def __len__(self):
+        return len(self.zips)
+
+    def locate(self, zip_code):
+        """``ZipPoint`` for ``zip_code``, or a same-prefix neighbour's, or None."""
+        zip_code = normalize_zip(zip_code)
+        if zip_code is None or not len(self.zips):
+            return None
+        n = int(zip_code)
+        i = int(np.searchsorted(self.zips, n))
+        if i < len(self.zips) and self.zips[i] == n:
+            return ZipPoint(zip_code, float(self.lat[i]), float(self.lng[i]), True)
+        prefix = n // 100 * 100
+        lo = int(np.searchsorted(self.zips, prefix))
+        hi = int(np.searchsorted(self.zips, prefix + 100))
+        if lo == hi:
+            return None
+        # Numerically adjacent ZIPs in the prefix; the lower one wins a tie
+        below, above = max(lo, i - 1), min(hi - 1, i)
+        j = below if n - int(self.zips[below]) <= int(self.zips[above]) - n else above
+        return ZipPoint(zip_code, float(self.lat[j]), float(self.lng[j]), False)
+
+
+def build_centroids(rows):
+    """Sorted, de-duplicated centroid array from ``(zip, lat, lng)`` rows; later rows win."""
+    latest = {}
+    for zip_code, lat, lng in rows:
+        zip_code = normalize_zip(zip_code)
+        if zip_code is not None:
+            latest[int(zip_code)] = (float(lat), float(lng))
+    records = np.zeros(len(latest), dtype=CENTROID_DTYPE)
+    for i, n in enumerate(sorted(latest)):
+        records[i] = (n, *latest[n])
+    return records
+
+
+@lru_cache(maxsize=4)
+def load_centroids(path):
+    """Memory-map the centroid file at ``path`` (empty if it is missing)."""
+    if not os.path.exists(path):
+        return ZipCentroids(np.zeros(0, dtype=CENTROID_DTYPE))
+    return ZipCentroids(np.load(path, mmap_mode="r"))
+
+
+def zip_centroids():
+    return load_centroids(current_app.config["ZIP_CENTROIDS_PATH"])
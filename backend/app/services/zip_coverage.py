@@ -0,0 +1,201 @@
+"""
+Per-ZIP counts of nearby organizations, maintained on write.
+
+The food-desert score counts organizations within 100 miles of every
+monitored ZIP, and surplus matching counts them within 150 miles. Both read
+``zip_coverage`` (one row per ZIP and radius) instead of measuring every
+ZIP against every organization on each request.
+
+Flushes keep the counts current. An organization that is inserted, moved or
+deleted adjusts only the ZIPs within each radius of its old and new
+positions, found with a latitude-band query. A ZIP that is inserted or moved
+is recounted from the organizations near it. Existing databases are filled
+by ``_run_migrations``.
+
+Only ORM unit-of-work writes are seen. Bulk SQL on organizations or ZIPs
+(``query.update()``, ``query.delete()``, ``insert()`` executemany, imports)
+bypasses the listener and must be followed by ``rebuild_zip_coverage``:
+run scripts/rebuild_zip_coverage.py or enqueue a "zip_coverage" job.
+"""
+import math
+import numpy as np
+from sqlalchemy import and_, bindparam, event, inspect, select
+from sqlalchemy.orm import Session
+from app import db
+from app.models.organization import Organization
+from app.models.zip_coverage import ZipCoverage
+from app.models.zip_need_score import ZipNeedScore
+from app.services.geo import EARTH_RADIUS_MILES, count_within, to_radians
+
+COVERAGE_RADII = (100, 150)
+
+_POSITION = ("lat", "lng")
+_CHUNK = 500  # bound parameters per IN list
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+# Load an organization's previous coordinates on assignment, so a move can be undone
+for _attr in (Organization.lat, Organization.lng):
+    event.listen(_attr, "set", _keep_old_value, active_history=True)
+
+
+def _near(connection, table, key, lats, radius):
+    """``(key, lat, lng)`` rows of ``table`` in the latitude band ``radius`` around ``lats``."""
+    reach = math.degrees(radius / EARTH_RADIUS_MILES) + 1e-6
+    lo, hi = min(lats) - reach, max(lats) + reach
+    return connection.execute(
+        select(key, table.c.lat, table.c.lng).where(table.c.lat.between(lo, hi))
+    ).all()
+
+
+def _radians(points):
+    return to_radians([p[0] for p in points], [p[1] for p in points])
+
+
+def _counts(targets, sources, radius):
+    """For each ``(lat, lng)`` target, how many source points are within ``radius``."""
+    if not sources:
+        return np.zeros(len(targets), dtype=np.int64)
+    return count_within(*_radians(targets), *_radians(sources), radius)
+
+
+def _shift(connection, removed, added):
+    """Move counts for organizations that left ``removed`` and arrived at ``added`` positions."""
+    points = removed + added
+    if not points:
+        return
+    zips = _near(connection, ZipNeedScore.__table__, ZipNeedScore.__table__.c.zip_code,
+                 [lat for lat, _ in points], max(COVERAGE_RADII))
+    if not zips:
+        return
+    targets = [(lat, lng) for _, lat, lng in zips]
+    deltas = []
+    for radius in COVERAGE_RADII:
+        change = _counts(targets, added, radius) - _counts(targets, removed, radius)
+        deltas.extend({"z": zips[i][0], "r": radius, "delta": int(change[i])} for i in np.flatnonzero(change))
+    if deltas:
+        table = ZipCoverage.__table__
+        connection.execute(
+            table.update()
+            .where(and_(table.c.zip_code == bindparam("z"), table.c.radius_miles == bindparam("r")))
+            .values(organizations=table.c.organizations + bindparam("delta")),
+            deltas,
+        )
+
+
+def _drop(connection, zip_codes):
+    table = ZipCoverage.__table__
+    zip_codes = list(zip_codes)
+    for start in range(0, len(zip_codes), _CHUNK):
+        connection.execute(table.delete().where(table.c.zip_code.in_(zip_codes[start:start + _CHUNK])))
+
+
+def _recount(connection, zips):
+    """Rewrite the rows of ``{zip_code: (lat, lng)}`` from the organizations near them."""
+    if not zips:
+        return
+    _drop(connection, zips)
+    codes, targets = list(zips), list(zips.values())
+    orgs = _near(connection, Organization.__table__, Organization.__table__.c.id,
+                 [lat for lat, _ in targets], max(COVERAGE_RADII))
+    sources = [(lat, lng) for _, lat, lng in orgs]
+    rows = []
+    for radius in COVERAGE_RADII:
+        counts = _counts(targets, sources, radius).tolist()
+        rows.extend({"zip_code": z, "radius_miles": radius, "organizations": n} for z, n in zip(codes, counts))
+    connection.execute(ZipCoverage.__table__.insert(), rows)
+
+
+def _old(obj, attr):
+    history = inspect(obj).attrs[attr].history
+    return (history.deleted or history.unchanged or [getattr(obj, attr)])[0]
+
+
+def _moved(obj, attrs=_POSITION):
+    return any(inspect(obj).attrs[attr].history.has_changes() for attr in attrs)
+
+
+@event.listens_for(Session, "before_flush")
+def _remember_deleted_positions(session, flush_context, instances):
+    # Read before the DELETE, while an expired organization can still be loaded
+    removed = session.info.setdefault("_coverage_removed", [])
+    for obj in session.deleted:
+        if isinstance(obj, Organization) and inspect(obj).persistent:
+            removed.append((obj.lat, obj.lng))
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_zip_coverage(session, flush_context):
+    removed = session.info.pop("_coverage_removed", [])
+    added, recount, dropped = [], {}, set()
+    for obj in session.new:
+        if isinstance(obj, Organization):
+            added.append((obj.lat, obj.lng))
+        elif isinstance(obj, ZipNeedScore):
+            recount[obj.zip_code] = (obj.lat, obj.lng)
+    for obj in session.dirty:
+        if isinstance(obj, Organization) and _moved(obj):
+            removed.append((_old(obj, "lat"), _old(obj, "lng")))
+            added.append((obj.lat, obj.lng))
+        elif isinstance(obj, ZipNeedScore) and _moved(obj, ("zip_code", *_POSITION)):
+            dropped.add(_old(obj, "zip_code"))
+            recount[obj.zip_code] = (obj.lat, obj.lng)
+    for obj in session.deleted:
+        if isinstance(obj, ZipNeedScore):
+            dropped.add(_old(obj, "zip_code"))
+    if not (removed or added or recount or dropped):
+        return
+    connection = session.connection()
+    _shift(connection, removed, added)
+    _drop(connection, dropped - set(recount))
+    # New and moved ZIPs last: their recount already includes this flush's organizations
+    _recount(connection, recount)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_deleted_positions(session):
+    session.info.pop("_coverage_removed", None)
+
+
+def rebuild_zip_coverage(connection):
+    """Recount every ZIP from scratch; returns rows written."""
+    zips = {z: (lat, lng) for z, lat, lng in connection.execute(
+        select(ZipNeedScore.zip_code, ZipNeedScore.lat, ZipNeedScore.lng))}
+    connection.execute(ZipCoverage.__table__.delete())
+    if not zips:
+        return 0
+    orgs = [(lat, lng) for lat, lng in connection.execute(select(Organization.lat, Organization.lng))]
+    targets = list(zips.values())
+    rows = []
+    for radius in COVERAGE_RADII:
+        counts = _counts(targets, orgs, radius).tolist()
+        rows.extend({"zip_code": z, "radius_miles": radius, "organizations": n} for z, n in zip(zips, counts))
+    connection.execute(ZipCoverage.__table__.insert(), rows)
+    return len(rows)
+
+
+def backfill_zip_coverage(connection):
+    """Fill an empty ``zip_coverage`` table; returns rows written."""
+    if connection.execute(select(ZipCoverage.__table__).limit(1)).first() is not None:
+        return 0
+    return rebuild_zip_coverage(connection)
+
+
+def nearby_organizations(zips, radius):
+    """Organizations within ``radius`` of each record (``zip_code``, ``lat``, ``lng``), as an array.
+
+    ``radius`` must be one of ``COVERAGE_RADII``. ZIPs without a coverage row
+    (e.g. written with bulk SQL) are counted directly.
+    """
+    stored = dict(db.session.execute(
+        select(ZipCoverage.zip_code, ZipCoverage.organizations).where(ZipCoverage.radius_miles == radius)
+    ).all())
+    counts = np.array([stored.get(z.zip_code, -1) for z in zips], dtype=np.int64)
+    missing = np.flatnonzero(counts < 0)
+    if len(missing):
+        orgs = db.session.query(Organization.lat, Organization.lng).all()
+        counts[missing] = _counts([(zips[i].lat, zips[i].lng) for i in missing], orgs, radius)
+    return counts
@@ -0,0 +1,125 @@
+"""
+Process-wide ZIP reference table.
+
+The ``zip_need_scores`` rows are loaded once per worker into column arrays
+plus a ``zip_code -> row`` dict, so point lookups on hot paths (matching,
+portals, RFQ, registration) never touch the database. Writes to
+``ZipNeedScore`` bump the "zip_need_scores" cache version and every worker
+reloads on its next request.
+
+ZIPs that are not tracked resolve through the bundled centroid file (see
+zip_centroids.py) to coordinates and to the nearest tracked ZIP.
+"""
+from collections import namedtuple
+import numpy as np
+from app import db
+from app.models.zip_need_score import ZipNeedScore
+from app.services.cache_versions import VersionedCache, watch
+from app.services.geo import distances_from, to_radians
+from app.services.zip_centroids import normalize_zip, zip_centroids
+
+DEFAULT_NEED_SCORE = 50.0
+
+ZipEntry = namedtuple("ZipEntry", [
+    "zip_code", "lat", "lng", "state", "city", "food_insecurity_rate",
+    "population", "snap_participation_rate", "need_score",
+])
+
+# source: "monitored" (a tracked ZIP), "centroid" (exact bundled centroid) or
+# "prefix" (nearest centroid in the same 3-digit prefix); nearest: ZipEntry
+ZipResolution = namedtuple("ZipResolution", ["zip_code", "lat", "lng", "source", "nearest"])
+
+
+class ZipTable:
+    """Immutable column-oriented snapshot of ``zip_need_scores``."""
+
+    def __init__(self, rows):
+        self.zip_codes = [r.zip_code for r in rows]
+        self.index = {z: i for i, z in enumerate(self.zip_codes)}
+        self.lat = np.array([r.lat for r in rows], dtype=np.float64)
+        self.lng = np.array([r.lng for r in rows], dtype=np.float64)
+        self.need_score = np.array([r.need_score or 0.0 for r in rows], dtype=np.float64)
+        self.population = np.array([r.population or 0 for r in rows], dtype=np.int64)
+        self.food_insecurity_rate = np.array([r.food_insecurity_rate or 0.0 for r in rows], dtype=np.float64)
+        self.snap_participation_rate = np.array([r.snap_participation_rate or 0.0 for r in rows], dtype=np.float64)
+        self.state = [r.state for r in rows]
+        self.city = [r.city for r in rows]
+        self.lat_r, self.lng_r = to_radians(self.lat, self.lng)
+        self._nearest = {}
+
+    def __len__(self):
+        return len(self.zip_codes)
+
+    def __contains__(self, zip_code):
+        return zip_code in self.index
+
+    def entry(self, i):
+        return ZipEntry(
+            self.zip_codes[i], float(self.lat[i]), float(self.lng[i]), self.state[i],
+            self.city[i], float(self.food_insecurity_rate[i]), int(self.population[i]),
+            float(self.snap_participation_rate[i]), float(self.need_score[i]),
+        )
+
+    def get(self, zip_code):
+        """The ``ZipEntry`` for ``zip_code``, or None if it is not tracked."""
+        i = self.index.get(zip_code)
+        return None if i is None else self.entry(i)
+
+    def nearest(self, lat, lng):
+        """Row index of the tracked ZIP closest to a point (None if the table is empty)."""
+        if not len(self.zip_codes):
+            return None
+        key = (lat, lng)
+        if key not in self._nearest:
+            self._nearest[key] = int(np.argmin(distances_from(lat, lng, self.lat_r, self.lng_r)))
+        return self._nearest[key]
+
+    def need_score_for(self, zip_code, default=DEFAULT_NEED_SCORE):
+        i = self.index.get(zip_code)
+        return default if i is None else float(self.need_score[i])
+
+
+def _build_zip_table():
+    rows = db.session.query(
+        ZipNeedScore.zip_code, ZipNeedScore.lat, ZipNeedScore.lng, ZipNeedScore.state,
+        ZipNeedScore.city, ZipNeedScore.food_insecurity_rate, ZipNeedScore.population,
+        ZipNeedScore.snap_participation_rate, ZipNeedScore.need_score,
+    ).all()
+    return ZipTable(rows)
+
+
+# ZIP data changes in bulk (seed/refresh scripts), so a full reload is simpler
+# than patching the arrays in place.
+watch(ZipNeedScore, "zip_need_scores")
+zip_table = VersionedCache("zip_need_scores", _build_zip_table)
+
+
+def zip_lookup(zip_code):
+    """``ZipEntry`` for ``zip_code`` from the cached table, or None."""
+    return zip_table.get().get(zip_code)
+
+
+def zip_need_score(zip_code, default=DEFAULT_NEED_SCORE):
+    return zip_table.get().need_score_for(zip_code, default)
+
+
+def resolve_zip(zip_code):
+    """Coordinates and nearest tracked ZIP for any ZIP the reference data knows, else None."""
+    table = zip_table.get()
+    entry = table.get(zip_code) or table.get(normalize_zip(zip_code))
+    if entry:
+        return ZipResolution(entry.zip_code, entry.lat, entry.lng, "monitored", entry)
+    point = zip_centroids().locate(zip_code)
+    if point is None:
+        return None
+    i = table.nearest(point.lat, point.lng)
+    return ZipResolution(
+        point.zip_code, point.lat, point.lng, "centroid" if point.exact else "prefix",
+        None if i is None else table.entry(i),
+    )
+
+
+def zip_coordinates(zip_code):
+    """``(lat, lng)`` of ``zip_code`` from the tracked table or the centroid file, or None."""
+    resolved = resolve_zip(zip_code)
+    return None if resolved is None else (resolved.lat, resolved.lng)
@@ -0,0 +1,40 @@
+"""Build the day's food-insecurity prediction snapshot ahead of traffic.
+
+Run it from cron shortly after midnight:
+
+    python scripts/build_prediction_snapshot.py                  # today, if stale
+    python scripts/build_prediction_snapshot.py --force          # rebuild today
+    python scripts/build_prediction_snapshot.py --date 2024-06-01
+"""
+import argparse
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import create_app, db
+from app.models.prediction_snapshot_run import PredictionSnapshotRun
+from app.services.prediction_snapshots import build_snapshot, ensure_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the daily prediction snapshot.")
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="snapshot day (default today)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the snapshot is current")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            if args.force:
+                run = build_snapshot(args.date)
+            else:
+                run = db.session.get(PredictionSnapshotRun, ensure_snapshot(args.date))
+            print(f"Snapshot {run.snapshot_date.isoformat()}: {run.zones} zones, built {run.built_at.isoformat()}")
+        finally:
+            db.session.remove()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Build data/zip_centroids.npy, the offline ZIP centroid file.
+
+Sources are merged in order, later ones winning for a repeated ZIP:
+
+    python scripts/build_zip_centroids.py                         # seed ZIPs only
+    python scripts/build_zip_centroids.py --gazetteer 2020_Gaz_zcta_national.txt
+    python scripts/build_zip_centroids.py --csv zips.csv          # zip,lat,lng columns
+
+The gazetteer is the Census Bureau's national ZCTA file (tab-separated,
+GEOID / INTPTLAT / INTPTLONG columns). The seeded ZIPs are always included
+so every tracked ZIP resolves exactly.
+
+The bundled file covers ~41.9k US ZIPs (every 3-digit prefix in use) and was
+built with ``--csv`` from the dataset of the ``zipcodes`` PyPI package
+(3.0.0), whose coordinates come from GeoNames (CC BY 4.0,
+https://www.geonames.org/). ZIPs listed at 0,0 (APO/FPO) were dropped.
+"""
+import argparse
+import csv
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from app.config import Config
+from app.services.zip_centroids import build_centroids
+from seed import ZIP_SCORES
+
+
+def read_gazetteer(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter="\t")
+        header = [h.strip() for h in next(reader)]
+        zip_col, lat_col, lng_col = header.index("GEOID"), header.index("INTPTLAT"), header.index("INTPTLONG")
+        for row in reader:
+            yield row[zip_col].strip(), row[lat_col].strip(), row[lng_col].strip()
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield row["zip"], row["lat"], row["lng"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the ZIP centroid array file.")
+    parser.add_argument("--gazetteer", action="append", default=[], help="Census ZCTA gazetteer file")
+    parser.add_argument("--csv", action="append", default=[], help="CSV with zip,lat,lng columns")
+    parser.add_argument("--out", default=Config.ZIP_CENTROIDS_PATH)
+    args = parser.parse_args()
+
+    rows = []
+    for path in args.gazetteer:
+        rows.extend(read_gazetteer(path))
+    for path in args.csv:
+        rows.extend(read_csv(path))
+    rows.extend((z[0], z[1], z[2]) for z in ZIP_SCORES)
+
+    records = build_centroids(rows)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    np.save(args.out, records)
+    print(f"Wrote {len(records)} ZIP centroids to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
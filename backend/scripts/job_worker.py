@@ -0,0 +1,42 @@
+"""Background worker for queued matching/triage jobs.
+
+Run one or more of these next to the web app:
+
+    python scripts/job_worker.py            # poll forever
+    python scripts/job_worker.py --drain    # run what is queued, then exit
+"""
+import argparse
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import create_app, db
+from app.services.jobs import default_worker_id, work
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued FoodMatch jobs.")
+    parser.add_argument("--drain", action="store_true", help="exit once the queue is empty")
+    parser.add_argument("--worker-id", default=default_worker_id())
+    args = parser.parse_args()
+
+    app = create_app()
+    poll_seconds = app.config["JOB_POLL_SECONDS"]
+    print(f"Job worker {args.worker_id} started")
+    while True:
+        with app.app_context():
+            try:
+                ran = work(args.worker_id)
+            finally:
+                db.session.remove()
+        if ran:
+            print(f"Ran {ran} job(s)")
+        if args.drain:
+            break
+        time.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Recount zip_coverage from scratch.
+
+Run it after writing organizations or ZIP scores with bulk SQL (imports,
+query.update() / query.delete()), which the per-flush maintenance never sees:
+
+    python scripts/rebuild_zip_coverage.py
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import create_app, db
+from app.services.zip_coverage import rebuild_zip_coverage
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        try:
+            written = rebuild_zip_coverage(db.session.connection())
+            db.session.commit()
+            print(f"Wrote {written} ZIP coverage row(s)")
+        finally:
+            db.session.remove()
+
+
+if __name__ == "__main__":
+    main()
@@ -46,60 +46,63 @@ def seed():
         print("Done! Seeded successfully.")
 
 
+# (zip, lat, lng, state, city, food_insecurity_rate, population, snap_participation_rate, need_score)
+ZIP_SCORES = [
+    ("38601", 34.3668, -89.5195, "MS", "Abbeville", 0.28, 12000, 0.22, 82),
+    ("38614", 33.7490, -90.7351, "MS", "Clarksdale", 0.31, 15000, 0.28, 89),
+    ("38701", 33.4015, -91.0618, "MS", "Greenville", 0.29, 32000, 0.25, 85),
+    ("72301", 35.2145, -90.1848, "AR", "West Memphis", 0.25, 25000, 0.21, 78),
+    ("72401", 35.8423, -90.7043, "AR", "Jonesboro", 0.18, 75000, 0.14, 62),
+    ("36601", 30.6944, -88.0431, "AL", "Mobile", 0.22, 190000, 0.19, 74),
+    ("36104", 32.3668, -86.2999, "AL", "Montgomery", 0.21, 200000, 0.18, 72),
+    ("30303", 33.7490, -84.3880, "GA", "Atlanta", 0.17, 500000, 0.13, 58),
+    ("30901", 33.4735, -81.9748, "GA", "Augusta", 0.23, 200000, 0.20, 75),
+    ("29401", 32.7765, -79.9311, "SC", "Charleston", 0.14, 140000, 0.10, 48),
+    ("29201", 34.0007, -81.0348, "SC", "Columbia", 0.19, 135000, 0.15, 64),
+    ("37203", 36.1627, -86.7816, "TN", "Nashville", 0.15, 690000, 0.11, 52),
+    ("38103", 35.1495, -90.0490, "TN", "Memphis", 0.26, 650000, 0.23, 80),
+    ("70112", 29.9511, -90.0715, "LA", "New Orleans", 0.24, 390000, 0.21, 77),
+    ("70801", 30.4515, -91.1871, "LA", "Baton Rouge", 0.20, 225000, 0.17, 68),
+    ("39201", 32.2988, -90.1848, "MS", "Jackson", 0.27, 170000, 0.24, 83),
+    ("75201", 32.7872, -96.7985, "TX", "Dallas", 0.16, 1300000, 0.12, 55),
+    ("77001", 29.7604, -95.3698, "TX", "Houston", 0.18, 2300000, 0.14, 60),
+    ("85001", 33.4484, -112.0740, "AZ", "Phoenix", 0.17, 1700000, 0.13, 58),
+    ("90011", 33.9425, -118.2551, "CA", "Los Angeles", 0.20, 55000, 0.17, 69),
+    ("10451", 40.8207, -73.9234, "NY", "Bronx", 0.23, 45000, 0.20, 76),
+    ("60621", 41.7795, -87.6424, "IL", "Chicago", 0.25, 35000, 0.22, 79),
+    ("48201", 42.3486, -83.0567, "MI", "Detroit", 0.27, 40000, 0.24, 83),
+    ("44101", 41.4993, -81.6944, "OH", "Cleveland", 0.24, 38000, 0.21, 77),
+    ("21201", 39.2904, -76.6122, "MD", "Baltimore", 0.22, 42000, 0.19, 73),
+    ("19101", 39.9526, -75.1652, "PA", "Philadelphia", 0.21, 55000, 0.18, 71),
+    ("02101", 42.3601, -71.0589, "MA", "Boston", 0.13, 65000, 0.09, 45),
+    ("33101", 25.7617, -80.1918, "FL", "Miami", 0.19, 470000, 0.15, 65),
+    ("32099", 30.3322, -81.6557, "FL", "Jacksonville", 0.18, 950000, 0.14, 62),
+    ("28201", 35.2271, -80.8431, "NC", "Charlotte", 0.16, 880000, 0.12, 55),
+    ("27601", 35.7796, -78.6382, "NC", "Raleigh", 0.13, 475000, 0.09, 46),
+    ("23219", 37.5407, -77.4360, "VA", "Richmond", 0.18, 230000, 0.14, 61),
+    ("20001", 38.9072, -77.0369, "DC", "Washington", 0.15, 700000, 0.11, 52),
+    ("63101", 38.6270, -90.1994, "MO", "St. Louis", 0.25, 300000, 0.22, 79),
+    ("64101", 39.0997, -94.5786, "MO", "Kansas City", 0.19, 500000, 0.15, 64),
+    ("55401", 44.9778, -93.2650, "MN", "Minneapolis", 0.14, 430000, 0.10, 48),
+    ("53201", 43.0389, -87.9065, "WI", "Milwaukee", 0.22, 590000, 0.19, 73),
+    ("46201", 39.7684, -86.1581, "IN", "Indianapolis", 0.19, 880000, 0.15, 64),
+    ("40201", 38.2527, -85.7585, "KY", "Louisville", 0.20, 630000, 0.16, 67),
+    ("73101", 35.4676, -97.5164, "OK", "Oklahoma City", 0.19, 680000, 0.15, 64),
+    ("71101", 32.5252, -93.7502, "LA", "Shreveport", 0.24, 190000, 0.21, 77),
+    ("79901", 31.7619, -106.4850, "TX", "El Paso", 0.22, 680000, 0.19, 73),
+    ("87101", 35.0844, -106.6504, "NM", "Albuquerque", 0.20, 560000, 0.16, 67),
+    ("29301", 34.9496, -81.9321, "SC", "Spartanburg", 0.21, 38000, 0.18, 70),
+    ("31201", 32.8407, -83.6324, "GA", "Macon", 0.24, 153000, 0.21, 77),
+    ("35801", 34.7304, -86.5861, "AL", "Huntsville", 0.15, 215000, 0.11, 51),
+    ("37601", 36.3134, -82.3535, "TN", "Johnson City", 0.17, 67000, 0.13, 57),
+    ("42101", 36.9903, -86.4436, "KY", "Bowling Green", 0.18, 75000, 0.14, 61),
+    ("50301", 41.5868, -93.6250, "IA", "Des Moines", 0.15, 215000, 0.11, 52),
+    ("68101", 41.2565, -95.9345, "NE", "Omaha", 0.16, 490000, 0.12, 55),
+]
+
+
 def seed_zip_scores():
-    zips = [
-        ("38601", 34.3668, -89.5195, "MS", "Abbeville", 0.28, 12000, 0.22, 82),
-        ("38614", 33.7490, -90.7351, "MS", "Clarksdale", 0.31, 15000, 0.28, 89),
-        ("38701", 33.4015, -91.0618, "MS", "Greenville", 0.29, 32000, 0.25, 85),
-        ("72301", 35.2145, -90.1848, "AR", "West Memphis", 0.25, 25000, 0.21, 78),
-        ("72401", 35.8423, -90.7043, "AR", "Jonesboro", 0.18, 75000, 0.14, 62),
-        ("36601", 30.6944, -88.0431, "AL", "Mobile", 0.22, 190000, 0.19, 74),
-        ("36104", 32.3668, -86.2999, "AL", "Montgomery", 0.21, 200000, 0.18, 72),
-        ("30303", 33.7490, -84.3880, "GA", "Atlanta", 0.17, 500000, 0.13, 58),
-        ("30901", 33.4735, -81.9748, "GA", "Augusta", 0.23, 200000, 0.20, 75),
-        ("29401", 32.7765, -79.9311, "SC", "Charleston", 0.14, 140000, 0.10, 48),
-        ("29201", 34.0007, -81.0348, "SC", "Columbia", 0.19, 135000, 0.15, 64),
-        ("37203", 36.1627, -86.7816, "TN", "Nashville", 0.15, 690000, 0.11, 52),
-        ("38103", 35.1495, -90.0490, "TN", "Memphis", 0.26, 650000, 0.23, 80),
-        ("70112", 29.9511, -90.0715, "LA", "New Orleans", 0.24, 390000, 0.21, 77),
-        ("70801", 30.4515, -91.1871, "LA", "Baton Rouge", 0.20, 225000, 0.17, 68),
-        ("39201", 32.2988, -90.1848, "MS", "Jackson", 0.27, 170000, 0.24, 83),
-        ("75201", 32.7872, -96.7985, "TX", "Dallas", 0.16, 1300000, 0.12, 55),
-        ("77001", 29.7604, -95.3698, "TX", "Houston", 0.18, 2300000, 0.14, 60),
-        ("85001", 33.4484, -112.0740, "AZ", "Phoenix", 0.17, 1700000, 0.13, 58),
-        ("90011", 33.9425, -118.2551, "CA", "Los Angeles", 0.20, 55000, 0.17, 69),
-        ("10451", 40.8207, -73.9234, "NY", "Bronx", 0.23, 45000, 0.20, 76),
-        ("60621", 41.7795, -87.6424, "IL", "Chicago", 0.25, 35000, 0.22, 79),
-        ("48201", 42.3486, -83.0567, "MI", "Detroit", 0.27, 40000, 0.24, 83),
-        ("44101", 41.4993, -81.6944, "OH", "Cleveland", 0.24, 38000, 0.21, 77),
-        ("21201", 39.2904, -76.6122, "MD", "Baltimore", 0.22, 42000, 0.19, 73),
-        ("19101", 39.9526, -75.1652, "PA", "Philadelphia", 0.21, 55000, 0.18, 71),
-        ("02101", 42.3601, -71.0589, "MA", "Boston", 0.13, 65000, 0.09, 45),
-        ("33101", 25.7617, -80.1918, "FL", "Miami", 0.19, 470000, 0.15, 65),
-        ("32099", 30.3322, -81.6557, "FL", "Jacksonville", 0.18, 950000, 0.14, 62),
-        ("28201", 35.2271, -80.8431, "NC", "Charlotte", 0.16, 880000, 0.12, 55),
-        ("27601", 35.7796, -78.6382, "NC", "Raleigh", 0.13, 475000, 0.09, 46),
-        ("23219", 37.5407, -77.4360, "VA", "Richmond", 0.18, 230000, 0.14, 61),
-        ("20001", 38.9072, -77.0369, "DC", "Washington", 0.15, 700000, 0.11, 52),
-        ("63101", 38.6270, -90.1994, "MO", "St. Louis", 0.25, 300000, 0.22, 79),
-        ("64101", 39.0997, -94.5786, "MO", "Kansas City", 0.19, 500000, 0.15, 64),
-        ("55401", 44.9778, -93.2650, "MN", "Minneapolis", 0.14, 430000, 0.10, 48),
-        ("53201", 43.0389, -87.9065, "WI", "Milwaukee", 0.22, 590000, 0.19, 73),
-        ("46201", 39.7684, -86.1581, "IN", "Indianapolis", 0.19, 880000, 0.15, 64),
-        ("40201", 38.2527, -85.7585, "KY", "Louisville", 0.20, 630000, 0.16, 67),
-        ("73101", 35.4676, -97.5164, "OK", "Oklahoma City", 0.19, 680000, 0.15, 64),
-        ("71101", 32.5252, -93.7502, "LA", "Shreveport", 0.24, 190000, 0.21, 77),
-        ("79901", 31.7619, -106.4850, "TX", "El Paso", 0.22, 680000, 0.19, 73),
-        ("87101", 35.0844, -106.6504, "NM", "Albuquerque", 0.20, 560000, 0.16, 67),
-        ("29301", 34.9496, -81.9321, "SC", "Spartanburg", 0.21, 38000, 0.18, 70),
-        ("31201", 32.8407, -83.6324, "GA", "Macon", 0.24, 153000, 0.21, 77),
-        ("35801", 34.7304, -86.5861, "AL", "Huntsville", 0.15, 215000, 0.11, 51),
-        ("37601", 36.3134, -82.3535, "TN", "Johnson City", 0.17, 67000, 0.13, 57),
-        ("42101", 36.9903, -86.4436, "KY", "Bowling Green", 0.18, 75000, 0.14, 61),
-        ("50301", 41.5868, -93.6250, "IA", "Des Moines", 0.15, 215000, 0.11, 52),
-        ("68101", 41.2565, -95.9345, "NE", "Omaha", 0.16, 490000, 0.12, 55),
-    ]
-    for z in zips:
+    for z in ZIP_SCORES:
         db.session.add(ZipNeedScore(
             zip_code=z[0], lat=z[1], lng=z[2], state=z[3], city=z[4],
             food_insecurity_rate=z[5], population=z[6],
@@ -0,0 +1,81 @@
+"""A local stand-in for the OpenAI chat completions API with injectable latency."""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAI:
+    """Scores every prompt by a per-organization table; records calls and peak concurrency."""
+
+    def __init__(self, latency=0.0, scores=None, reply=None):
+        self.latency = latency
+        self.scores = scores or {}
+        self.reply = reply  # optional callable(prompt) -> content string
+        self.calls = 0
+        self.prompts = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def content_for(self, prompt):
+        if self.reply:
+            return self.reply(prompt)
+        name = re.search(r"- Name: (.+)", prompt).group(1).strip()
+        return json.dumps({"score": self.scores.get(name, 50), "explanation": f"LLM says {name}"})
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body["messages"][-1]["content"]
+                with fake._lock:
+                    fake.calls += 1
+                    fake.prompts.append(prompt)
+                    fake.in_flight += 1
+                    fake.peak_in_flight = max(fake.peak_in_flight, fake.in_flight)
+                try:
+                    time.sleep(fake.latency)
+                    payload = json.dumps({
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": fake.content_for(prompt)},
+                            "finish_reason": "stop",
+                        }],
+                    }).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+        return Handler
@@ -0,0 +1,50 @@
+"""Interned capability vocabulary and bitmask overlap."""
+import random
+from app.services.capabilities import (
+    Vocabulary, overlap_percent, overlap_percents, overlap_terms, term_mask,
+)
+from app.services.matching import capability_overlap_score
+
+
+def _reference(sol_categories, org_capabilities):
+    sol_set = set(c.lower().strip() for c in sol_categories)
+    org_set = set(c.lower().strip() for c in org_capabilities)
+    return (len(sol_set & org_set) / len(sol_set)) * 100 if sol_set and org_capabilities else 0.0
+
+
+class TestVocabulary:
+    def test_terms_are_normalized_and_shared(self):
+        vocab = Vocabulary()
+        assert vocab.mask(["Cold Storage ", "water"]) == vocab.mask(["water", "cold storage"])
+        assert vocab.decode(vocab.mask(["Water", "Dairy"])) == ["dairy", "water"]
+        assert vocab.mask([]) == 0 and vocab.mask(None) == 0
+
+    def test_mask_cache_is_bounded(self):
+        vocab = Vocabulary(cache_size=3)
+        masks = [vocab.mask([f"term {i}", "water"]) for i in range(10)]
+        assert len(vocab._masks) == 3
+        # Evicted lists are recomputed to the same mask; recently used ones stay
+        assert [vocab.mask([f"term {i}", "water"]) for i in range(10)] == masks
+        vocab.mask(["term 7", "water"])
+        vocab.mask(["dairy"])
+        assert ("term 7", "water") in vocab._masks and ("term 8", "water") not in vocab._masks
+
+    def test_bitset_overlap_matches_set_reference(self):
+        rng = random.Random(7)
+        terms = [f"Term {i}" for i in range(150)]  # spans several 64-bit words
+        for _ in range(200):
+            sol = rng.sample(terms, rng.randint(1, 12))
+            org = rng.sample(terms, rng.randint(0, 40))
+            assert capability_overlap_score(sol, org) == _reference(sol, org)
+            common = term_mask(sol) & term_mask(org)
+            expected = sorted(set(c.lower() for c in sol) & set(c.lower() for c in org))
+            assert overlap_terms(common) == expected
+
+    def test_batch_overlap_matches_scalar(self):
+        rng = random.Random(11)
+        terms = [f"cap_{i}" for i in range(90)]
+        sol_mask = term_mask(rng.sample(terms, 6))
+        masks = [term_mask(rng.sample(terms, rng.randint(0, 30))) for _ in range(50)]
+        batch = overlap_percents(sol_mask, masks).tolist()
+        assert batch == [overlap_percent(sol_mask, m) for m in masks]
+        assert overlap_percents(0, masks).tolist() == [0.0] * 50
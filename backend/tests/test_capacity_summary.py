@@ -0,0 +1,68 @@
+"""Grouped capacity summary shared by portals, tri-match, RFQ and surplus matching."""
+from sqlalchemy import event
+from app import db
+from app.models.emergency_capacity import EmergencyCapacity
+from app.models.organization import Organization
+from app.services.capacity_summary import capacity_summary
+
+
+def _supplier():
+    return Organization.query.filter_by(org_type="supplier").first()
+
+
+def _add_capacity(org, supply_type, quantity, status="available"):
+    cap = EmergencyCapacity(organization_id=org.id, supply_type=supply_type, item_name=supply_type,
+                            quantity=quantity, zip_code="72301", lat=35.1, lng=-90.2, status=status)
+    db.session.add(cap)
+    db.session.commit()
+    return cap
+
+
+class TestCapacitySummary:
+    def test_counts_and_quantities_by_type(self, app):
+        sup = _supplier()
+        _add_capacity(sup, "water", 100)
+        _add_capacity(sup, "dairy", 7)
+        _add_capacity(sup, "dairy", 3, status="reserved")
+        summary = capacity_summary.get()
+        assert summary.count(sup.id) == 3
+        assert summary.count(sup.id, ["water"]) == 2
+        assert summary.quantity(sup.id, ["water"]) == 5100
+        assert summary.quantity(sup.id, ["dairy", "protein"]) == 7
+        assert sorted(summary.supply_types(sup.id)) == ["dairy", "water"]
+        assert summary.count(999) == 0
+
+    def test_capacity_writes_refresh_the_summary(self, app):
+        sup = _supplier()
+        assert capacity_summary.get().count(sup.id) == 1
+        cap = _add_capacity(sup, "water", 10)
+        assert capacity_summary.get().count(sup.id) == 2
+        cap.status = "deployed"
+        db.session.commit()
+        assert capacity_summary.get().count(sup.id) == 1
+
+    def test_distributor_portal_makes_no_per_supplier_capacity_queries(self, app, client):
+        dist = Organization.query.filter_by(org_type="distributor").first()
+        client.get(f"/api/portal/distributor/{dist.id}/matches")
+        statements = []
+
+        def before(conn, cursor, statement, params, context, executemany):
+            if "FROM emergency_capacities" in statement:
+                statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before)
+        try:
+            data = client.get(f"/api/portal/distributor/{dist.id}/matches").get_json()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before)
+        assert statements == []
+        assert data["matched_solicitations"][0]["supplier_partners"][0]["pre_registered_capacity"] == 1
+
+    def test_rfq_reads_stock_from_summary(self, client):
+        data = client.post("/api/rfq/estimate", json={
+            "destination_zip": "38614",
+            "items": [{"supply_type": "water", "quantity": 10}],
+        }).get_json()
+        quote = data["supplier_quotes"][0]["item_quotes"][0]
+        assert quote["in_stock"] is True
+        assert quote["stock_available"] == 5000
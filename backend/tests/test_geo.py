@@ -0,0 +1,50 @@
+"""Vectorized geo-distance engine tests."""
+import numpy as np
+from app.services.geo import (
+    haversine, to_radians, distance_matrix, distances_from, count_within,
+)
+
+POINTS = [(34.2, -90.6), (35.1, -90.2), (33.75, -84.39), (40.82, -73.92), (25.76, -80.19)]
+
+
+class TestDistanceMatrix:
+    def test_matches_scalar_haversine(self):
+        lat, lng = to_radians([p[0] for p in POINTS], [p[1] for p in POINTS])
+        matrix = distance_matrix(lat, lng, lat, lng)
+        assert matrix.shape == (5, 5)
+        for i, a in enumerate(POINTS):
+            for j, b in enumerate(POINTS):
+                assert abs(matrix[i, j] - haversine(*a, *b)) < 1e-6
+
+    def test_diagonal_is_zero(self):
+        lat, lng = to_radians([p[0] for p in POINTS], [p[1] for p in POINTS])
+        assert np.allclose(np.diag(distance_matrix(lat, lng, lat, lng)), 0.0)
+
+    def test_distances_from_point(self):
+        lat, lng = to_radians([p[0] for p in POINTS], [p[1] for p in POINTS])
+        d = distances_from(34.2, -90.6, lat, lng)
+        assert d[0] == 0.0
+        assert 350 < d[2] < 500
+
+    def test_empty_inputs(self):
+        lat, lng = to_radians([], [])
+        assert distance_matrix(lat, lng, lat, lng).shape == (0, 0)
+        assert len(count_within(lat, lng, lat, lng, 100)) == 0
+
+
+class TestCountWithin:
+    def test_counts_match_brute_force_across_blocks(self):
+        lat, lng = to_radians([p[0] for p in POINTS], [p[1] for p in POINTS])
+        counts = count_within(lat, lng, lat, lng, 500, block_rows=2)
+        expected = [sum(1 for b in POINTS if haversine(*a, *b) <= 500) for a in POINTS]
+        assert counts.tolist() == expected
+
+    def test_pruned_blocks_match_dense_matrix(self):
+        rng = np.random.default_rng(7)
+        # Dense clusters, the antimeridian and both poles
+        lat = np.concatenate([rng.uniform(30, 35, 400), rng.uniform(-90, 90, 300), [89.9, -89.9, 0, 0]])
+        lng = np.concatenate([rng.uniform(-95, -90, 400), rng.uniform(-180, 180, 300), [10, -170, 179.99, -179.99]])
+        lat_r, lng_r = to_radians(lat, lng)
+        for radius in (0, 50, 150, 2000):
+            dense = np.count_nonzero(distance_matrix(lat_r, lng_r, lat_r[::3], lng_r[::3]) <= radius, axis=1)
+            assert count_within(lat_r, lng_r, lat_r[::3], lng_r[::3], radius).tolist() == dense.tolist()
@@ -0,0 +1,101 @@
+"""Background job API: enqueue from the web app, run in a worker, poll status."""
+import subprocess
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app import db
+from app.models.job import Job
+from app.models.solicitation import Solicitation
+from app.services.jobs import claim_next, enqueue, reclaim_expired, run_job, work
+from app.services.triage import run_triage
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestJobApi:
+    def test_generate_returns_job_immediately(self, client):
+        sol = Solicitation.query.first()
+        res = client.post("/api/matches/generate?async=true", json={"solicitation_id": sol.id})
+        assert res.status_code == 202
+        job_id = res.get_json()["job_id"]
+        status = client.get(f"/api/jobs/{job_id}").get_json()
+        assert status["status"] == "queued"
+        assert status["result"] is None
+
+        assert work("test-worker") == 1
+        status = client.get(f"/api/jobs/{job_id}").get_json()
+        assert status["status"] == "succeeded"
+        assert status["progress"] == {"done": 1, "total": 1}
+        assert [m["organization_id"] for m in status["result"]] == \
+            [m["organization_id"] for m in client.post("/api/matches/generate", json={"solicitation_id": sol.id}).get_json()]
+
+    def test_async_generate_unknown_solicitation_is_404(self, client):
+        res = client.post("/api/matches/generate?async=true", json={"solicitation_id": 999})
+        assert res.status_code == 404
+        assert Job.query.count() == 0
+
+    def test_triage_job_reports_progress_and_result(self, app, client):
+        app.config["ASYNC_JOBS"] = True
+        res = client.post("/api/matches/triage")
+        assert res.status_code == 202
+        work("test-worker")
+        status = client.get(res.get_json()["status_url"]).get_json()
+        assert status["status"] == "succeeded"
+        assert status["progress"] == {"done": 1, "total": 1}
+        assert status["result"] == run_triage()
+
+    def test_failed_job_records_error(self, app):
+        job = enqueue("generate_matches", {"solicitation_id": 999})
+        work("test-worker")
+        job = db.session.get(Job, job.id)
+        assert job.status == "failed"
+        assert "Solicitation not found" in job.error
+
+    def test_job_is_claimed_once(self, app):
+        enqueue("triage")
+        assert claim_next("a") is not None
+        assert claim_next("b") is None
+
+    def test_lost_worker_job_is_reclaimed(self, app, client):
+        job_id = enqueue("triage").id
+        assert claim_next("crashed-worker").attempts == 1
+        assert claim_next("b") is None  # lease still fresh
+        stale = datetime.utcnow() - timedelta(seconds=app.config["JOB_LEASE_SECONDS"] + 1)
+        db.session.execute(Job.__table__.update().where(Job.id == job_id).values(heartbeat_at=stale))
+        db.session.commit()
+
+        job = claim_next("b")
+        assert (job.id, job.worker_id, job.attempts) == (job_id, "b", 2)
+        run_job(job)
+        status = client.get(f"/api/jobs/{job_id}").get_json()
+        assert (status["status"], status["attempts"]) == ("succeeded", 2)
+
+        # The crashed worker waking up later cannot overwrite the result
+        run_job(SimpleNamespace(id=job_id, kind="generate_matches", params={"solicitation_id": 999},
+                                worker_id="crashed-worker", attempts=1))
+        db.session.expire_all()
+        job = db.session.get(Job, job_id)
+        assert (job.status, job.worker_id, job.error) == ("succeeded", "b", None)
+
+    def test_lease_expiry_fails_after_max_attempts(self, app):
+        job_id = enqueue("triage").id
+        stale = datetime.utcnow() - timedelta(seconds=app.config["JOB_LEASE_SECONDS"] + 1)
+        for attempt in range(app.config["JOB_MAX_ATTEMPTS"]):
+            assert claim_next(f"w{attempt}").id == job_id
+            db.session.execute(Job.__table__.update().where(Job.id == job_id).values(heartbeat_at=stale))
+            db.session.commit()
+        assert reclaim_expired() == (0, 1)
+        job = db.session.get(Job, job_id)
+        assert job.status == "failed"
+        assert "lease expired" in job.error
+        assert claim_next("late") is None
+
+    def test_worker_script_drains_queue(self, app):
+        job = enqueue("triage")
+        subprocess.run(
+            [sys.executable, "scripts/job_worker.py", "--drain"],
+            cwd=BACKEND_DIR, check=True, capture_output=True, timeout=60,
+        )
+        db.session.expire_all()
+        assert db.session.get(Job, job.id).status == "succeeded"
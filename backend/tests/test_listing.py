@@ -0,0 +1,130 @@
+"""Keyset pagination and ``fields=`` projection on list endpoints."""
+from datetime import datetime
+from sqlalchemy import event, text
+from app import db
+from app.models.emergency_capacity import EmergencyCapacity
+from app.models.match_result import MatchResult
+from app.models.organization import Organization
+from app.models.solicitation import Solicitation
+
+
+def _walk(client, url, key="items", limit=2):
+    """Follow next_cursor until exhausted; returns every item in page order."""
+    items, cursor = [], None
+    while True:
+        sep = "&" if "?" in url else "?"
+        page = client.get(f"{url}{sep}limit={limit}" + (f"&cursor={cursor}" if cursor else "")).get_json()
+        assert len(page[key]) <= limit
+        items.extend(page[key])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def _add_orgs(n):
+    for k in range(n):
+        # Repeated names exercise the id tie-break
+        db.session.add(Organization(name=f"Vendor {k % 3}", org_type="supplier", zip_code="38614",
+                                    lat=34.2, lng=-90.6, capabilities=["water"], naics_codes=["311991"]))
+    db.session.commit()
+
+
+class TestKeysetPagination:
+    def test_pages_cover_the_full_listing(self, client, app):
+        _add_orgs(7)
+        full = client.get("/api/organizations").get_json()
+        assert _walk(client, "/api/organizations") == full
+        assert _walk(client, "/api/organizations?capability=water", limit=3) == \
+            client.get("/api/organizations?capability=water").get_json()
+
+    def test_existing_databases_get_keyset_indexes(self, client, app):
+        from app import create_app
+        indexes = ["ix_solicitations_posted_date_id", "ix_organizations_name_id",
+                   "ix_emergency_capacities_created_at_id", "ix_match_results_score_id"]
+        with db.engine.begin() as conn:
+            for name in indexes:
+                conn.execute(text(f"DROP INDEX {name}"))
+        create_app()  # same database, tables already exist
+        _add_orgs(2)
+        org, sol = Organization.query.first(), Solicitation.query.first()
+        for k in range(2):
+            db.session.add(EmergencyCapacity(organization_id=org.id, supply_type="water", item_name=f"w{k}",
+                                             quantity=k, zip_code="38614", lat=34.2, lng=-90.6))
+            db.session.add(Solicitation(title=f"S{k}", description="d", agency="A", zip_code="38614",
+                                        lat=34.2, lng=-90.6, categories=["water"]))
+            db.session.add(MatchResult(solicitation_id=sol.id, organization_id=org.id, score=50))
+        db.session.commit()
+        statements = []
+
+        def capture(conn, cursor, statement, params, context, executemany):
+            if "LIMIT" in statement:
+                statements.append((statement, params))
+
+        event.listen(db.engine, "before_cursor_execute", capture)
+        try:
+            for url in ("/api/solicitations", "/api/organizations", "/api/emergency/capacity", "/api/matches"):
+                first = client.get(f"{url}?limit=1").get_json()
+                client.get(f"{url}?limit=1&cursor={first['next_cursor']}")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture)
+        connection = db.session.connection()
+        plans = [" ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params))
+                 for sql, params in statements]
+        assert len(plans) == 8
+        for name, (first, later) in zip(indexes, zip(plans[::2], plans[1::2])):
+            assert name in first and "TEMP B-TREE" not in first
+            # A later page seeks to its cursor instead of scanning from the start
+            assert later.startswith("SEARCH") and name in later and "TEMP B-TREE" not in later
+
+    def test_capacity_and_vendor_pages(self, client, app):
+        org = Organization.query.filter_by(org_type="supplier").first()
+        stamp = datetime(2026, 1, 1)
+        for k in range(4):
+            db.session.add(EmergencyCapacity(organization_id=org.id, supply_type="water", item_name=f"w{k}",
+                                             quantity=k, zip_code="38614", lat=34.2, lng=-90.6, created_at=stamp))
+        db.session.commit()
+        assert _walk(client, "/api/emergency/capacity") == client.get("/api/emergency/capacity").get_json()
+        _add_orgs(3)
+        vendors = client.get("/api/portal/federal/vendors").get_json()
+        assert _walk(client, "/api/portal/federal/vendors", key="vendors") == vendors["vendors"]
+
+    def test_match_pages(self, client, app):
+        sol = Solicitation.query.first()
+        org = Organization.query.first()
+        for score in (50, 70, 70, 10):
+            db.session.add(MatchResult(solicitation_id=sol.id, organization_id=org.id, score=score))
+        db.session.commit()
+        full = client.get("/api/matches").get_json()
+        assert _walk(client, "/api/matches", key="matches") == full["matches"]
+
+    def test_bad_parameters(self, client):
+        assert client.get("/api/organizations?cursor=nonsense").status_code == 400
+        assert client.get("/api/organizations?limit=0").status_code == 400
+        assert client.get("/api/organizations?limit=x").status_code == 400
+        assert client.get("/api/organizations?fields=name,secret").status_code == 400
+
+
+class TestFieldProjection:
+    def test_returns_only_requested_columns(self, client):
+        orgs = client.get("/api/organizations?fields=name,capabilities").get_json()
+        assert orgs and all(set(o) == {"name", "capabilities"} for o in orgs)
+        sols = client.get("/api/solicitations?fields=title,posted_date").get_json()
+        full = client.get("/api/solicitations").get_json()
+        assert sols == [{"title": s["title"], "posted_date": s["posted_date"]} for s in full]
+
+    def test_nested_organization_is_opt_in(self, client):
+        rows = client.get("/api/emergency/capacity?fields=item_name,quantity").get_json()
+        assert rows and all(set(r) == {"item_name", "quantity"} for r in rows)
+        rows = client.get("/api/emergency/capacity?fields=item_name,organization").get_json()
+        assert all(r["organization"]["id"] for r in rows)
+
+    def test_match_fields(self, client, app):
+        sol = Solicitation.query.first()
+        org = Organization.query.first()
+        db.session.add(MatchResult(solicitation_id=sol.id, organization_id=org.id, score=61.26))
+        db.session.commit()
+        data = client.get("/api/matches?fields=score").get_json()
+        assert data == {"matches": [{"score": 61.3}]}
+        data = client.get("/api/matches?fields=score,organization,solicitation").get_json()
+        assert data["matches"][0]["organization"]["id"] == org.id
+        assert list(data["solicitations"]) == [str(sol.id)]
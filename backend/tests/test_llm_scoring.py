@@ -0,0 +1,158 @@
+"""LLM match scoring (concurrency, caching) against a local fake OpenAI server."""
+import json
+import re
+import time
+import pytest
+from app import db
+from app.models.organization import Organization
+from app.models.solicitation import Solicitation
+from app.services import score_cache
+from app.services.matching import generate_matches
+from app.services.triage import run_triage
+from tests.fake_openai import FakeOpenAI
+
+SCORES = {"Delta Fresh Foods": 90, "MidSouth Logistics": 40, "Feed the Delta": 70}
+
+
+@pytest.fixture
+def fake_llm(app, monkeypatch):
+    def start(latency=0.0, **config):
+        fake = FakeOpenAI(latency=latency, scores=SCORES).__enter__()
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("OPENAI_BASE_URL", fake.base_url)
+        app.config.update(config)
+        started.append(fake)
+        return fake
+
+    started = []
+    yield start
+    for fake in started:
+        fake.__exit__(None, None, None)
+
+
+class TestConcurrentScoring:
+    def test_candidates_scored_in_parallel(self, fake_llm):
+        fake = fake_llm(latency=0.4, LLM_MAX_CONCURRENCY=5)
+        sol = Solicitation.query.first()
+        started = time.monotonic()
+        matches = generate_matches(sol.id)
+        elapsed = time.monotonic() - started
+
+        assert fake.calls == 3
+        assert fake.peak_in_flight == 3
+        assert elapsed < 1.0  # three serial calls would take 1.2s
+        by_name = {m["organization"]["name"]: m for m in matches}
+        for name, score in SCORES.items():
+            assert by_name[name]["llm_score"] == score
+            assert by_name[name]["explanation"] == f"LLM says {name}"
+
+    def test_concurrency_limit_respected(self, fake_llm):
+        fake = fake_llm(latency=0.2, LLM_MAX_CONCURRENCY=1)
+        generate_matches(Solicitation.query.first().id)
+        assert fake.calls == 3
+        assert fake.peak_in_flight == 1
+
+    def test_timeout_falls_back(self, fake_llm):
+        fake_llm(latency=2.0, LLM_TIMEOUT_SECONDS=0.2)
+        started = time.monotonic()
+        matches = generate_matches(Solicitation.query.first().id)
+        assert time.monotonic() - started < 1.5
+        assert len(matches) == 3
+        assert all("overlapping capabilities" in m["explanation"] for m in matches)
+
+
+class TestScoreCache:
+    def test_unchanged_pairs_are_not_rescored(self, fake_llm, client):
+        fake = fake_llm()
+        sol_id = Solicitation.query.first().id
+        first = generate_matches(sol_id)
+        assert fake.calls == 3
+
+        score_cache.clear_memory()  # second pass must be served from the table
+        second = generate_matches(sol_id)
+        assert fake.calls == 3
+        assert [m["llm_score"] for m in second] == [m["llm_score"] for m in first]
+
+        generate_matches(sol_id)
+        assert fake.calls == 3
+        stats = client.get("/api/matches/cache-stats").get_json()
+        assert stats["misses"] == 3
+        assert stats["db_hits"] == 3
+        assert stats["memory_hits"] == 3
+
+    def test_editing_an_organization_invalidates_its_pairs(self, fake_llm):
+        fake = fake_llm()
+        sol_id = Solicitation.query.first().id
+        generate_matches(sol_id)
+        org = Organization.query.filter_by(name="Feed the Delta").first()
+        org.capabilities = org.capabilities + ["fresh produce"]
+        db.session.commit()
+        generate_matches(sol_id)
+        assert fake.calls == 4
+        assert "Feed the Delta" in fake.prompts[-1]
+
+    def test_rerunning_triage_makes_no_llm_calls(self, fake_llm):
+        fake = fake_llm()
+        run_triage()
+        calls = fake.calls
+        run_triage()
+        assert fake.calls == calls
+
+    def test_fallbacks_are_not_cached(self, fake_llm):
+        fake = fake_llm(latency=1.0, LLM_TIMEOUT_SECONDS=0.1)
+        sol_id = Solicitation.query.first().id
+        generate_matches(sol_id)
+        fake.latency = 0.0
+        generate_matches(sol_id)
+        assert score_cache.cache_stats()["stores"] == 3
+
+
+def _batch_reply(entries):
+    """Reply with a JSON array built from the organization names in a batch prompt."""
+    def reply(prompt):
+        names = re.findall(r"^\d+\. Name: (.+)$", prompt, re.MULTILINE)
+        return json.dumps(entries(names))
+    return reply
+
+
+class TestBatchScoring:
+    def test_one_call_per_solicitation(self, fake_llm):
+        fake = fake_llm(LLM_BATCH_SCORING=True)
+        fake.reply = _batch_reply(lambda names: [
+            {"index": i, "score": SCORES[n], "explanation": f"batch {n}"} for i, n in enumerate(names, 1)
+        ])
+        matches = generate_matches(Solicitation.query.first().id)
+        assert fake.calls == 1
+        assert fake.prompts[0].count("Emergency food supply solicitation") == 1
+        by_name = {m["organization"]["name"]: m for m in matches}
+        for name, score in SCORES.items():
+            assert by_name[name]["llm_score"] == score
+            assert by_name[name]["explanation"] == f"batch {name}"
+
+    def test_malformed_entries_fall_back_per_candidate(self, fake_llm):
+        fake = fake_llm(LLM_BATCH_SCORING=True)
+        fake.reply = _batch_reply(lambda names: [
+            {"index": i, "score": "n/a" if n == "MidSouth Logistics" else SCORES[n], "explanation": "ok"}
+            for i, n in enumerate(names, 1) if n != "Feed the Delta"
+        ])
+        by_name = {m["organization"]["name"]: m for m in generate_matches(Solicitation.query.first().id)}
+        assert by_name["Delta Fresh Foods"]["explanation"] == "ok"
+        assert "overlapping capabilities" in by_name["MidSouth Logistics"]["explanation"]
+        assert "overlapping capabilities" in by_name["Feed the Delta"]["explanation"]
+
+    def test_unparseable_reply_falls_back_for_all(self, fake_llm):
+        fake = fake_llm(LLM_BATCH_SCORING=True)
+        fake.reply = lambda prompt: "Sorry, I can't help with that."
+        matches = generate_matches(Solicitation.query.first().id)
+        assert len(matches) == 3
+        assert all("overlapping capabilities" in m["explanation"] for m in matches)
+
+    def test_batch_results_feed_the_pair_cache(self, fake_llm):
+        fake = fake_llm(LLM_BATCH_SCORING=True)
+        fake.reply = _batch_reply(lambda names: [
+            {"index": i, "score": SCORES[n], "explanation": n} for i, n in enumerate(names, 1)
+        ])
+        sol_id = Solicitation.query.first().id
+        generate_matches(sol_id)
+        generate_matches(sol_id)
+        assert fake.calls == 1
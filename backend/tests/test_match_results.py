@@ -0,0 +1,57 @@
+"""Match persistence and the compact match payload shared by /matches and /solicitations/<id>."""
+from sqlalchemy import event
+from app import db
+from app.models.solicitation import Solicitation
+from app.services.matching import generate_matches
+
+
+def _count_inserts():
+    statements = []
+
+    def before(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO MATCH_RESULTS"):
+            statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", before)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", before)
+
+
+class TestBulkPersistence:
+    def test_matches_inserted_in_one_statement(self, app):
+        sol = Solicitation.query.first()
+        statements, stop = _count_inserts()
+        try:
+            matches = generate_matches(sol.id)
+        finally:
+            stop()
+        assert len(matches) == 3
+        assert len(statements) == 1
+
+    def test_generated_matches_are_compact_and_sorted(self, app):
+        matches = generate_matches(Solicitation.query.first().id)
+        scores = [m["score"] for m in matches]
+        assert scores == sorted(scores, reverse=True)
+        for m in matches:
+            assert m["id"] is not None
+            assert "solicitation" not in m
+            assert m["organization"]["id"] == m["organization_id"]
+
+
+class TestCompactPayload:
+    def test_solicitation_detail_embeds_compact_matches(self, client):
+        sol = Solicitation.query.first()
+        client.post("/api/matches/generate", json={"solicitation_id": sol.id})
+        data = client.get(f"/api/solicitations/{sol.id}").get_json()
+        assert data["id"] == sol.id
+        assert len(data["matches"]) == 3
+        assert all("solicitation" not in m and m["organization"]["name"] for m in data["matches"])
+
+    def test_match_listing_emits_each_solicitation_once(self, client):
+        sol = Solicitation.query.first()
+        client.post("/api/matches/generate", json={"solicitation_id": sol.id})
+        data = client.get("/api/matches").get_json()
+        assert list(data["solicitations"]) == [str(sol.id)]
+        assert data["solicitations"][str(sol.id)]["title"] == sol.title
+        assert len(data["matches"]) == 3
+        assert all("solicitation" not in m for m in data["matches"])
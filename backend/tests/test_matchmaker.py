@@ -10,110 +10,7 @@ distances were often 500+ miles, and capability strings often didn't overlap due
 to inconsistent naming.  Fix: removed all hard cutoffs, score everything with a
 continuous distance decay (3000 mi normalization), and return top 25 results.
 """
-import json
-import pytest
-from app import create_app, db
 from app.models.organization import Organization
-from app.models.solicitation import Solicitation
-from app.models.zip_need_score import ZipNeedScore
-from app.models.emergency_capacity import EmergencyCapacity
-from app.models.user import User
-
-
-@pytest.fixture
-def app(tmp_path, monkeypatch):
-    db_path = str(tmp_path / "test.db").replace("\\", "/")
-    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
-    # Force re-evaluation of config
-    import importlib
-    import app.config as cfg_mod
-    importlib.reload(cfg_mod)
-
-    app = create_app()
-    app.config["TESTING"] = True
-    with app.app_context():
-        _seed_test_data()
-        yield app
-        db.session.remove()
-
-
-@pytest.fixture
-def client(app):
-    return app.test_client()
-
-
-def _seed_test_data():
-    """Minimal seed for matchmaker testing."""
-    # ZIP scores
-    zips = [
-        ZipNeedScore(zip_code="38614", city="Clarksdale", state="MS",
-                     lat=34.2, lng=-90.6, population=15000, need_score=82),
-        ZipNeedScore(zip_code="72301", city="West Memphis", state="AR",
-                     lat=35.1, lng=-90.2, population=25000, need_score=70),
-        ZipNeedScore(zip_code="30301", city="Atlanta", state="GA",
-                     lat=33.75, lng=-84.39, population=500000, need_score=55),
-    ]
-    db.session.add_all(zips)
-    db.session.commit()
-
-    # Solicitation
-    sol = Solicitation(
-        title="Emergency Food Supply - MS Delta",
-        description="Emergency food supply solicitation for Mississippi Delta region",
-        agency="FEMA Region IV",
-        categories=["emergency supply", "fresh produce", "cold storage"],
-        zip_code="38614", lat=34.2, lng=-90.6,
-        status="open", estimated_value=500000,
-        source_type="government",
-    )
-    db.session.add(sol)
-    db.session.commit()
-
-    # Supplier
-    sup = Organization(
-        name="Delta Fresh Foods",
-        org_type="supplier",
-        zip_code="72301", lat=35.1, lng=-90.2,
-        capabilities=["fresh produce", "cold storage", "emergency supply"],
-        certifications=["USDA"],
-        service_radius_miles=500,
-        contact_email="delta@test.com",
-    )
-    # Distributor (vendor)
-    dist = Organization(
-        name="MidSouth Logistics",
-        org_type="distributor",
-        zip_code="30301", lat=33.75, lng=-84.39,
-        capabilities=["last mile delivery", "cold storage", "warehouse distribution"],
-        certifications=["FEMA vendor"],
-        service_radius_miles=1000,
-        contact_email="midsouth@test.com",
-    )
-    # Nonprofit
-    ngo = Organization(
-        name="Feed the Delta",
-        org_type="nonprofit",
-        zip_code="38614", lat=34.2, lng=-90.6,
-        capabilities=["community nutrition", "mobile food pantry"],
-        certifications=["Feeding America"],
-        service_radius_miles=200,
-        contact_email="feed@test.com",
-    )
-    db.session.add_all([sup, dist, ngo])
-    db.session.commit()
-
-    # Emergency capacity
-    cap = EmergencyCapacity(
-        organization_id=sup.id,
-        supply_type="water",
-        item_name="Bottled Water 16oz",
-        quantity=5000, unit="cases",
-        zip_code="72301", lat=35.1, lng=-90.2,
-        service_radius_miles=500,
-        status="available",
-    )
-    db.session.add(cap)
-    db.session.commit()
 
 
 # ─── Supplier Portal ────────────────────────────────────────
@@ -271,11 +168,11 @@ class TestCrisisDashboard:
 # ─── Haversine & Capability Overlap (unit) ────────────────────
 class TestUtilFunctions:
     def test_haversine_same_point(self):
-        from app.routes.portals import haversine
+        from app.services.geo import haversine
         assert haversine(34.0, -90.0, 34.0, -90.0) == 0.0
 
     def test_haversine_reasonable_distance(self):
-        from app.routes.portals import haversine
+        from app.services.geo import haversine
         # Clarksdale MS to Atlanta GA ~ 430 miles
         d = haversine(34.2, -90.6, 33.75, -84.39)
         assert 350 < d < 500
@@ -0,0 +1,72 @@
+"""Cached supplier × distributor matrix: incremental patches must equal a rebuild."""
+import numpy as np
+from app import db
+from app.models.organization import Organization
+from app.services.geo import haversine
+from app.services.org_pairs import _build_org_pairs, org_pairs
+
+
+def _org(name, org_type, lat, lng, capabilities=("water",)):
+    org = Organization(name=name, org_type=org_type, zip_code="38614", lat=lat, lng=lng,
+                       capabilities=list(capabilities), contact_email=f"{name}@test.com")
+    db.session.add(org)
+    return org
+
+
+def _assert_matches_rebuild():
+    cached, fresh = org_pairs.get(), _build_org_pairs()
+    for role in ("supplier", "distributor"):
+        assert cached.roles[role].ids == fresh.roles[role].ids
+        assert cached.roles[role].masks == fresh.roles[role].masks
+    np.testing.assert_allclose(cached.distances, fresh.distances)
+
+
+class TestOrgPairs:
+    def test_distances_match_haversine(self, app):
+        pairs = org_pairs.get()
+        sup = Organization.query.filter_by(org_type="supplier").first()
+        dist = Organization.query.filter_by(org_type="distributor").first()
+        assert abs(pairs.distance(sup, dist) - haversine(sup.lat, sup.lng, dist.lat, dist.lng)) < 1e-6
+
+    def test_writes_patch_rows_and_columns(self, app):
+        org_pairs.get()
+        s = _org("New Supplier", "supplier", 36.0, -89.0)
+        d = _org("New Distributor", "distributor", 32.0, -88.0, ["dairy"])
+        db.session.commit()
+        _assert_matches_rebuild()
+
+        s.lat, s.lng = 40.0, -80.0
+        d.org_type = "supplier"
+        db.session.commit()
+        _assert_matches_rebuild()
+
+        db.session.delete(s)
+        db.session.commit()
+        _assert_matches_rebuild()
+
+    def test_distributor_portal_uses_cached_partners(self, client):
+        extra = _org("Second Supplier", "supplier", 34.5, -90.0, ["fresh produce", "cold storage"])
+        db.session.commit()
+        dist = Organization.query.filter_by(org_type="distributor").first()
+        match = client.get(f"/api/portal/distributor/{dist.id}/matches").get_json()["matched_solicitations"][0]
+        names = [p["supplier"]["name"] for p in match["supplier_partners"]]
+        assert set(names) == {"Delta Fresh Foods", extra.name}
+        for p in match["supplier_partners"]:
+            org = db.session.get(Organization, p["supplier"]["id"])
+            assert p["distance_to_distributor"] == round(haversine(org.lat, org.lng, dist.lat, dist.lng), 1)
+
+    def test_uncached_orgs_fall_back_to_direct_distances(self, client):
+        sup = Organization.query.filter_by(org_type="supplier").first()
+        dist = Organization.query.filter_by(org_type="distributor").first()
+        pairs = org_pairs.get()
+        # As if written by bulk SQL or by another worker since the last refresh
+        pairs.remove(sup.id)
+        pairs.remove(dist.id)
+        np.testing.assert_allclose(
+            pairs.supplier_row(sup.id, sup.lat, sup.lng),
+            [haversine(sup.lat, sup.lng, lat, lng) for lat, lng in zip(*np.degrees([pairs.distributors.lat, pairs.distributors.lng]))],
+        )
+        assert len(pairs.distributor_column(dist.id, dist.lat, dist.lng)) == len(pairs.suppliers)
+        assert abs(pairs.distance(sup, dist) - haversine(sup.lat, sup.lng, dist.lat, dist.lng)) < 1e-6
+        assert client.get(f"/api/portal/supplier/{sup.id}/matches").status_code == 200
+        assert client.get(f"/api/portal/distributor/{dist.id}/matches").status_code == 200
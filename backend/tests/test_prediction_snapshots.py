@@ -0,0 +1,78 @@
+"""Food-insecurity endpoint served from the daily prediction snapshot."""
+from datetime import date, timedelta
+from app import db
+from app.models.prediction_snapshot import PredictionSnapshot
+from app.models.prediction_snapshot_run import PredictionSnapshotRun
+from app.models.zip_need_score import ZipNeedScore
+from app.services import prediction_model as pm
+from app.services import prediction_snapshots
+
+
+def _count_builds(monkeypatch):
+    calls = []
+    real = prediction_snapshots.predict_food_insecurity
+
+    def counting(day=None):
+        calls.append(day)
+        return real(day)
+
+    monkeypatch.setattr(prediction_snapshots, "predict_food_insecurity", counting)
+    return calls
+
+
+def _expected(predictions):
+    critical = [p for p in predictions if p["severity"] == "critical"]
+    high = [p for p in predictions if p["severity"] == "high"]
+    return {
+        "total_zones": len(predictions),
+        "critical": len(critical),
+        "high": len(high),
+        "elevated": len([p for p in predictions if p["severity"] == "elevated"]),
+        "moderate": len([p for p in predictions if p["severity"] == "moderate"]),
+        "total_population_at_risk": sum(p["population"] for p in critical + high),
+        "coverage_gaps": len([p for p in predictions if p["coverage_status"] == "gap"]),
+    }
+
+
+class TestPredictionSnapshots:
+    def test_served_from_snapshot(self, app, client, monkeypatch):
+        calls = _count_builds(monkeypatch)
+        first = client.get("/api/predictions/food-insecurity").get_json()
+        second = client.get("/api/predictions/food-insecurity").get_json()
+        assert len(calls) == 1
+        assert first == second
+        assert first["predictions"] == pm.predict_food_insecurity()
+        assert first["summary"] == _expected(first["predictions"])
+        assert PredictionSnapshot.query.count() == len(first["predictions"])
+
+    def test_filters_match_full_list(self, app, client):
+        everything = pm.predict_food_insecurity()
+        for query, keep in [
+            ("?state=ms", lambda p: p["state"] == "MS"),
+            ("?severity=high", lambda p: p["severity"] == "high"),
+            ("?severity=moderate&state=AR", lambda p: p["severity"] == "moderate" and p["state"] == "AR"),
+        ]:
+            body = client.get(f"/api/predictions/food-insecurity{query}").get_json()
+            expected = [p for p in everything if keep(p)]
+            assert body["predictions"] == expected
+            assert body["summary"] == _expected(expected)
+
+    def test_input_change_rebuilds(self, app, client, monkeypatch):
+        calls = _count_builds(monkeypatch)
+        client.get("/api/predictions/food-insecurity")
+        zip_score = ZipNeedScore.query.filter_by(zip_code="38614").first()
+        zip_score.population = 99999
+        db.session.commit()
+        body = client.get("/api/predictions/food-insecurity").get_json()
+        assert len(calls) == 2
+        assert next(p for p in body["predictions"] if p["zip_code"] == "38614")["population"] == 99999
+
+    def test_old_snapshots_pruned(self, app):
+        today = date.today()
+        old = today - timedelta(days=app.config["PREDICTION_SNAPSHOT_RETENTION_DAYS"] + 1)
+        prediction_snapshots.build_snapshot(old)
+        assert PredictionSnapshotRun.query.count() == 1
+        run = prediction_snapshots.build_snapshot(today)
+        assert run.zones == ZipNeedScore.query.count()
+        assert [r.snapshot_date for r in PredictionSnapshotRun.query.all()] == [today]
+        assert {s.snapshot_date for s in PredictionSnapshot.query.all()} == {today}
@@ -0,0 +1,169 @@
+"""Column-wise food-insecurity model and surplus matching against their per-row definitions."""
+import json
+import random
+from datetime import date
+import numpy as np
+from app import db
+from app.models.emergency_capacity import EmergencyCapacity
+from app.models.organization import Organization
+from app.models.solicitation import Solicitation
+from app.models.zip_need_score import ZipNeedScore
+from app.services.geo import haversine
+from app.services import prediction_model as pm
+from app.services.stable_random import stable_draws
+
+
+def _socioeconomic_vulnerability(z):
+    score = ((z.food_insecurity_rate or 0) * 200) + ((z.snap_participation_rate or 0) * 150) + ((z.need_score or 0) * 0.3)
+    return min(100, score)
+
+
+def _food_desert_score(orgs_in_range):
+    if orgs_in_range == 0:
+        return 100
+    elif orgs_in_range == 1:
+        return 75
+    elif orgs_in_range <= 3:
+        return 50
+    return max(0, 30 - orgs_in_range * 3)
+
+
+def _estimate_needed_supplies(z, disaster_types):
+    affected = int((z.population or 10000) * 0.2)
+    supplies = [
+        {"type": "water", "name": "Drinking Water", "quantity": affected * 3, "unit": "gallons"},
+        {"type": "non_perishable", "name": "MREs / Shelf-Stable Meals", "quantity": affected * 9, "unit": "meals"},
+    ]
+    if "Hurricane" in disaster_types or "Flood" in disaster_types:
+        supplies.append({"type": "shelf_stable", "name": "Canned Goods", "quantity": int(affected * 5), "unit": "cans"})
+        supplies.append({"type": "hygiene_supplies", "name": "Emergency Hygiene Kits",
+                         "quantity": int(affected * 0.5), "unit": "kits"})
+    if "Winter Storm" in disaster_types:
+        supplies.append({"type": "shelf_stable", "name": "Hot Meal Kits", "quantity": affected * 3, "unit": "kits"})
+    supplies.append({"type": "baby_formula", "name": "Infant Formula",
+                     "quantity": max(10, int(affected * 0.03 * 7)), "unit": "cans"})
+    supplies.append({"type": "medical_nutrition", "name": "Medical Nutrition Supplements",
+                     "quantity": max(20, int(affected * 0.05 * 7)), "unit": "units"})
+    return supplies
+
+
+def _scalar_predictions():
+    """The original one-ZIP-at-a-time model."""
+    orgs = Organization.query.all()
+    sol_zips = {s.zip_code for s in Solicitation.query.filter_by(status="open")}
+    cap_zips = {c.zip_code for c in EmergencyCapacity.query.filter_by(status="available")}
+    predictions = []
+    for z in ZipNeedScore.query.all():
+        nearby = sum(1 for o in orgs if haversine(z.lat, z.lng, o.lat, o.lng) <= 100)
+        climate = pm._climate_risk_score(z.state)
+        socioeconomic = _socioeconomic_vulnerability(z)
+        desert = _food_desert_score(nearby)
+        composite = min(100, socioeconomic * 0.35 + climate * 0.25 + desert * 0.25 + (z.need_score or 0) * 0.15)
+        u30, u60, u90 = stable_draws(z.zip_code, date.today().toordinal(), n=3)
+        noise = (-5 + 10 * u30, -8 + 16 * u60, -10 + 20 * u90)
+        disaster_types = pm._disaster_types_for_state(z.state)
+        severity = ("critical" if composite >= 80 else "high" if composite >= 65
+                    else "elevated" if composite >= 50 else "moderate")
+        predictions.append({
+            "zip_code": z.zip_code, "city": z.city, "state": z.state, "lat": z.lat, "lng": z.lng,
+            "population": z.population,
+            "food_insecurity_rate": round((z.food_insecurity_rate or 0) * 100, 1),
+            "snap_participation_rate": round((z.snap_participation_rate or 0) * 100, 1),
+            "need_score": z.need_score,
+            "composite_risk": round(composite, 1),
+            "severity": severity,
+            "climate_risk": round(climate, 1),
+            "socioeconomic_vulnerability": round(socioeconomic, 1),
+            "food_desert_score": round(desert, 1),
+            "disaster_types": disaster_types,
+            "probability_30_days": round(min(99, max(5, composite * 0.85 + noise[0])), 1),
+            "probability_60_days": round(min(99, max(10, composite * 0.95 + noise[1])), 1),
+            "probability_90_days": round(min(99, max(15, composite * 1.05 + noise[2])), 1),
+            "needed_supplies": _estimate_needed_supplies(z, disaster_types),
+            "nearby_organizations": nearby,
+            "coverage_status": "covered" if (z.zip_code in sol_zips or z.zip_code in cap_zips) else "gap",
+        })
+    predictions.sort(key=lambda p: p["composite_risk"], reverse=True)
+    return predictions
+
+
+def _scalar_surplus_matches():
+    """The original pair-at-a-time surplus matcher."""
+    caps = EmergencyCapacity.query.filter_by(status="available").all()
+    orgs = Organization.query.all()
+    matches = []
+    for z in ZipNeedScore.query.all():
+        if z.need_score < 65 or sum(1 for o in orgs if haversine(z.lat, z.lng, o.lat, o.lng) <= 150) > 2:
+            continue
+        ranked = []
+        for org in orgs:
+            org_caps = [c for c in caps if c.organization_id == org.id]
+            quantity = sum(c.quantity or 0 for c in org_caps)
+            if quantity <= 0 and org.service_radius_miles < 300:
+                continue
+            dist = haversine(z.lat, z.lng, org.lat, org.lng)
+            if dist <= org.service_radius_miles * 1.5 and dist > 50:
+                score = max(0, 100 - (dist / org.service_radius_miles) * 50) + (20 if quantity > 0 else 0)
+                ranked.append((round(score, 1), org.id, round(dist, 1)))
+        ranked.sort(key=lambda r: r[0], reverse=True)
+        matches.append((z.need_score, z.zip_code, ranked[:5]))
+    matches.sort(key=lambda m: m[0], reverse=True)
+    return matches
+
+
+class TestPredictFoodInsecurity:
+    def test_matches_scalar_model(self, app):
+        rng = random.Random(21)
+        states = ["MS", "TX", "CA", "MN", "VT", None]
+        for k in range(300):
+            db.session.add(ZipNeedScore(
+                zip_code=f"9{k:04d}", lat=rng.uniform(25, 48), lng=rng.uniform(-120, -70),
+                state=rng.choice(states), city=f"City {k}",
+                food_insecurity_rate=rng.choice([None, rng.uniform(0, 0.5)]),
+                snap_participation_rate=rng.uniform(0, 0.4),
+                population=rng.choice([None, rng.randint(0, 900000)]),
+                need_score=rng.choice([None, 100.0, rng.uniform(0, 100)]),
+            ))
+        for k in range(60):
+            db.session.add(Organization(name=f"Org {k}", org_type="nonprofit", zip_code="38614",
+                                        lat=rng.uniform(25, 48), lng=rng.uniform(-120, -70)))
+        db.session.commit()
+        # Serialized form, so int-vs-float bounds must match too
+        assert json.dumps(pm.predict_food_insecurity()) == json.dumps(_scalar_predictions())
+
+    def test_empty_table(self, app):
+        ZipNeedScore.query.delete()
+        db.session.commit()
+        assert pm.predict_food_insecurity() == []
+
+
+class TestSurplusMatching:
+    def test_matches_scalar_matcher(self, app):
+        rng = random.Random(25)
+        for k in range(150):
+            db.session.add(ZipNeedScore(zip_code=f"8{k:04d}", lat=rng.uniform(25, 48), lng=rng.uniform(-120, -70),
+                                        state="TX", city=f"City {k}", need_score=rng.choice([50, 65, 80, 95])))
+        orgs = [Organization(name=f"Org {k}", org_type="supplier", zip_code="38614",
+                             lat=rng.uniform(25, 48), lng=rng.uniform(-120, -70),
+                             service_radius_miles=rng.choice([50, 200, 300, 800]))
+                for k in range(80)]
+        db.session.add_all(orgs)
+        db.session.flush()
+        for _ in range(60):
+            db.session.add(EmergencyCapacity(organization_id=rng.choice(orgs).id, supply_type="water", item_name="Water",
+                                             quantity=rng.choice([0, 40]), unit="gallons", zip_code="38614",
+                                             lat=34.2, lng=-90.6, status=rng.choice(["available", "committed"])))
+        db.session.commit()
+        matches = pm.find_surplus_shortage_matches()
+        got = [(m["shortage_area"]["need_score"], m["shortage_area"]["zip_code"],
+                [(s["score"], s["organization"]["id"], s["distance_miles"]) for s in m["matched_suppliers"]])
+               for m in matches]
+        expected = _scalar_surplus_matches()
+        assert sum(len(m[2]) for m in expected) > 50
+        # Shortage areas of equal need may come back in either table order
+        assert sorted(got, key=lambda m: (-m[0], m[1])) == sorted(expected, key=lambda m: (-m[0], m[1]))
+
+    def test_round1_matches_python_round(self):
+        rng = random.Random(5)
+        values = [k / 20 for k in range(-400, 2400)] + [0.15, 2.675, 1.05, 99.95] + [rng.uniform(0, 120) for _ in range(2000)]
+        assert pm._round1(np.array(values)).tolist() == [round(v, 1) for v in values]
@@ -0,0 +1,103 @@
+"""Bounded top-k selection must agree with a full stable sort."""
+import random
+from app import db
+from app.models.organization import Organization
+from app.services.ranking import TopK, top_k, top_k_pairs
+
+
+class TestTopK:
+    def test_matches_stable_sort(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            items = [(rng.randint(0, 20), i) for i in range(rng.randint(0, 60))]
+            k = rng.randint(0, 15)
+            key = lambda it: it[0]
+            assert top_k(items, k, key) == sorted(items, key=key, reverse=True)[:k]
+            assert top_k(items, k, key, largest=False) == sorted(items, key=key)[:k]
+
+    def test_counts_everything_seen(self):
+        ranked = TopK(2)
+        for i, score in enumerate([5, 9, 9, 1, 7]):
+            ranked.push(score, i)
+        assert len(ranked) == 5
+        assert ranked.items() == [1, 2]
+
+
+class TestTopKPairs:
+    def test_matches_brute_force_with_caps_and_ties(self):
+        rng = random.Random(11)
+        key = lambda total: round(min(100, total), 1)
+        for _ in range(150):
+            rows = [rng.choice([rng.uniform(0, 60), 40.0, 55.55]) for _ in range(rng.randint(0, 25))]
+            cols = [rng.choice([rng.uniform(0, 50), 10.0, 44.45]) for _ in range(rng.randint(0, 25))]
+            exact = lambda i, j: key(rows[i] + cols[j])
+            k = rng.randint(0, 30)
+            fast = top_k_pairs(rows, cols, k, exact, key=key)
+            slow = top_k_pairs(rows, cols, k, exact, key=key, brute_force=True)
+            assert fast.items() == slow.items()
+            assert len(fast) <= len(slow)
+
+    def test_stops_early_on_distinct_scores(self):
+        rows = [float(i) for i in range(200)]
+        cols = [float(j) * 1000 for j in range(200)]
+        scored = []
+
+        def exact(i, j):
+            scored.append((i, j))
+            return rows[i] + cols[j]
+
+        ranked = top_k_pairs(rows, cols, 3, exact)
+        assert ranked.items() == [(199, 199), (198, 199), (197, 199)]
+        assert len(ranked) == len(scored)
+        assert len(scored) < 10
+
+
+class TestRankedEndpoints:
+    def test_tri_match_reports_all_combos(self, client):
+        data = client.post("/api/portal/federal/match", json={"destination_zip": "38614"}).get_json()
+        assert data["total_combos_evaluated"] == 1  # one supplier × one distributor in the seed
+        scores = [m["combo_score"] for m in data["matches"]]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_tri_match_agrees_with_brute_force(self, client):
+        for body in ({"destination_zip": "38614"}, {"destination_zip": "38614", "categories": ["water"]}):
+            fast = client.post("/api/portal/federal/match", json=body).get_json()
+            slow = client.post("/api/portal/federal/match", json={**body, "brute_force": True}).get_json()
+            assert fast["matches"] == slow["matches"]
+            assert fast["total_combos_evaluated"] == slow["total_combos_evaluated"]
+            assert fast["combos_scored"] <= slow["combos_scored"]
+
+    def test_brute_force_is_test_only(self, app, client):
+        rng = random.Random(17)
+        for k in range(30):
+            db.session.add(Organization(name=f"Pair Org {k}", org_type=("supplier", "distributor")[k % 2],
+                                        zip_code="38614", lat=rng.uniform(25, 48), lng=rng.uniform(-120, -70)))
+        db.session.commit()
+        body = {"destination_zip": "38614"}
+        suppliers = Organization.query.filter_by(org_type="supplier").count()
+        distributors = Organization.query.filter_by(org_type="distributor").count()
+        slow = client.post("/api/portal/federal/match", json={**body, "brute_force": True}).get_json()
+        assert slow["combos_scored"] == suppliers * distributors
+        app.config["TESTING"] = False
+        fast = client.post("/api/portal/federal/match", json={**body, "brute_force": True}).get_json()
+        assert fast["combos_scored"] < suppliers * distributors
+        assert fast["total_combos_evaluated"] == slow["total_combos_evaluated"] == suppliers * distributors
+        assert fast["matches"] == slow["matches"]
+
+    def test_rfq_quotes_sorted_by_cost(self, client):
+        data = client.post("/api/rfq/estimate", json={
+            "destination_zip": "38614",
+            "items": [{"supply_type": "water", "quantity": 100}],
+        }).get_json()
+        costs = [q["supply_subtotal"] for q in data["supplier_quotes"]]
+        assert costs == sorted(costs)
+        assert data["total_suppliers_evaluated"] >= len(data["supplier_quotes"])
+        assert data["best_combo"] == (data["combo_rankings"][0] if data["combo_rankings"] else None)
+
+    def test_surplus_matching_keeps_best_five(self, client):
+        res = client.get("/api/predictions/surplus-matching")
+        assert res.status_code == 200
+        data = res.get_json()
+        for area in data["matches"]:
+            scores = [m["score"] for m in area["matched_suppliers"]]
+            assert len(scores) <= 5 and scores == sorted(scores, reverse=True)
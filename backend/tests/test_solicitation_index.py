@@ -0,0 +1,67 @@
+"""Category → open-solicitation inverted index used by the portals."""
+from app import db
+from app.models.organization import Organization
+from app.models.solicitation import Solicitation
+from app.services.solicitation_index import category_index, open_solicitations_sharing
+
+
+def _add_solicitation(title, categories, status="open"):
+    sol = Solicitation(
+        title=title, description="test", agency="FEMA", categories=categories,
+        zip_code="38614", lat=34.2, lng=-90.6, status=status,
+    )
+    db.session.add(sol)
+    db.session.commit()
+    return sol
+
+
+def _titles(sols):
+    return {s.title for s in sols}
+
+
+class TestCategoryIndex:
+    def test_only_sharing_solicitations_are_returned(self, app):
+        _add_solicitation("Water Run", ["Water"])
+        _add_solicitation("Closed Produce", ["fresh produce"], status="awarded")
+        assert _titles(open_solicitations_sharing(["water", "dairy"])) == {"Water Run"}
+        assert _titles(open_solicitations_sharing(["Fresh Produce"])) == {"Emergency Food Supply - MS Delta"}
+        assert open_solicitations_sharing(["dairy"]) == []
+
+    def test_create_status_change_and_delete_are_patched_in(self, app):
+        category_index.get()
+        sol = _add_solicitation("Baby Formula Drop", ["baby formula"])
+        assert _titles(open_solicitations_sharing(["baby formula"])) == {"Baby Formula Drop"}
+
+        sol.status = "closed"
+        db.session.commit()
+        assert open_solicitations_sharing(["baby formula"]) == []
+
+        sol.status = "open"
+        sol.categories = ["dairy"]
+        db.session.commit()
+        assert open_solicitations_sharing(["baby formula"]) == []
+        assert _titles(open_solicitations_sharing(["dairy"])) == {"Baby Formula Drop"}
+
+        db.session.delete(sol)
+        db.session.commit()
+        assert open_solicitations_sharing(["dairy"]) == []
+
+
+class TestPortalCandidates:
+    def test_zero_overlap_solicitations_are_opt_in(self, client):
+        _add_solicitation("Hygiene Kits", ["hygiene supplies"])
+        sup = Organization.query.filter_by(org_type="supplier").first()
+        data = client.get(f"/api/portal/supplier/{sup.id}/matches").get_json()
+        assert [m["solicitation"]["title"] for m in data["matched_solicitations"]] == ["Emergency Food Supply - MS Delta"]
+        assert data["total_matches"] == 1
+
+        data = client.get(f"/api/portal/supplier/{sup.id}/matches?include_zero_overlap=true").get_json()
+        assert data["total_matches"] == 2
+
+    def test_no_overlap_at_all_falls_back_to_every_open_solicitation(self, client):
+        odd = Organization(name="Widget Co", org_type="supplier", zip_code="38614", lat=34.2, lng=-90.6,
+                           capabilities=["widgets"], contact_email="w@test.com")
+        db.session.add(odd)
+        db.session.commit()
+        data = client.get(f"/api/portal/supplier/{odd.id}/matches").get_json()
+        assert data["total_matches"] == 1
@@ -0,0 +1,58 @@
+"""Organization coverage index tests."""
+import random
+from app import db
+from app.models.organization import Organization
+from app.models.solicitation import Solicitation
+from app.services.geo import haversine
+from app.services.matching import prefilter_candidates
+from app.services.spatial_index import CoverageIndex, organization_index, organizations_covering
+
+
+class TestCoverageIndex:
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        index = CoverageIndex()
+        areas = {}
+        for key in range(400):
+            area = (rng.uniform(-60, 75), rng.uniform(-180, 180), rng.choice([15, 150, 750, 1500, 6000]))
+            areas[key] = area
+            index.insert(key, *area)
+        for key in range(0, 400, 5):
+            index.remove(key)
+            del areas[key]
+        for _ in range(100):
+            lat, lng = rng.uniform(-89, 89), rng.uniform(-180, 180)
+            expected = {k for k, (a, b, r) in areas.items() if haversine(lat, lng, a, b) <= r}
+            assert set(index.covering(lat, lng)) == expected
+
+    def test_wraps_antimeridian(self):
+        index = CoverageIndex()
+        index.insert("fiji", -17.7, 178.0, 300)
+        assert "fiji" in index.covering(-17.7, -179.0)
+
+
+class TestOrganizationIndex:
+    def test_prefilter_uses_service_radius(self, app):
+        sol = Solicitation.query.first()
+        names = {c["org"].name for c in prefilter_candidates(sol)}
+        # Atlanta distributor is ~430 mi away but has a 1000 mi radius
+        assert names == {"Delta Fresh Foods", "MidSouth Logistics", "Feed the Delta"}
+
+    def test_created_and_moved_orgs_are_patched_in(self, app):
+        organization_index.get()
+        org = Organization(name="Far Away Pantry", org_type="nonprofit", zip_code="98101",
+                           lat=47.6, lng=-122.3, service_radius_miles=50,
+                           contact_email="far@test.com")
+        db.session.add(org)
+        db.session.commit()
+        assert org.id in organizations_covering(47.6, -122.3)
+        assert org.id not in organizations_covering(34.2, -90.6)
+
+        org.lat, org.lng = 34.3, -90.5
+        db.session.commit()
+        assert org.id in organizations_covering(34.2, -90.6)
+        assert org.id not in organizations_covering(47.6, -122.3)
+
+        db.session.delete(org)
+        db.session.commit()
+        assert org.id not in organizations_covering(34.2, -90.6)
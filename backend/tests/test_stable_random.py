@@ -0,0 +1,41 @@
+"""Digest-keyed draws are stable across processes and leave global state alone."""
+import random
+import numpy as np
+import pytest
+from app.services.stable_random import stable_draw_columns, stable_draws
+
+
+class TestStableDraws:
+    def test_pinned_values(self):
+        # Fixed numbers: the same on every worker regardless of PYTHONHASHSEED
+        assert stable_draws("38614", 739000, n=3) == [0.9581823916911963, 0.5227209803895929, 0.41014149106416453]
+        assert stable_draws("supplier", "Acme", "38614") == [0.3112742451381776]
+
+    def test_columns_match_scalar_draws(self):
+        keys = [f"{k:05d}" for k in range(200)]
+        columns = stable_draw_columns(keys, 739000, n=3)
+        assert columns.shape == (200, 3)
+        assert columns.tolist() == [stable_draws(key, 739000, n=3) for key in keys]
+        assert ((columns >= 0) & (columns < 1)).all()
+        assert stable_draw_columns([], 739000, n=2).shape == (0, 2)
+
+    def test_prefix_of_longer_draw(self):
+        assert stable_draws("a", "b", n=2) == stable_draws("a", "b", n=4)[:2]
+        assert stable_draws("a", "b") != stable_draws("ab")
+
+    def test_draw_count_bounds(self):
+        with pytest.raises(ValueError):
+            stable_draws("a", n=5)
+        with pytest.raises(ValueError):
+            stable_draw_columns(["a"], n=0)
+
+    def test_endpoints_do_not_touch_global_random(self, client):
+        random.seed(1234)
+        expected = random.random()
+        random.seed(1234)
+        body = {"destination_zip": "38614", "items": [{"supply_type": "water", "quantity": 100}]}
+        first = client.post("/api/rfq/estimate", json=body).get_json()
+        client.get("/api/predictions/food-insecurity")
+        assert random.random() == expected
+        assert client.post("/api/rfq/estimate", json=body).get_json() == first
+        assert np.isfinite([q["supply_subtotal"] for q in first["supplier_quotes"]]).all()
@@ -0,0 +1,84 @@
+"""Association tables mirroring NAICS codes, capabilities and categories, and the filters that use them."""
+from app import db
+from app.models.organization import Organization
+from app.models.organization_capability import OrganizationCapability
+from app.models.organization_naics import OrganizationNaics
+from app.models.solicitation import Solicitation
+from app.models.solicitation_category import SolicitationCategory
+from app.services.term_links import backfill_term_links
+
+
+def _capabilities(org_id):
+    return sorted(c for (c,) in db.session.query(OrganizationCapability.capability).filter_by(organization_id=org_id))
+
+
+class TestSyncOnWrite:
+    def test_insert_update_delete(self, app):
+        org = Organization(name="Delta Greens", org_type="supplier", zip_code="38614", lat=34.2, lng=-90.6,
+                           capabilities=["water", "dairy", "water"], naics_codes=["311991"])
+        db.session.add(org)
+        db.session.commit()
+        assert _capabilities(org.id) == ["dairy", "water"]
+        assert OrganizationNaics.query.filter_by(organization_id=org.id).count() == 1
+
+        org.capabilities = ["protein"]
+        db.session.commit()
+        assert _capabilities(org.id) == ["protein"]
+
+        org_id = org.id
+        db.session.delete(org)
+        db.session.commit()
+        assert _capabilities(org_id) == []
+        assert OrganizationNaics.query.filter_by(organization_id=org_id).count() == 0
+
+    def test_seeded_categories_are_linked(self, app):
+        sol = Solicitation.query.first()
+        linked = {c.category for c in SolicitationCategory.query.filter_by(solicitation_id=sol.id)}
+        assert linked == set(sol.categories)
+
+    def test_backfill_fills_empty_tables(self, app):
+        expected = OrganizationCapability.query.count()
+        OrganizationCapability.query.delete()
+        db.session.commit()
+        with db.engine.begin() as conn:
+            assert backfill_term_links(conn) == expected
+            assert backfill_term_links(conn) == 0
+        assert OrganizationCapability.query.count() == expected
+
+    def test_backfill_runs_only_when_tables_are_created(self, app, monkeypatch):
+        from app import create_app
+        import app.services.term_links as term_links
+        calls = []
+        monkeypatch.setattr(term_links, "backfill_term_links", lambda conn: calls.append(conn) or 0)
+        create_app()  # same database, tables already exist
+        assert calls == []
+
+    def test_long_terms_are_stored_whole(self, app):
+        long_naics, long_capability = "3" * 40, "refrigerated " * 30
+        org = Organization(name="Long Terms", org_type="supplier", zip_code="38614", lat=34.2, lng=-90.6,
+                           capabilities=[long_capability], naics_codes=[long_naics])
+        db.session.add(org)
+        db.session.commit()
+        assert _capabilities(org.id) == [long_capability]
+        assert db.session.query(OrganizationNaics.naics_code).filter_by(organization_id=org.id).scalar() == long_naics
+
+
+class TestTermFilters:
+    def test_vendor_capability_is_case_insensitive_substring(self, client):
+        data = client.get("/api/portal/federal/vendors?capability=COLD").get_json()
+        assert data["total"] == 2
+        assert client.get("/api/portal/federal/vendors?capability=c%25ld").get_json()["total"] == 0
+
+    def test_vendor_naics_filter(self, client, app):
+        org = Organization.query.filter_by(org_type="supplier").first()
+        org.naics_codes = ["424480"]
+        db.session.commit()
+        data = client.get("/api/portal/federal/vendors?naics=424480").get_json()
+        assert [v["id"] for v in data["vendors"]] == [org.id]
+
+    def test_list_filters_match_exact_terms(self, client):
+        orgs = client.get("/api/organizations?capability=cold storage").get_json()
+        assert len(orgs) == 2
+        assert client.get("/api/organizations?capability=cold").get_json() == []
+        sols = client.get("/api/solicitations?category=fresh produce").get_json()
+        assert len(sols) == 1
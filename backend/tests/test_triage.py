@@ -0,0 +1,95 @@
+"""Triage engine tests: parallel and incremental runs must agree with a full serial run."""
+import json
+from app import db
+from app.models.match_result import MatchResult
+from app.models.organization import Organization
+from app.models.solicitation import Solicitation
+from app.models.zip_need_score import ZipNeedScore
+from app.services.triage import run_triage
+
+
+def _add_solicitations():
+    for i, (zip_code, lat, lng) in enumerate([
+        ("72301", 35.1, -90.2), ("30301", 33.75, -84.39), ("38614", 34.2, -90.6),
+        ("72301", 35.1, -90.2), ("30301", 33.75, -84.39),
+    ]):
+        db.session.add(Solicitation(
+            title=f"Surge Order {i}", description="Water and produce for shelters",
+            agency="FEMA", categories=["fresh produce", "water"],
+            zip_code=zip_code, lat=lat, lng=lng, status="open",
+        ))
+    db.session.commit()
+
+
+class TestTriage:
+    def test_action_plan_ranked_by_need(self, app):
+        _add_solicitations()
+        plan = run_triage()["action_plan"]
+        assert [e["priority"] for e in plan] == list(range(1, 7))
+        needs = [e["need_score"] for e in plan]
+        assert needs == sorted(needs, reverse=True)
+        assert all(e["top_match"] for e in plan)
+
+    def test_parallel_matches_serial(self, app):
+        _add_solicitations()
+        serial = run_triage(workers=1)
+        parallel = run_triage(workers=2, chunk_size=2)
+        assert parallel == serial
+        assert MatchResult.query.count() == sum(e["total_matches"] for e in serial["action_plan"])
+
+
+class TestIncrementalTriage:
+    def test_unchanged_solicitations_are_reused(self, app):
+        _add_solicitations()
+        full = run_triage()
+        again = run_triage(incremental=True)
+        assert again["rematched"] == 0
+        assert again["action_plan"] == full["action_plan"]
+
+    def test_only_changed_inputs_are_rematched(self, app):
+        _add_solicitations()
+        run_triage()
+        sol = Solicitation.query.filter_by(title="Surge Order 0").first()
+        sol.description = "Updated: baby formula needed"
+        db.session.commit()
+        assert run_triage(incremental=True)["rematched"] == 1
+
+    def test_org_and_need_changes_trigger_rematch(self, app):
+        _add_solicitations()
+        run_triage()
+        org = Organization.query.filter_by(name="MidSouth Logistics").first()
+        org.certifications = ["FEMA vendor", "ISO 22000"]
+        db.session.commit()
+        # every solicitation is within the Atlanta distributor's 1500 mi reach
+        assert run_triage(incremental=True)["rematched"] == 6
+
+        zip_entry = db.session.get(ZipNeedScore, "30301")
+        zip_entry.need_score = 90
+        db.session.commit()
+        assert run_triage(incremental=True)["rematched"] == 2
+
+    def test_route_mode(self, client):
+        client.post("/api/matches/triage")
+        res = client.post("/api/matches/triage?mode=incremental")
+        assert res.get_json()["rematched"] == 0
+
+
+class TestStreamingTriage:
+    def test_ndjson_stream_matches_batch_plan(self, app, client):
+        _add_solicitations()
+        res = client.post("/api/matches/triage/stream")
+        assert res.is_streamed
+        assert res.mimetype == "application/x-ndjson"
+        records = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+        assert records[0] == {"type": "start", "total_open": 6, "rematched": 6}
+        assert records[-1] == {"type": "end", "total_solicitations": 6, "rematched": 6}
+        entries = [{k: v for k, v in r.items() if k != "type"} for r in records[1:-1]]
+        assert entries == run_triage(incremental=True)["action_plan"]
+
+    def test_sse_stream(self, client):
+        res = client.post("/api/matches/triage/stream?format=sse&mode=incremental")
+        assert res.mimetype == "text/event-stream"
+        events = res.get_data(as_text=True).strip().split("\n\n")
+        assert [e.splitlines()[0] for e in events] == ["event: start", "event: entry", "event: end"]
+        entry = json.loads(events[1].splitlines()[1][len("data: "):])
+        assert entry["priority"] == 1 and entry["top_match"]
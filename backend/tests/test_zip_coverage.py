@@ -0,0 +1,87 @@
+"""zip_coverage counts kept current by organization and ZIP writes."""
+import random
+from app import db
+from app.models.organization import Organization
+from app.models.zip_coverage import ZipCoverage
+from app.models.zip_need_score import ZipNeedScore
+from app.services.geo import haversine
+from app.services.jobs import enqueue, work
+from app.services.zip_coverage import COVERAGE_RADII, backfill_zip_coverage, nearby_organizations
+
+
+def _stored():
+    return {(c.zip_code, c.radius_miles): c.organizations for c in ZipCoverage.query.all()}
+
+
+def _expected():
+    orgs = Organization.query.all()
+    return {
+        (z.zip_code, radius): sum(1 for o in orgs if haversine(z.lat, z.lng, o.lat, o.lng) <= radius)
+        for z in ZipNeedScore.query.all()
+        for radius in COVERAGE_RADII
+    }
+
+
+def _org(k, lat, lng):
+    return Organization(name=f"Coverage Org {k}", org_type="supplier", zip_code="38614", lat=lat, lng=lng)
+
+
+class TestZipCoverage:
+    def test_seeded_counts(self, app):
+        assert _stored() == _expected()
+
+    def test_organization_writes(self, app):
+        rng = random.Random(24)
+        orgs = [_org(k, rng.uniform(32, 37), rng.uniform(-93, -88)) for k in range(30)]
+        db.session.add_all(orgs)
+        db.session.commit()
+        assert _stored() == _expected()
+
+        for org in rng.sample(orgs, 10):
+            org.lat, org.lng = rng.uniform(32, 37), rng.uniform(-93, -88)
+        orgs[0].name = "Renamed only"
+        db.session.commit()
+        assert _stored() == _expected()
+
+        db.session.expire_all()
+        for org in orgs[:8]:
+            db.session.delete(org)
+        db.session.commit()
+        assert _stored() == _expected()
+
+    def test_zip_writes(self, app):
+        db.session.add(ZipNeedScore(zip_code="38701", city="Greenville", state="MS", lat=33.4, lng=-91.06,
+                                    population=30000, need_score=75))
+        db.session.add(_org("new", 33.5, -91.0))
+        db.session.commit()
+        assert _stored() == _expected()
+
+        moved = db.session.get(ZipNeedScore, "38701")
+        moved.lat, moved.lng = 35.1, -90.0
+        db.session.commit()
+        assert _stored() == _expected()
+
+        db.session.delete(moved)
+        db.session.commit()
+        assert ("38701", 100) not in _stored()
+        assert _stored() == _expected()
+
+    def test_backfill_and_missing_rows(self, app):
+        ZipCoverage.query.delete()
+        db.session.commit()
+        zips = ZipNeedScore.query.all()
+        expected = [_expected()[(z.zip_code, 150)] for z in zips]
+        assert nearby_organizations(zips, 150).tolist() == expected
+
+        assert backfill_zip_coverage(db.session.connection()) == len(zips) * len(COVERAGE_RADII)
+        assert backfill_zip_coverage(db.session.connection()) == 0
+        db.session.commit()
+        assert _stored() == _expected()
+
+    def test_rebuild_job_repairs_bulk_sql_drift(self, app):
+        Organization.query.update({Organization.lat: 45.5, Organization.lng: -109.5})
+        db.session.commit()
+        assert _stored() != _expected()
+        enqueue("zip_coverage")
+        assert work("test-worker") == 1
+        assert _stored() == _expected()
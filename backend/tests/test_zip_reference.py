@@ -0,0 +1,130 @@
+"""Process-wide ZIP reference table."""
+from sqlalchemy import event
+from app import db
+from app.models.organization import Organization
+from app.models.zip_need_score import ZipNeedScore
+from app.services.matching import get_need_score
+from app.services.zip_centroids import ZipCentroids, build_centroids, normalize_zip
+from app.services.zip_reference import resolve_zip, zip_lookup, zip_table
+
+
+def _zip_queries():
+    statements = []
+
+    def before(conn, cursor, statement, params, context, executemany):
+        if "FROM zip_need_scores" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before)
+    return statements, lambda: event.remove(db.engine, "before_cursor_execute", before)
+
+
+class TestZipTable:
+    def test_lookup_matches_rows(self, app):
+        row = db.session.get(ZipNeedScore, "38614")
+        entry = zip_lookup("38614")
+        assert (entry.lat, entry.lng, entry.state, entry.need_score) == (row.lat, row.lng, row.state, row.need_score)
+        assert zip_lookup("00000") is None
+        assert get_need_score("00000") == 50.0
+
+    def test_portal_requests_reuse_the_table(self, app, client):
+        sup = Organization.query.filter_by(org_type="supplier").first()
+        client.get(f"/api/portal/supplier/{sup.id}/matches")
+        statements, stop = _zip_queries()
+        try:
+            client.get(f"/api/portal/supplier/{sup.id}/matches")
+            client.post("/api/portal/federal/match", json={"destination_zip": "38614"})
+        finally:
+            stop()
+        assert statements == []
+
+    def test_zip_updates_reload_the_table(self, app):
+        assert zip_table.get().need_score_for("38614") != 12.5
+        db.session.get(ZipNeedScore, "38614").need_score = 12.5
+        db.session.commit()
+        assert get_need_score("38614") == 12.5
+
+
+class TestZipCentroids:
+    def test_exact_prefix_and_unknown(self):
+        centroids = ZipCentroids(build_centroids([("38601", 34.0, -89.5), ("38614", 33.75, -90.5), ("02101", 42.5, -71.0)]))
+        assert centroids.locate("38614-0001") == ("38614", 33.75, -90.5, True)
+        assert centroids.locate("38607") == ("38607", 34.0, -89.5, False)  # nearer 38601 than 38614
+        assert centroids.locate("38699") == ("38699", 33.75, -90.5, False)
+        assert centroids.locate("2199") == ("02199", 42.5, -71.0, False)
+        assert centroids.locate("38714") is None  # no centroid in the 387 prefix
+        assert normalize_zip("abcde") is None and normalize_zip("123456") is None
+
+    def test_untracked_zip_resolves_to_nearest_tracked(self, app):
+        # 38601 (Abbeville, MS) ships in the centroid file but is not tracked in the test seed
+        resolved = resolve_zip("38601")
+        assert resolved.source == "centroid"
+        assert resolved.nearest.zip_code == "38614"
+        assert resolve_zip("38699").source == "prefix"
+        assert resolve_zip("72301").source == "monitored"
+        assert resolve_zip("00000") is None
+        assert resolve_zip("abc") is None
+
+    def test_unseeded_prefix_resolves(self, app):
+        # 59001 (Absarokee, MT): no seeded ZIP shares its 590 prefix
+        resolved = resolve_zip("59001")
+        assert resolved.source == "centroid"
+        assert (round(resolved.lat, 1), round(resolved.lng, 1)) == (45.5, -109.5)
+        assert resolve_zip("59099").source == "prefix"
+
+    def test_registration_uses_centroids(self, app, client):
+        from flask_jwt_extended import create_access_token
+        token = create_access_token(identity="1")
+        res = client.post("/api/organizations", headers={"Authorization": f"Bearer {token}"}, json={
+            "name": "Abbeville Foods", "org_type": "supplier", "zip_code": "38601", "contact_email": "a@b.c",
+        })
+        assert res.status_code == 201
+        assert (res.get_json()["lat"], res.get_json()["lng"]) == (resolve_zip("38601").lat, resolve_zip("38601").lng)
+
+    def _create(self, client, path, body):
+        from flask_jwt_extended import create_access_token
+        token = create_access_token(identity="1")
+        return client.post(path, headers={"Authorization": f"Bearer {token}"}, json=body)
+
+    def test_organization_with_unknown_zip_needs_coordinates(self, app, client):
+        body = {"name": "Nowhere Foods", "org_type": "supplier", "zip_code": "00000", "contact_email": "n@b.c"}
+        res = self._create(client, "/api/organizations", body)
+        assert res.status_code == 400
+        assert Organization.query.filter_by(name="Nowhere Foods").count() == 0
+        res = self._create(client, "/api/organizations", {**body, "lat": 34.1, "lng": -89.9})
+        assert res.status_code == 201
+        assert (res.get_json()["lat"], res.get_json()["lng"]) == (34.1, -89.9)
+
+    def test_solicitation_with_unknown_zip_needs_coordinates(self, app, client):
+        body = {"title": "Nowhere RFP", "description": "Water", "company_name": "Co",
+                "company_email": "c@b.c", "zip_code": "00000"}
+        assert self._create(client, "/api/solicitations", body).status_code == 400
+        res = self._create(client, "/api/solicitations", {**body, "lat": 34.1})
+        assert res.status_code == 400
+        res = self._create(client, "/api/solicitations", {**body, "lat": 34.1, "lng": -89.9})
+        assert res.status_code == 201
+
+    def test_capacity_with_unknown_zip_needs_coordinates(self, app, client):
+        org = Organization.query.filter_by(org_type="supplier").first()
+        body = {"organization_id": org.id, "supply_type": "water", "item_name": "Bottled water",
+                "quantity": 100, "zip_code": "00000"}
+        assert self._create(client, "/api/emergency/capacity", body).status_code == 400
+        res = self._create(client, "/api/emergency/capacity", {**body, "lat": 34.1, "lng": -89.9})
+        assert res.status_code == 201
+
+    def test_tri_match_reports_resolution(self, client):
+        dest = client.post("/api/portal/federal/match", json={"destination_zip": "38601"}).get_json()["destination"]
+        assert dest["resolved_via"] == "centroid"
+        assert dest["nearest_monitored_zip"] == "38614"
+        assert dest["need_score"] == 82
+        # The nearest tracked ZIP lends its need score, not its city or state
+        assert (dest["city"], dest["state"]) == (None, None)
+
+    def test_unknown_destination_rejected(self, client):
+        res = client.post("/api/portal/federal/match", json={"destination_zip": "abc"})
+        assert res.status_code == 400
+        assert res.get_json()["error"] == "unknown destination_zip"
+        res = client.post("/api/rfq/estimate", json={
+            "destination_zip": "00000", "items": [{"supply_type": "water", "quantity": 10}],
+        })
+        assert res.status_code == 400